@@ -2,6 +2,7 @@
 FastAPI server for CodeSearch REST API.
 """
 
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Optional, List
 from fastapi import FastAPI, HTTPException, Query
@@ -13,7 +14,7 @@ from pydantic import BaseModel
 from ..models import SearchQuery, SearchResult, Language, CodeEntityType
 from ..search.engine import HybridSearchEngine
 from ..indexer import RepoIndexer
-from ..queue import JobPublisher
+from ..queue import AsyncJobPublisher
 
 # Static files directory
 STATIC_DIR = Path(__file__).parent / "static"
@@ -58,12 +59,20 @@ class StatsResponse(BaseModel):
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
     
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        # Shutdown: stop the search engine's BM25 worker threads
+        if _search_engine is not None:
+            _search_engine.close()
+    
     app = FastAPI(
         title="CodeSearch API",
         description="Semantic Code Search Engine - Find code by what it does",
         version="0.1.0",
         docs_url="/docs",
-        redoc_url="/redoc"
+        redoc_url="/redoc",
+        lifespan=lifespan
     )
     
     # CORS middleware
@@ -201,14 +210,20 @@ def create_app() -> FastAPI:
         The job will be processed by background workers.
         """
         try:
-            with JobPublisher() as publisher:
-                job = publisher.publish_repo(
+            async with AsyncJobPublisher() as publisher:
+                job = await publisher.publish_repo(
                     repo_url=request.repo_url,
                     repo_name=request.repo_name,
                     branch=request.branch,
                     priority=request.priority
                 )
                 
+                if job is None:
+                    return IndexResponse(
+                        success=False,
+                        message="Failed to queue: the broker did not accept the job"
+                    )
+                
                 return IndexResponse(
                     success=True,
                     job_id=job.id,
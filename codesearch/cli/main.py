@@ -382,6 +382,8 @@ def queue(
                 repo_name=name,
                 priority=priority
             )
+            if job is None:
+                raise RuntimeError("the broker did not accept the job")
             
             queue_length = publisher.get_queue_length()
             
@@ -31,6 +31,13 @@ class Settings(BaseSettings):
     qdrant_host: str = Field(default="localhost", alias="QDRANT_HOST")
     qdrant_port: int = Field(default_factory=_detect_qdrant_port, alias="QDRANT_PORT")
     qdrant_collection: str = Field(default="code_embeddings", alias="QDRANT_COLLECTION")
+    # Talk gRPC instead of REST (set false if only the HTTP port is exposed)
+    qdrant_prefer_grpc: bool = Field(default=True, alias="QDRANT_PREFER_GRPC")
+    qdrant_grpc_port: int = Field(default=6334, alias="QDRANT_GRPC_PORT")
+    # Points per upsert request; only the last chunk of an insert waits
+    qdrant_upsert_batch_size: int = Field(default=256, alias="QDRANT_UPSERT_BATCH_SIZE")
+    # Keep an int8 copy of vectors in RAM for the ANN scan; FP32 only rescores
+    qdrant_int8_quantization: bool = Field(default=True, alias="QDRANT_INT8_QUANTIZATION")
     
     # RabbitMQ Message Queue
     rabbitmq_host: str = Field(default="localhost", alias="RABBITMQ_HOST")
@@ -38,6 +45,12 @@ class Settings(BaseSettings):
     rabbitmq_user: str = Field(default="guest", alias="RABBITMQ_USER")
     rabbitmq_password: str = Field(default="guest", alias="RABBITMQ_PASSWORD")
     rabbitmq_queue: str = Field(default="indexing_jobs", alias="RABBITMQ_QUEUE")
+    # One job at a time by default: indexing a repo takes minutes, so a
+    # deeper prefetch starves other workers and bypasses queue priorities,
+    # and a batched ack stays unsent while the next job runs. Raise both
+    # only for deployments with short jobs
+    rabbitmq_prefetch_count: int = Field(default=1, alias="RABBITMQ_PREFETCH_COUNT")
+    rabbitmq_ack_batch_size: int = Field(default=1, alias="RABBITMQ_ACK_BATCH_SIZE")
     
     # Embedding Model
     # Note: all-MiniLM-L6-v2 works better for natural language → code search
@@ -47,10 +60,22 @@ class Settings(BaseSettings):
         alias="EMBEDDING_MODEL"
     )
     embedding_dimension: int = Field(default=384, alias="EMBEDDING_DIMENSION")  # 384 for MiniLM, 768 for CodeBERT
+    # Run the model in FP16 on CUDA (CPU always uses FP32)
+    embedding_fp16: bool = Field(default=True, alias="EMBEDDING_FP16")
     
     # Storage paths
     repos_path: Path = Field(default=Path("./data/repos"), alias="REPOS_PATH")
     index_path: Path = Field(default=Path("./data/index"), alias="INDEX_PATH")
+    cache_path: Path = Field(default=Path.home() / ".cache" / "codesearch", alias="CACHE_PATH")
+    
+    # Recent search results per store, reused until the store changes
+    search_cache_size: int = Field(default=512, alias="SEARCH_CACHE_SIZE")  # 0 disables
+    search_cache_ttl: float = Field(default=60.0, alias="SEARCH_CACHE_TTL")  # seconds
+    # Opt-in: vector searches also reuse the results of a cached query
+    # embedding at least this cosine-similar. Off by default (above 1):
+    # near-duplicate hits answer a query with another query's results, and
+    # templated queries that differ by one word can easily clear 0.95
+    search_cache_similarity: float = Field(default=2.0, alias="SEARCH_CACHE_SIMILARITY")
     
     # Processing
     batch_size: int = Field(default=32, alias="BATCH_SIZE")
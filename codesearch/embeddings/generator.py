@@ -40,8 +40,10 @@ class EmbeddingGenerator(ABC):
         """Generate embeddings for multiple code entities."""
         texts = [e.get_searchable_text() for e in entities]
         
-        # Process in batches
-        all_embeddings = []
+        # Process in batches of similar length, longest first, so each batch
+        # pads its texts as little as possible; results go back in entity order
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        all_embeddings: List[List[float]] = [None] * len(texts)
         batch_size = settings.batch_size
         
         iterator = range(0, len(texts), batch_size)
@@ -49,9 +51,10 @@ class EmbeddingGenerator(ABC):
             iterator = tqdm(iterator, desc="Generating embeddings", unit="batch")
         
         for i in iterator:
-            batch = texts[i:i + batch_size]
-            embeddings = self.embed_batch(batch)
-            all_embeddings.extend(embeddings)
+            batch = order[i:i + batch_size]
+            embeddings = self.embed_batch([texts[j] for j in batch])
+            for j, embedding in zip(batch, embeddings):
+                all_embeddings[j] = embedding
         
         return all_embeddings
 
@@ -100,6 +103,8 @@ class CodeBERTEmbedder(EmbeddingGenerator):
             try:
                 self._model = SentenceTransformer(self.model_name, device=self._device)
                 self._use_sentence_transformer = True
+                if self._use_fp16(str(self._model.device)):
+                    self._model.half()
                 logger.info("Loaded model via sentence-transformers")
                 return
             except Exception:
@@ -118,6 +123,8 @@ class CodeBERTEmbedder(EmbeddingGenerator):
                 self._device = "cuda" if torch.cuda.is_available() else "cpu"
             
             self._model = self._model.to(self._device)
+            if self._use_fp16(self._device):
+                self._model = self._model.half()
             self._model.eval()
             
             logger.info("Loaded model via transformers", device=self._device)
@@ -131,6 +138,11 @@ class CodeBERTEmbedder(EmbeddingGenerator):
             logger.error("Failed to load model", model=self.model_name, error=str(e))
             raise
     
+    @staticmethod
+    def _use_fp16(device: str) -> bool:
+        """Whether to run the model in FP16 on a device (CUDA only)."""
+        return settings.embedding_fp16 and device.startswith("cuda")
+    
     def embed_text(self, text: str) -> List[float]:
         """Generate embedding for a single text."""
         return self.embed_batch([text])[0]
@@ -171,15 +183,16 @@ class CodeBERTEmbedder(EmbeddingGenerator):
             return_tensors="pt"
         ).to(self._device)
         
-        # Get embeddings
-        with torch.no_grad():
+        # Get embeddings (inference_mode also skips autograd's version tracking)
+        with torch.inference_mode():
             outputs = self._model(**encoded)
             
             # Use mean pooling over token embeddings
             attention_mask = encoded['attention_mask']
             token_embeddings = outputs.last_hidden_state
             
-            # Expand attention mask for broadcasting
+            # Expand attention mask for broadcasting (as float32, so FP16
+            # token embeddings are pooled in float32)
             input_mask_expanded = (
                 attention_mask
                 .unsqueeze(-1)
@@ -191,10 +204,10 @@ class CodeBERTEmbedder(EmbeddingGenerator):
             sum_embeddings = torch.sum(token_embeddings * input_mask_expanded, 1)
             sum_mask = torch.clamp(input_mask_expanded.sum(1), min=1e-9)
             embeddings = sum_embeddings / sum_mask
-        
-        # Normalize if requested
-        if self.normalize:
-            embeddings = torch.nn.functional.normalize(embeddings, p=2, dim=1)
+            
+            # Normalize if requested
+            if self.normalize:
+                embeddings = torch.nn.functional.normalize(embeddings, p=2, dim=1)
         
         return embeddings.cpu().numpy().tolist()
     
@@ -341,24 +341,20 @@ class RepoIndexer:
                 if not any(d in file_path.parts for d in skip_dirs):
                     files_to_parse.append(file_path)
         
-        # Parse files
-        iterator = files_to_parse
+        # Parse files in a process pool; files that fail to parse, or whose
+        # worker crashes, are logged and still yield a (possibly empty) result
+        results = ParserFactory.iter_parse_files(files_to_parse, repo_name)
         if show_progress:
-            iterator = tqdm(iterator, desc="Parsing files", unit="file")
+            results = tqdm(results, total=len(files_to_parse), desc="Parsing files", unit="file")
         
-        for file_path in iterator:
-            try:
-                file_entities = ParserFactory.parse_file(file_path, repo_name)
-                entities.extend(file_entities)
-                files_processed += 1
-                
-                # Track language stats
-                if file_entities:
-                    lang = file_entities[0].language.value
-                    languages[lang] = languages.get(lang, 0) + len(file_entities)
-                    
-            except Exception as e:
-                logger.debug("Failed to parse file", file=str(file_path), error=str(e))
+        for file_entities in results:
+            entities.extend(file_entities)
+            files_processed += 1
+            
+            # Track language stats
+            if file_entities:
+                lang = file_entities[0].language.value
+                languages[lang] = languages.get(lang, 0) + len(file_entities)
         
         logger.info(
             "Parsing complete",
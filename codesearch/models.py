@@ -4,8 +4,9 @@ Data models for CodeSearch engine.
 
 from datetime import datetime
 from enum import Enum
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Tuple
+from pydantic import BaseModel, Field, PrivateAttr, ValidationError, ValidationInfo, computed_field, model_validator
+from pydantic_core import InitErrorDetails
 import uuid
 
 
@@ -47,8 +48,7 @@ class CodeEntity(BaseModel):
     start_line: int
     end_line: int
     
-    # Code content
-    source_code: str
+    # Code content (source_code is exposed as a lazily-decoded property below)
     docstring: Optional[str] = None
     signature: Optional[str] = None
     
@@ -63,6 +63,115 @@ class CodeEntity(BaseModel):
     loc: int = 0  # Lines of code
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
+    # Lazy source storage: either the decoded text, or a byte span into the
+    # file's source bytes (shared by every entity parsed from that file)
+    _source_code: Optional[str] = PrivateAttr(default=None)
+    _source_bytes: Optional[bytes] = PrivateAttr(default=None)
+    _source_span: Optional[Tuple[int, int]] = PrivateAttr(default=None)
+    
+    # Memoized (original, lowercased) name and file path for search boosts
+    _name_lc: Optional[Tuple[str, str]] = PrivateAttr(default=None)
+    _file_path_lc: Optional[Tuple[str, str]] = PrivateAttr(default=None)
+    
+    @model_validator(mode='wrap')
+    @classmethod
+    def _capture_source_code(cls, data: Any, handler, info: ValidationInfo):
+        """
+        Accept source_code as input even though it is not a stored field.
+        
+        It is required, unless validation runs with the deferred-source
+        context of from_source_span and without_source.
+        """
+        source_code = None
+        if isinstance(data, dict):
+            if 'source_code' in data:
+                data = dict(data)
+                source_code = data.pop('source_code')
+            elif not (info.context or {}).get('deferred_source'):
+                raise ValidationError.from_exception_data(cls.__name__, [
+                    InitErrorDetails(type='missing', loc=('source_code',), input=data)
+                ])
+        entity = handler(data)
+        if source_code is not None:
+            entity._source_code = source_code
+        return entity
+    
+    @classmethod
+    def from_source_span(
+        cls,
+        source_bytes: bytes,
+        start_byte: int,
+        end_byte: int,
+        **data: Any
+    ) -> "CodeEntity":
+        """
+        Create an entity whose source_code is decoded only when accessed.
+        
+        Args:
+            source_bytes: Encoded source of the whole file
+            start_byte: Start offset of the entity within source_bytes
+            end_byte: End offset of the entity within source_bytes
+            **data: Remaining entity fields
+        """
+        entity = cls.model_validate(data, context={'deferred_source': True})
+        entity._source_bytes = source_bytes
+        entity._source_span = (start_byte, end_byte)
+        return entity
+    
+    @classmethod
+    def without_source(cls, **data: Any) -> "CodeEntity":
+        """
+        Create an entity whose source_code is filled in later.
+        
+        For search results fetched without their bodies (see
+        VectorStore.load_sources); until source_code is set it reads as "".
+        
+        Args:
+            **data: Entity fields other than source_code
+        """
+        return cls.model_validate(data, context={'deferred_source': True})
+    
+    @computed_field
+    @property
+    def source_code(self) -> str:
+        """Full source code of the entity, decoded on first access."""
+        if self._source_code is None:
+            if self._source_bytes is not None:
+                start, end = self._source_span
+                self._source_code = self._source_bytes[start:end].decode('utf-8', errors='replace')
+                self._source_bytes = None
+                self._source_span = None
+            else:
+                self._source_code = ""
+        return self._source_code
+    
+    @source_code.setter
+    def source_code(self, value: str) -> None:
+        self._source_code = value
+        self._source_bytes = None
+        self._source_span = None
+    
+    @property
+    def has_source(self) -> bool:
+        """Whether source code was given, as text or as a byte span."""
+        return self._source_code is not None or self._source_bytes is not None
+    
+    @property
+    def name_lc(self) -> str:
+        """Lowercased name, computed once (and again only if name changes)."""
+        cached = self._name_lc
+        if cached is None or cached[0] is not self.name:
+            cached = self._name_lc = (self.name, self.name.lower())
+        return cached[1]
+    
+    @property
+    def file_path_lc(self) -> str:
+        """Lowercased file path, computed once (and again only if file_path changes)."""
+        cached = self._file_path_lc
+        if cached is None or cached[0] is not self.file_path:
+            cached = self._file_path_lc = (self.file_path, self.file_path.lower())
+        return cached[1]
+    
     def get_searchable_text(self) -> str:
         """Generate text representation for embedding/search."""
         parts = []
@@ -2,15 +2,173 @@
 Base parser interface for code entity extraction.
 """
 
+import functools
+import hashlib
+import mmap
+import os
+import queue
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
 import structlog
 
 from ..models import CodeEntity, Language
 
+try:
+    import xxhash
+except ImportError:  # xxhash is optional; content hashes fall back to blake2b
+    xxhash = None
+
 logger = structlog.get_logger()
 
+# Tree-sitter parsers by language, one set per thread, shared by every
+# CodeParser instance so constructing a parser never builds a new one
+_thread_parsers = threading.local()
+
+# Parse throughput flattens past a handful of workers: reading files and
+# allocating entities become the bottleneck, and extra processes just contend
+DEFAULT_PARSE_WORKERS = 6
+
+# Files whose last syntax tree a parser built with reuse_trees=True keeps,
+# so re-parsing an edited file only re-parses around the edit; the source
+# bytes kept alongside are capped too (trees take several times more)
+PARSE_TREE_CACHE_SIZE = 256
+PARSE_TREE_CACHE_BYTES = 16 * 1024 * 1024
+
+
+# Parser instances owned by this process, built on first use by
+# _parse_with_class (tree-sitter parsers aren't picklable)
+_process_parsers: Dict[type, "CodeParser"] = {}
+
+
+def _parse_with_class(parser_class: Type["CodeParser"], file_path: Path, repo_name: str) -> List[CodeEntity]:
+    """Parse a file with this process's instance of parser_class."""
+    parser = _process_parsers.get(parser_class)
+    if parser is None:
+        parser = _process_parsers[parser_class] = parser_class()
+    return parser.parse_file(file_path, repo_name)
+
+
+def _parse_safely(
+    parse_file: Callable[[Path, str], List[CodeEntity]],
+    file_path: Path,
+    repo_name: str
+) -> List[CodeEntity]:
+    """Parse one file, logging and skipping it if parsing raises."""
+    try:
+        return parse_file(file_path, repo_name)
+    except Exception as e:
+        logger.error("Failed to parse file", file=str(file_path), error=str(e))
+        return []
+
+
+def _parse_chunk(
+    parse_file: Callable[[Path, str], List[CodeEntity]],
+    paths: List[Path],
+    repo_name: str
+) -> List[List[CodeEntity]]:
+    """Parse a worker's chunk of files, one entity list per path."""
+    return [_parse_safely(parse_file, path, repo_name) for path in paths]
+
+
+def iter_parse_files(
+    parse_file: Callable[[Path, str], List[CodeEntity]],
+    paths: Iterable[Path],
+    repo_name: str,
+    workers: Optional[int] = None,
+    chunksize: int = 32
+) -> Iterator[List[CodeEntity]]:
+    """
+    Parse files in a process pool, yielding each file's entities in path order.
+    
+    Files are sent to the workers in chunks. If a chunk fails as a whole
+    (a worker crashed or was OOM-killed, which also breaks the pool for
+    every later chunk), its files are parsed in this process instead, so
+    one bad worker never loses the files already parsed or still to come.
+    
+    Args:
+        parse_file: Picklable function parsing one (path, repo_name)
+        paths: Source files to parse
+        repo_name: Name of the repository containing these files
+        workers: Number of worker processes (default: CPU count,
+            capped at DEFAULT_PARSE_WORKERS)
+        chunksize: Files handed to a worker per task, amortizing IPC
+        
+    Yields:
+        List of extracted CodeEntity objects for each path
+    """
+    paths = list(paths)
+    if len(paths) <= 1:
+        for path in paths:
+            yield _parse_safely(parse_file, path, repo_name)
+        return
+    
+    workers = workers or min(os.cpu_count() or 1, DEFAULT_PARSE_WORKERS)
+    chunks = [paths[start:start + chunksize] for start in range(0, len(paths), chunksize)]
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_parse_chunk, parse_file, chunk, repo_name) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                logger.error(
+                    "Parse worker failed, parsing its files in process",
+                    files=len(chunk),
+                    error=str(e)
+                )
+                results = _parse_chunk(parse_file, chunk, repo_name)
+            yield from results
+
+
+def content_digest(data) -> bytes:
+    """
+    8-byte hash of file content (bytes or any buffer, e.g. an mmap).
+    
+    xxh3_64 when xxhash is installed, which runs at memory speed, else
+    blake2b. The two never agree on a file, so switching between them just
+    re-parses each file once.
+    """
+    if xxhash is not None:
+        return xxhash.xxh3_64_digest(data)
+    return hashlib.blake2b(data, digest_size=8).digest()
+
+
+def _point(source: bytes, offset: int) -> Tuple[int, int]:
+    """Tree-sitter (row, byte column) of a byte offset."""
+    return source.count(b'\n', 0, offset), offset - (source.rfind(b'\n', 0, offset) + 1)
+
+
+def _edit_range(old: bytes, new: bytes) -> Tuple[int, int, int]:
+    """
+    Find the single span where two versions of a file differ.
+    
+    Returns:
+        Tuple of (start, old end, new end) byte offsets, after the longest
+        common prefix and before the longest common suffix
+    """
+    # Binary searches over slice comparisons, which run at memcmp speed
+    lo, hi = 0, min(len(old), len(new))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[:mid] == new[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    start = lo
+    
+    lo, hi = 0, min(len(old), len(new)) - start
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[len(old) - mid:] == new[len(new) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return start, len(old) - lo, len(new) - lo
+
 
 class CodeParser(ABC):
     """Abstract base class for language-specific code parsers."""
@@ -18,7 +176,20 @@ class CodeParser(ABC):
     language: Language = Language.UNKNOWN
     file_extensions: List[str] = []
     
-    def __init__(self):
+    def __init__(self, reuse_trees: bool = False):
+        """
+        Initialize the parser.
+        
+        Args:
+            reuse_trees: Keep recent syntax trees for incremental re-parsing.
+                Only worth it for a long-lived parser that sees the same
+                files edited (e.g. a watcher); bulk indexing leaves it off
+        """
+        self.reuse_trees = reuse_trees
+        # (repo_name, file_path) -> (source bytes, tree), least recently used first
+        self._trees: "OrderedDict[Tuple[str, str], Tuple[bytes, object]]" = OrderedDict()
+        self._trees_bytes = 0
+        self._trees_lock = threading.Lock()
         self._init_parser()
     
     @abstractmethod
@@ -26,6 +197,21 @@ class CodeParser(ABC):
         """Initialize the tree-sitter parser for this language."""
         pass
     
+    @property
+    def parser(self):
+        """Tree-sitter parser for the calling thread, created on first use."""
+        if not self._initialized:
+            return None
+        parsers = getattr(_thread_parsers, 'parsers', None)
+        if parsers is None:
+            parsers = _thread_parsers.parsers = {}
+        parser = parsers.get(self.language)
+        if parser is None:
+            from tree_sitter import Parser
+            
+            parser = parsers[self.language] = Parser(self.ts_language)
+        return parser
+    
     @abstractmethod
     def parse_file(self, file_path: Path, repo_name: str) -> List[CodeEntity]:
         """
@@ -54,6 +240,187 @@ class CodeParser(ABC):
         """
         raise NotImplementedError("Direct content parsing not implemented")
     
+    def parse_file_if_changed(
+        self,
+        file_path: Path,
+        repo_name: str,
+        known_hash: Optional[bytes] = None
+    ) -> Tuple[bytes, Optional[List[CodeEntity]]]:
+        """
+        Parse a source file only if its content hash differs from a known one.
+        
+        The file is hashed straight from an mmap with content_digest, so
+        unchanged files are skipped without ever materializing their
+        contents or parsing them.
+        
+        Args:
+            file_path: Path to the source file
+            repo_name: Name of the repository containing this file
+            known_hash: Content hash recorded at the last indexing run
+            
+        Returns:
+            Tuple of (content hash, entities), where entities is None if the
+            file is unchanged
+        """
+        with open(file_path, 'rb') as f:
+            if file_path.stat().st_size == 0:
+                data = b''
+                digest = content_digest(data)
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    digest = content_digest(mm)
+                    if digest == known_hash:
+                        return digest, None
+                    data = mm[:]
+        
+        if digest == known_hash:
+            return digest, None
+        
+        content = data.decode('utf-8', errors='replace')
+        try:
+            return digest, self.parse_content(content, str(file_path), repo_name)
+        except Exception as e:
+            logger.error("Failed to parse file", file=str(file_path), error=str(e))
+            return digest, []
+    
+    def parse_many_files(
+        self,
+        paths: Iterable[Path],
+        repo_name: str,
+        read_workers: int = 4,
+        max_pending: int = 32
+    ) -> List[CodeEntity]:
+        """
+        Parse many files, overlapping disk reads with parsing.
+        
+        A thread pool reads files into a bounded queue while the calling
+        thread parses whatever has already been read, so read latency hides
+        behind parse time without buffering the whole repository in memory.
+        
+        Args:
+            paths: Source files to parse
+            repo_name: Name of the repository containing these files
+            read_workers: Number of reader threads
+            max_pending: Maximum number of read-but-unparsed files
+            
+        Returns:
+            List of extracted CodeEntity objects, in read-completion order
+        """
+        paths = list(paths)
+        pending: "queue.Queue[Tuple[Path, Optional[bytes]]]" = queue.Queue(maxsize=max_pending)
+        
+        def read(path: Path) -> None:
+            try:
+                data = path.read_bytes()
+            except OSError as e:
+                logger.error("Failed to read file", file=str(path), error=str(e))
+                data = None
+            pending.put((path, data))
+        
+        entities: List[CodeEntity] = []
+        with ThreadPoolExecutor(max_workers=read_workers) as executor:
+            for path in paths:
+                executor.submit(read, path)
+            
+            for _ in range(len(paths)):
+                path, data = pending.get()
+                if data is None:
+                    continue
+                try:
+                    entities.extend(self.parse_content(
+                        data.decode('utf-8', errors='replace'), str(path), repo_name
+                    ))
+                except Exception as e:
+                    logger.error("Failed to parse file", file=str(path), error=str(e))
+        return entities
+    
+    @classmethod
+    def parse_files(
+        cls,
+        paths: Iterable[Path],
+        repo_name: str,
+        workers: Optional[int] = None
+    ) -> List[CodeEntity]:
+        """
+        Parse many files in parallel using a process pool.
+        
+        Files are dispatched largest-first so the workers finish at roughly
+        the same time instead of one straggling on a big file at the end.
+        
+        Args:
+            paths: Source files to parse
+            repo_name: Name of the repository containing these files
+            workers: Number of worker processes (default: CPU count,
+                capped at DEFAULT_PARSE_WORKERS)
+            
+        Returns:
+            List of extracted CodeEntity objects from all files
+        """
+        paths = sorted(paths, key=lambda p: p.stat().st_size, reverse=True)
+        workers = workers or min(os.cpu_count() or 1, DEFAULT_PARSE_WORKERS)
+        chunksize = max(1, len(paths) // (workers * 4))
+        
+        entities: List[CodeEntity] = []
+        for file_entities in iter_parse_files(
+            functools.partial(_parse_with_class, cls), paths, repo_name, workers, chunksize
+        ):
+            entities.extend(file_entities)
+        return entities
+    
+    def _parse_incremental(self, parser, source_bytes: bytes, file_path: str, repo_name: str):
+        """
+        Parse source with tree-sitter, reusing the file's previous tree.
+        
+        The previous tree is edited to match the span that changed, so
+        tree-sitter only re-parses around it; an unchanged file reuses its
+        tree as is. Without reuse_trees this is a plain parse.
+        
+        Args:
+            parser: Tree-sitter parser for this language
+            source_bytes: Source code as UTF-8
+            file_path: Path of the file, identifying its previous tree
+            repo_name: Name of the repository containing the file
+            
+        Returns:
+            The tree-sitter Tree
+        """
+        if not self.reuse_trees:
+            return parser.parse(source_bytes)
+        
+        key = (repo_name, file_path)
+        with self._trees_lock:
+            cached = self._trees.pop(key, None)
+            if cached is not None:
+                self._trees_bytes -= len(cached[0])
+        
+        if cached is None:
+            tree = parser.parse(source_bytes)
+        elif cached[0] == source_bytes:
+            tree = cached[1]
+        else:
+            old_bytes, tree = cached
+            start, old_end, new_end = _edit_range(old_bytes, source_bytes)
+            tree.edit(
+                start_byte=start,
+                old_end_byte=old_end,
+                new_end_byte=new_end,
+                start_point=_point(old_bytes, start),
+                old_end_point=_point(old_bytes, old_end),
+                new_end_point=_point(source_bytes, new_end),
+            )
+            tree = parser.parse(source_bytes, tree)
+        
+        with self._trees_lock:
+            self._trees[key] = (source_bytes, tree)
+            self._trees_bytes += len(source_bytes)
+            while len(self._trees) > 1 and (
+                len(self._trees) > PARSE_TREE_CACHE_SIZE
+                or self._trees_bytes > PARSE_TREE_CACHE_BYTES
+            ):
+                old_bytes, _ = self._trees.popitem(last=False)[1]
+                self._trees_bytes -= len(old_bytes)
+        return tree
+    
     @classmethod
     def supports_file(cls, file_path: Path) -> bool:
         """Check if this parser supports the given file."""
@@ -87,7 +454,68 @@ class CodeParser(ABC):
         count_branches(node)
         return complexity
     
-    def _get_node_text(self, node, source_bytes: bytes) -> str:
-        """Extract text content from a tree-sitter node."""
-        return source_bytes[node.start_byte:node.end_byte].decode('utf-8', errors='replace')
+    @staticmethod
+    def _compile_query(ts_language, source: str):
+        """Compile a tree-sitter query for the given language."""
+        from tree_sitter import Query
+        return Query(ts_language, source)
+    
+    @staticmethod
+    def _query_matches(query, node) -> List[Tuple[int, Dict[str, list]]]:
+        """Run a tree-sitter query and return (pattern_index, captures) matches."""
+        try:
+            from tree_sitter import QueryCursor
+        except ImportError:  # py-tree-sitter < 0.25
+            matches = query.matches(node)
+        else:
+            matches = QueryCursor(query).matches(node)
+        return [
+            (index, {
+                name: nodes if isinstance(nodes, list) else [nodes]
+                for name, nodes in captures.items()
+            })
+            for index, captures in matches
+        ]
+    
+    @staticmethod
+    def _query_captures(query, node, capture_name: str) -> list:
+        """Run a tree-sitter query and return one capture's nodes in document order."""
+        try:
+            from tree_sitter import QueryCursor
+        except ImportError:  # py-tree-sitter < 0.25
+            captures = query.captures(node)
+        else:
+            captures = QueryCursor(query).captures(node)
+        if isinstance(captures, dict):
+            nodes = captures.get(capture_name, [])
+        else:
+            nodes = [n for n, name in captures if name == capture_name]
+        return sorted(nodes, key=lambda n: n.start_byte)
+    
+    @staticmethod
+    def _query_all_captures(query, node) -> List[Tuple[object, str]]:
+        """
+        Run a tree-sitter query and return every (node, capture name) pair.
+        
+        Pairs are in document order, with enclosing nodes ahead of the
+        nodes nested inside them.
+        """
+        try:
+            from tree_sitter import QueryCursor
+        except ImportError:  # py-tree-sitter < 0.25
+            captures = query.captures(node)
+        else:
+            captures = QueryCursor(query).captures(node)
+        if isinstance(captures, dict):
+            captures = [(n, name) for name, nodes in captures.items() for n in nodes]
+        return sorted(captures, key=lambda c: (c[0].start_byte, -c[0].end_byte))
+    
+    def _get_node_text(self, node, source_bytes: Union[bytes, memoryview]) -> str:
+        """
+        Extract text content from a tree-sitter node.
+        
+        Given a memoryview, the slice is decoded straight from the shared
+        buffer without first copying it into an intermediate bytes object.
+        """
+        return str(source_bytes[node.start_byte:node.end_byte], 'utf-8', 'replace')
 
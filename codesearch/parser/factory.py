@@ -3,10 +3,10 @@ Parser factory for automatic language detection and parser selection.
 """
 
 from pathlib import Path
-from typing import Dict, Optional, Type, List
+from typing import Dict, Iterable, Iterator, Optional, Type, List
 import structlog
 
-from .base import CodeParser
+from .base import CodeParser, iter_parse_files
 from .python_parser import PythonParser
 from .javascript_parser import JavaScriptParser
 from .go_parser import GoParser
@@ -53,6 +53,63 @@ class ParserFactory:
         
         return parser.parse_file(file_path, repo_name)
     
+    @classmethod
+    def parse_files(
+        cls,
+        paths: Iterable[Path],
+        repo_name: str,
+        workers: Optional[int] = None,
+        chunksize: int = 32
+    ) -> List[CodeEntity]:
+        """
+        Parse files of any supported language in parallel using a process pool.
+        
+        Each worker process builds its own parsers on first use. Results are
+        returned in the order of paths.
+        
+        Args:
+            paths: Source files to parse
+            repo_name: Name of the repository containing these files
+            workers: Number of worker processes (default: CPU count,
+                capped at DEFAULT_PARSE_WORKERS)
+            chunksize: Files handed to a worker per task, amortizing IPC
+            
+        Returns:
+            List of extracted CodeEntity objects from all files
+        """
+        entities: List[CodeEntity] = []
+        for file_entities in cls.iter_parse_files(paths, repo_name, workers, chunksize):
+            entities.extend(file_entities)
+        return entities
+    
+    @classmethod
+    def iter_parse_files(
+        cls,
+        paths: Iterable[Path],
+        repo_name: str,
+        workers: Optional[int] = None,
+        chunksize: int = 32
+    ) -> Iterator[List[CodeEntity]]:
+        """
+        Parse files of any supported language in parallel, file by file.
+        
+        Like parse_files, but yields each file's entities as soon as they
+        are ready, in the order of paths, so callers can track progress and
+        per-file stats. Files a crashed worker was parsing are re-parsed in
+        this process (see base.iter_parse_files).
+        
+        Args:
+            paths: Source files to parse
+            repo_name: Name of the repository containing these files
+            workers: Number of worker processes (default: CPU count,
+                capped at DEFAULT_PARSE_WORKERS)
+            chunksize: Files handed to a worker per task, amortizing IPC
+            
+        Yields:
+            List of extracted CodeEntity objects for each path
+        """
+        return iter_parse_files(cls.parse_file, paths, repo_name, workers, chunksize)
+    
     @classmethod
     def supported_extensions(cls) -> List[str]:
         """Get list of all supported file extensions."""
@@ -2,6 +2,7 @@
 Go AST parser using tree-sitter.
 """
 
+import re
 from pathlib import Path
 from typing import List, Optional
 import structlog
@@ -11,6 +12,26 @@ from ..models import CodeEntity, CodeEntityType, Language
 
 logger = structlog.get_logger()
 
+# Fallback parser patterns
+_FUNC_RE = re.compile(r'^func\s+(\w+)\s*\(([^)]*)\)\s*(\S.*)?{')
+_METHOD_RE = re.compile(r'^func\s+\((\w+)\s+\*?(\w+)\)\s+(\w+)\s*\(([^)]*)\)')
+_STRUCT_RE = re.compile(r'^type\s+(\w+)\s+struct\s*\{')
+_INTERFACE_RE = re.compile(r'^type\s+(\w+)\s+interface\s*\{')
+
+# Shared by every GoParser in the process
+_TS_LANG = None
+
+
+def _get_ts_language():
+    """Load the tree-sitter Go grammar once per process."""
+    global _TS_LANG
+    if _TS_LANG is None:
+        import tree_sitter_go as tsgo
+        from tree_sitter import Language as TSLanguage
+        
+        _TS_LANG = TSLanguage(tsgo.language())
+    return _TS_LANG
+
 
 class GoParser(CodeParser):
     """Parser for Go source files."""
@@ -21,16 +42,11 @@ class GoParser(CodeParser):
     def _init_parser(self) -> None:
         """Initialize tree-sitter Go parser."""
         try:
-            import tree_sitter_go as tsgo
-            from tree_sitter import Language as TSLanguage, Parser
-            
-            self.ts_language = TSLanguage(tsgo.language())
-            self.parser = Parser(self.ts_language)
+            self.ts_language = _get_ts_language()
             self._initialized = True
         except ImportError:
             logger.warning("tree-sitter-go not installed, using fallback parser")
             self._initialized = False
-            self.parser = None
     
     def parse_file(self, file_path: Path, repo_name: str) -> List[CodeEntity]:
         """Parse a Go file and extract functions and types."""
@@ -50,7 +66,7 @@ class GoParser(CodeParser):
         source_bytes = content.encode('utf-8')
         
         try:
-            tree = self.parser.parse(source_bytes)
+            tree = self._parse_incremental(self.parser, source_bytes, file_path, repo_name)
             root = tree.root_node
             
             self._extract_entities(root, source_bytes, file_path, repo_name, entities)
@@ -291,20 +307,12 @@ class GoParser(CodeParser):
         repo_name: str
     ) -> List[CodeEntity]:
         """Fallback regex-based parsing."""
-        import re
-        
         entities = []
         lines = content.split('\n')
         
-        # Patterns
-        func_pattern = re.compile(r'^func\s+(\w+)\s*\(([^)]*)\)\s*(\S.*)?{')
-        method_pattern = re.compile(r'^func\s+\((\w+)\s+\*?(\w+)\)\s+(\w+)\s*\(([^)]*)\)')
-        struct_pattern = re.compile(r'^type\s+(\w+)\s+struct\s*\{')
-        interface_pattern = re.compile(r'^type\s+(\w+)\s+interface\s*\{')
-        
         for i, line in enumerate(lines):
             # Function
-            func_match = func_pattern.match(line)
+            func_match = _FUNC_RE.match(line)
             if func_match:
                 name = func_match.group(1)
                 params = func_match.group(2)
@@ -324,7 +332,7 @@ class GoParser(CodeParser):
                 continue
             
             # Method
-            method_match = method_pattern.match(line)
+            method_match = _METHOD_RE.match(line)
             if method_match:
                 receiver_name = method_match.group(1)
                 receiver_type = method_match.group(2)
@@ -346,7 +354,7 @@ class GoParser(CodeParser):
                 continue
             
             # Struct
-            struct_match = struct_pattern.match(line)
+            struct_match = _STRUCT_RE.match(line)
             if struct_match:
                 name = struct_match.group(1)
                 entities.append(CodeEntity(
@@ -364,7 +372,7 @@ class GoParser(CodeParser):
                 continue
             
             # Interface
-            interface_match = interface_pattern.match(line)
+            interface_match = _INTERFACE_RE.match(line)
             if interface_match:
                 name = interface_match.group(1)
                 entities.append(CodeEntity(
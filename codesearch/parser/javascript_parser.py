@@ -2,8 +2,9 @@
 JavaScript/TypeScript AST parser using tree-sitter.
 """
 
+import re
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import structlog
 
 from .base import CodeParser
@@ -11,6 +12,53 @@ from ..models import CodeEntity, CodeEntityType, Language
 
 logger = structlog.get_logger()
 
+# Fallback parser patterns
+_FUNC_RE = re.compile(r'^\s*(?:export\s+)?(?:async\s+)?function\s+(\w+)\s*\(([^)]*)\)')
+_ARROW_RE = re.compile(r'^\s*(?:export\s+)?(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?\([^)]*\)\s*=>')
+_CLASS_RE = re.compile(r'^\s*(?:export\s+)?class\s+(\w+)(?:\s+extends\s+(\w+))?')
+_METHOD_RE = re.compile(r'^\s+(?:async\s+)?(\w+)\s*\([^)]*\)\s*\{')
+
+# Names and parameters of functions/methods, captured in one native pass
+SIGNATURE_QUERY = """
+(function_declaration
+  name: (identifier) @name
+  parameters: (formal_parameters) @params)
+(method_definition
+  name: (property_identifier) @name
+  parameters: (formal_parameters) @params)
+(formal_parameters (identifier) @param)
+(formal_parameters (rest_pattern (identifier) @rest_param))
+"""
+
+# Compiled queries per grammar, shared by every parser instance in the process
+_QUERIES: Dict[str, Dict[str, Any]] = {}
+
+# Shared by every JavaScriptParser in the process
+_TS_LANG = None
+
+
+def _get_ts_language():
+    """Load the tree-sitter JavaScript grammar once per process."""
+    global _TS_LANG
+    if _TS_LANG is None:
+        import tree_sitter_javascript as tsjs
+        from tree_sitter import Language as TSLanguage
+        
+        _TS_LANG = TSLanguage(tsjs.language())
+    return _TS_LANG
+
+
+def _get_queries(ts_language) -> Dict[str, Any]:
+    """Compile this module's queries once per grammar and cache them."""
+    key = getattr(ts_language, 'name', None) or 'javascript'
+    queries = _QUERIES.get(key)
+    if queries is None:
+        queries = {
+            'signatures': CodeParser._compile_query(ts_language, SIGNATURE_QUERY),
+        }
+        _QUERIES[key] = queries
+    return queries
+
 
 class JavaScriptParser(CodeParser):
     """Parser for JavaScript and TypeScript source files."""
@@ -21,16 +69,12 @@ class JavaScriptParser(CodeParser):
     def _init_parser(self) -> None:
         """Initialize tree-sitter JavaScript parser."""
         try:
-            import tree_sitter_javascript as tsjs
-            from tree_sitter import Language as TSLanguage, Parser
-            
-            self.ts_language = TSLanguage(tsjs.language())
-            self.parser = Parser(self.ts_language)
+            self.ts_language = _get_ts_language()
+            self.queries = _get_queries(self.ts_language)
             self._initialized = True
         except ImportError:
             logger.warning("tree-sitter-javascript not installed, using fallback parser")
             self._initialized = False
-            self.parser = None
     
     def parse_file(self, file_path: Path, repo_name: str) -> List[CodeEntity]:
         """Parse a JavaScript file and extract functions and classes."""
@@ -54,10 +98,11 @@ class JavaScriptParser(CodeParser):
         source_bytes = content.encode('utf-8')
         
         try:
-            tree = self.parser.parse(source_bytes)
+            tree = self._parse_incremental(self.parser, source_bytes, file_path, repo_name)
             root = tree.root_node
             
-            self._extract_entities(root, source_bytes, file_path, repo_name, lang, entities)
+            signatures = self._collect_signatures(root, source_bytes)
+            self._extract_entities(root, source_bytes, file_path, repo_name, lang, entities, signatures)
             
         except Exception as e:
             logger.error("Tree-sitter parsing failed", error=str(e))
@@ -65,6 +110,39 @@ class JavaScriptParser(CodeParser):
         
         return entities
     
+    def _collect_signatures(self, root, source_bytes: bytes) -> Dict[int, Tuple[str, List[str]]]:
+        """
+        Collect function/method names and parameters with a single query.
+        
+        Returns:
+            Map of declaration node id -> (name, parameters)
+        """
+        names: Dict[int, Tuple[str, int]] = {}
+        params: Dict[int, List[Tuple[int, str]]] = {}
+        
+        for _, captures in self._query_matches(self.queries['signatures'], root):
+            if 'name' in captures:
+                name_node = captures['name'][0]
+                names[name_node.parent.id] = (
+                    self._get_node_text(name_node, source_bytes),
+                    captures['params'][0].id
+                )
+            elif 'param' in captures:
+                node = captures['param'][0]
+                params.setdefault(node.parent.id, []).append(
+                    (node.start_byte, self._get_node_text(node, source_bytes))
+                )
+            elif 'rest_param' in captures:
+                node = captures['rest_param'][0]
+                params.setdefault(node.parent.parent.id, []).append(
+                    (node.start_byte, '...' + self._get_node_text(node, source_bytes))
+                )
+        
+        return {
+            decl_id: (name, [text for _, text in sorted(params.get(params_id, []))])
+            for decl_id, (name, params_id) in names.items()
+        }
+    
     def _extract_entities(
         self, 
         node, 
@@ -73,13 +151,14 @@ class JavaScriptParser(CodeParser):
         repo_name: str,
         lang: Language,
         entities: List[CodeEntity],
+        signatures: Dict[int, Tuple[str, List[str]]],
         parent_class: Optional[str] = None
     ) -> None:
         """Recursively extract code entities from AST."""
         
         # Function declarations
         if node.type == 'function_declaration':
-            entity = self._parse_function(node, source_bytes, file_path, repo_name, lang, parent_class)
+            entity = self._parse_function(node, source_bytes, file_path, repo_name, lang, signatures, parent_class)
             if entity:
                 entities.append(entity)
         
@@ -95,22 +174,22 @@ class JavaScriptParser(CodeParser):
             if class_entity:
                 entities.append(class_entity)
                 # Extract methods
-                self._extract_class_methods(node, source_bytes, file_path, repo_name, lang, entities, class_entity.name)
+                self._extract_class_methods(node, source_bytes, file_path, repo_name, lang, entities, signatures, class_entity.name)
         
         # Export statements
         elif node.type == 'export_statement':
             for child in node.children:
-                self._extract_entities(child, source_bytes, file_path, repo_name, lang, entities, parent_class)
+                self._extract_entities(child, source_bytes, file_path, repo_name, lang, entities, signatures, parent_class)
         
         # Method definitions (inside classes)
         elif node.type == 'method_definition' and parent_class:
-            entity = self._parse_method(node, source_bytes, file_path, repo_name, lang, parent_class)
+            entity = self._parse_method(node, source_bytes, file_path, repo_name, lang, signatures, parent_class)
             if entity:
                 entities.append(entity)
         
         else:
             for child in node.children:
-                self._extract_entities(child, source_bytes, file_path, repo_name, lang, entities, parent_class)
+                self._extract_entities(child, source_bytes, file_path, repo_name, lang, entities, signatures, parent_class)
     
     def _parse_function(
         self, 
@@ -119,25 +198,21 @@ class JavaScriptParser(CodeParser):
         file_path: str, 
         repo_name: str,
         lang: Language,
+        signatures: Dict[int, Tuple[str, List[str]]],
         parent_class: Optional[str] = None
     ) -> Optional[CodeEntity]:
         """Parse a function declaration."""
-        name = None
-        parameters = []
-        
-        for child in node.children:
-            if child.type == 'identifier':
-                name = self._get_node_text(child, source_bytes)
-            elif child.type == 'formal_parameters':
-                parameters = self._extract_parameters(child, source_bytes)
+        name, parameters = signatures.get(node.id, (None, []))
         
         if not name:
             return None
         
-        source_code = self._get_node_text(node, source_bytes)
         docstring = self._extract_jsdoc(node, source_bytes)
         
-        return CodeEntity(
+        return CodeEntity.from_source_span(
+            source_bytes,
+            node.start_byte,
+            node.end_byte,
             name=name,
             entity_type=CodeEntityType.METHOD if parent_class else CodeEntityType.FUNCTION,
             language=lang,
@@ -145,7 +220,6 @@ class JavaScriptParser(CodeParser):
             repo_name=repo_name,
             start_line=node.start_point[0] + 1,
             end_line=node.end_point[0] + 1,
-            source_code=source_code,
             docstring=docstring,
             signature=f"function {name}({', '.join(parameters)})",
             parameters=parameters,
@@ -184,9 +258,10 @@ class JavaScriptParser(CodeParser):
                 # Single parameter arrow function: x => x + 1
                 parameters = [self._get_node_text(child, source_bytes)]
         
-        source_code = self._get_node_text(node.parent, source_bytes)
-        
-        entities.append(CodeEntity(
+        entities.append(CodeEntity.from_source_span(
+            source_bytes,
+            node.parent.start_byte,
+            node.parent.end_byte,
             name=name,
             entity_type=CodeEntityType.FUNCTION,
             language=lang,
@@ -194,7 +269,6 @@ class JavaScriptParser(CodeParser):
             repo_name=repo_name,
             start_line=node.start_point[0] + 1,
             end_line=node.end_point[0] + 1,
-            source_code=source_code,
             signature=f"const {name} = ({', '.join(parameters)}) =>",
             parameters=parameters,
             complexity=self._calculate_complexity(func_node),
@@ -227,12 +301,14 @@ class JavaScriptParser(CodeParser):
         if not name:
             return None
         
-        source_code = self._get_node_text(node, source_bytes)
         signature = f"class {name}"
         if extends:
             signature += f" extends {extends}"
         
-        return CodeEntity(
+        return CodeEntity.from_source_span(
+            source_bytes,
+            node.start_byte,
+            node.end_byte,
             name=name,
             entity_type=CodeEntityType.CLASS,
             language=lang,
@@ -240,7 +316,6 @@ class JavaScriptParser(CodeParser):
             repo_name=repo_name,
             start_line=node.start_point[0] + 1,
             end_line=node.end_point[0] + 1,
-            source_code=source_code,
             signature=signature,
             parameters=[extends] if extends else [],
             complexity=self._calculate_complexity(node),
@@ -255,6 +330,7 @@ class JavaScriptParser(CodeParser):
         repo_name: str,
         lang: Language,
         entities: List[CodeEntity],
+        signatures: Dict[int, Tuple[str, List[str]]],
         class_name: str
     ) -> None:
         """Extract methods from a class body."""
@@ -262,7 +338,7 @@ class JavaScriptParser(CodeParser):
             if child.type == 'class_body':
                 for member in child.children:
                     if member.type == 'method_definition':
-                        entity = self._parse_method(member, source_bytes, file_path, repo_name, lang, class_name)
+                        entity = self._parse_method(member, source_bytes, file_path, repo_name, lang, signatures, class_name)
                         if entity:
                             entities.append(entity)
     
@@ -273,26 +349,22 @@ class JavaScriptParser(CodeParser):
         file_path: str, 
         repo_name: str,
         lang: Language,
+        signatures: Dict[int, Tuple[str, List[str]]],
         parent_class: str
     ) -> Optional[CodeEntity]:
         """Parse a method definition."""
-        name = None
-        parameters = []
+        name, parameters = signatures.get(node.id, (None, []))
         decorators = []
         
-        for child in node.children:
-            if child.type == 'property_identifier':
-                name = self._get_node_text(child, source_bytes)
-            elif child.type == 'formal_parameters':
-                parameters = self._extract_parameters(child, source_bytes)
-        
         if not name:
             return None
         
-        source_code = self._get_node_text(node, source_bytes)
         docstring = self._extract_jsdoc(node, source_bytes)
         
-        return CodeEntity(
+        return CodeEntity.from_source_span(
+            source_bytes,
+            node.start_byte,
+            node.end_byte,
             name=name,
             entity_type=CodeEntityType.METHOD,
             language=lang,
@@ -300,7 +372,6 @@ class JavaScriptParser(CodeParser):
             repo_name=repo_name,
             start_line=node.start_point[0] + 1,
             end_line=node.end_point[0] + 1,
-            source_code=source_code,
             docstring=docstring,
             signature=f"{name}({', '.join(parameters)})",
             parameters=parameters,
@@ -311,7 +382,12 @@ class JavaScriptParser(CodeParser):
         )
     
     def _extract_parameters(self, params_node, source_bytes: bytes) -> List[str]:
-        """Extract parameter names from formal_parameters node."""
+        """
+        Extract parameter names from formal_parameters node.
+        
+        Declarations and methods get their parameters from SIGNATURE_QUERY;
+        this walk is only used for function expressions assigned to variables.
+        """
         params = []
         for child in params_node.children:
             if child.type == 'identifier':
@@ -363,25 +439,17 @@ class JavaScriptParser(CodeParser):
         repo_name: str
     ) -> List[CodeEntity]:
         """Fallback regex-based parsing."""
-        import re
-        
         is_ts = file_path.endswith('.ts') or file_path.endswith('.tsx')
         lang = Language.TYPESCRIPT if is_ts else Language.JAVASCRIPT
         
         entities = []
         lines = content.split('\n')
         
-        # Patterns
-        func_pattern = re.compile(r'^\s*(?:export\s+)?(?:async\s+)?function\s+(\w+)\s*\(([^)]*)\)')
-        arrow_pattern = re.compile(r'^\s*(?:export\s+)?(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?\([^)]*\)\s*=>')
-        class_pattern = re.compile(r'^\s*(?:export\s+)?class\s+(\w+)(?:\s+extends\s+(\w+))?')
-        method_pattern = re.compile(r'^\s+(?:async\s+)?(\w+)\s*\([^)]*\)\s*\{')
-        
         current_class = None
         
         for i, line in enumerate(lines):
             # Class
-            class_match = class_pattern.match(line)
+            class_match = _CLASS_RE.match(line)
             if class_match:
                 current_class = class_match.group(1)
                 extends = class_match.group(2)
@@ -400,7 +468,7 @@ class JavaScriptParser(CodeParser):
                 continue
             
             # Function
-            func_match = func_pattern.match(line)
+            func_match = _FUNC_RE.match(line)
             if func_match:
                 name = func_match.group(1)
                 params = func_match.group(2)
@@ -419,7 +487,7 @@ class JavaScriptParser(CodeParser):
                 continue
             
             # Arrow function
-            arrow_match = arrow_pattern.match(line)
+            arrow_match = _ARROW_RE.match(line)
             if arrow_match:
                 name = arrow_match.group(1)
                 entities.append(CodeEntity(
@@ -438,7 +506,7 @@ class JavaScriptParser(CodeParser):
             
             # Method (inside class)
             if current_class:
-                method_match = method_pattern.match(line)
+                method_match = _METHOD_RE.match(line)
                 if method_match:
                     name = method_match.group(1)
                     if name not in ('if', 'for', 'while', 'switch', 'catch'):
@@ -2,15 +2,77 @@
 Python-specific AST parser using tree-sitter.
 """
 
+import functools
+import hashlib
+import os
+import pickle
+import re
+import sys
+import threading
+import time
 from pathlib import Path
 from typing import List, Optional, Tuple
 import structlog
 
 from .base import CodeParser
 from ..models import CodeEntity, CodeEntityType, Language
+from ..config import settings
 
 logger = structlog.get_logger()
 
+# Fallback parser patterns for functions and classes
+_FUNC_RE = re.compile(r'^(\s*)def\s+(\w+)\s*\(([^)]*)\)')
+_CLASS_RE = re.compile(r'^(\s*)class\s+(\w+)(?:\s*\(([^)]*)\))?')
+
+# Part of every on-disk cache path; bump when extraction or the pickled
+# CodeEntity fields change so stale entities are re-parsed
+CACHE_VERSION = 1
+
+# Cached entities unused for this long are deleted, checked at most once per
+# CACHE_PRUNE_INTERVAL by a process writing to the cache (reads refresh an
+# entry's mtime, so files still being parsed stay)
+CACHE_MAX_AGE = 30 * 24 * 3600.0
+CACHE_PRUNE_INTERVAL = 3600.0
+
+_last_prune: Optional[float] = None
+_prune_lock = threading.Lock()
+
+# Shared by every PythonParser in the process
+_TS_LANG = None
+
+
+def _get_ts_language():
+    """Load the tree-sitter Python language once per process."""
+    global _TS_LANG
+    if _TS_LANG is None:
+        import tree_sitter_python as tspython
+        from tree_sitter import Language as TSLanguage
+        
+        _TS_LANG = TSLanguage(tspython.language())
+    return _TS_LANG
+
+
+def _prune_cache(root: Path) -> None:
+    """Delete cache files under root last used more than CACHE_MAX_AGE ago."""
+    global _last_prune
+    with _prune_lock:
+        now = time.monotonic()
+        if _last_prune is not None and now - _last_prune < CACHE_PRUNE_INTERVAL:
+            return
+        _last_prune = now
+    
+    cutoff = time.time() - CACHE_MAX_AGE
+    removed = 0
+    for path in root.rglob("*"):
+        try:
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError:
+            pass  # Removed by another process, or not ours to remove
+    if removed:
+        logger.debug("Pruned parse cache", removed=removed)
+
 
 class PythonParser(CodeParser):
     """Parser for Python source files."""
@@ -18,44 +80,109 @@ class PythonParser(CodeParser):
     language = Language.PYTHON
     file_extensions = ['.py', '.pyw']
     
+    def __init__(self, reuse_trees: bool = False):
+        super().__init__(reuse_trees)
+        # Keyed by (path, mtime_ns, size, repo) so edited files miss naturally
+        self._parse_cached = functools.lru_cache(maxsize=4096)(self._parse_file_uncached)
+    
     def _init_parser(self) -> None:
         """Initialize tree-sitter Python parser."""
         try:
-            import tree_sitter_python as tspython
-            from tree_sitter import Language as TSLanguage, Parser
-            
-            self.ts_language = TSLanguage(tspython.language())
-            self.parser = Parser(self.ts_language)
+            self.ts_language = _get_ts_language()
             self._initialized = True
         except ImportError:
             logger.warning("tree-sitter-python not installed, using fallback parser")
             self._initialized = False
-            self.parser = None
     
     def parse_file(self, file_path: Path, repo_name: str) -> List[CodeEntity]:
-        """Parse a Python file and extract functions and classes."""
+        """
+        Parse a Python file and extract functions and classes.
+        
+        Returns copies of the cached entities (with their own list fields),
+        so callers may mutate them without changing what later calls get.
+        """
         try:
-            content = file_path.read_text(encoding='utf-8', errors='replace')
-            return self.parse_content(content, str(file_path), repo_name)
+            st = file_path.stat()
+            return [
+                entity.model_copy(update={
+                    "parameters": list(entity.parameters),
+                    "decorators": list(entity.decorators),
+                })
+                for entity in self._parse_cached(str(file_path), st.st_mtime_ns, st.st_size, repo_name)
+            ]
         except Exception as e:
             logger.error("Failed to parse file", file=str(file_path), error=str(e))
             return []
     
+    def _parse_file_uncached(
+        self,
+        file_path: str,
+        mtime_ns: int,
+        size: int,
+        repo_name: str
+    ) -> Tuple[CodeEntity, ...]:
+        """
+        Parse a file, consulting the on-disk cache before tree-sitter.
+        
+        The disk cache is keyed by CACHE_VERSION, the parser mode
+        (tree-sitter or regex fallback) and the SHA1 of the repository,
+        path and content, so it survives across runs and still hits when a
+        file is touched without being changed. Entries unused for
+        CACHE_MAX_AGE are pruned.
+        """
+        data = Path(file_path).read_bytes()
+        key = (file_path, repo_name)
+        digest = hashlib.sha1(f"{repo_name}\0{file_path}\0".encode() + data).hexdigest()
+        mode = "ts" if self._initialized else "regex"
+        cache_root = settings.cache_path / "entities"
+        cache_file = cache_root / f"v{CACHE_VERSION}-{mode}" / digest[:2] / f"{digest}.pkl"
+        
+        try:
+            with open(cache_file, 'rb') as f:
+                cached_key, entities = pickle.load(f)
+            if cached_key == key:
+                os.utime(cache_file)  # Mark as recently used for pruning
+                return entities
+        except Exception:
+            pass  # Missing or unreadable cache entry
+        
+        content = data.decode('utf-8', errors='replace')
+        entities = tuple(self.parse_content(content, file_path, repo_name))
+        
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_file, 'wb') as f:
+                pickle.dump((key, entities), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            logger.debug("Failed to write parse cache", file=file_path, error=str(e))
+        else:
+            _prune_cache(cache_root)
+        
+        return entities
+    
     def parse_content(self, content: str, file_path: str, repo_name: str) -> List[CodeEntity]:
         """Parse Python source code and extract entities."""
         if not self._initialized:
             return self._fallback_parse(content, file_path, repo_name)
         
-        entities = []
         source_bytes = content.encode('utf-8')
+        # Every entity from this file shares one copy of these strings
+        file_path = sys.intern(file_path)
+        repo_name = sys.intern(repo_name)
         
         try:
-            tree = self.parser.parse(source_bytes)
-            root = tree.root_node
-            
-            # Extract functions and classes
-            entities.extend(self._extract_functions(root, source_bytes, file_path, repo_name))
-            entities.extend(self._extract_classes(root, source_bytes, file_path, repo_name))
+            parser = self.parser
+            try:
+                tree = self._parse_incremental(parser, source_bytes, file_path, repo_name)
+                # Extract functions and classes in a single traversal, slicing
+                # node text out of one shared buffer
+                entities = self._extract_all(
+                    tree.root_node, memoryview(source_bytes), file_path, repo_name
+                )
+            finally:
+                parser.reset()
             
         except Exception as e:
             logger.error("Tree-sitter parsing failed", error=str(e))
@@ -63,85 +190,112 @@ class PythonParser(CodeParser):
         
         return entities
     
-    def _extract_functions(
+    def _extract_all(
         self, 
         root_node, 
-        source_bytes: bytes, 
+        source_bytes: memoryview, 
         file_path: str, 
-        repo_name: str,
-        parent_class: Optional[str] = None
+        repo_name: str
     ) -> List[CodeEntity]:
-        """Extract function definitions from AST."""
+        """
+        Extract function and class definitions from AST in one pass.
+        
+        Walks the tree with a TreeCursor rather than recursing through
+        ``node.children``, tracking the enclosing class per cursor depth so
+        methods and nested classes get their parent without a second pass.
+        Functions nested in other functions are not indexed; classes are,
+        unless they are defined inside a method.
+        """
         entities = []
+        cursor = root_node.walk()
         
-        def visit(node, current_class=None):
-            if node.type == 'function_definition':
-                entity = self._parse_function_node(
-                    node, source_bytes, file_path, repo_name, current_class
-                )
-                if entity:
-                    entities.append(entity)
+        # (enclosing class name, inside a class, inside a function) for the
+        # cursor's current depth, plus one saved entry per ancestor
+        context = (None, False, False)
+        saved = []
+        while True:
+            node = cursor.node
+            node_type = node.type
+            current_class, in_class, in_function = context
+            descend = True
             
-            elif node.type == 'class_definition':
-                # Get class name for methods
-                class_name = None
-                for child in node.children:
-                    if child.type == 'identifier':
-                        class_name = self._get_node_text(child, source_bytes)
-                        break
-                
-                # Visit class body for methods
-                for child in node.children:
-                    if child.type == 'block':
-                        for stmt in child.children:
-                            visit(stmt, class_name)
-            else:
-                for child in node.children:
-                    visit(child, current_class)
-        
-        visit(root_node, parent_class)
-        return entities
+            if node_type == 'function_definition':
+                if not in_function:
+                    entity = self._parse_function_node(
+                        node, source_bytes, file_path, repo_name, current_class
+                    )
+                    if entity:
+                        entities.append(entity)
+                # Keep descending only to find classes defined inside the function
+                in_function = True
+            
+            elif node_type == 'class_definition':
+                if in_class and in_function:
+                    descend = False
+                else:
+                    entity = self._parse_class_node(
+                        node, source_bytes, file_path, repo_name, current_class
+                    )
+                    if entity:
+                        entities.append(entity)
+                    name_node = node.child_by_field_name('name')
+                    current_class = self._get_identifier_text(name_node, source_bytes) if name_node else None
+                    in_class = True
+            
+            elif in_class and in_function:
+                descend = False
+            
+            if descend and cursor.goto_first_child():
+                saved.append(context)
+                context = (current_class, in_class, in_function)
+                continue
+            
+            # Move on to the next sibling, climbing back up as needed
+            while not cursor.goto_next_sibling():
+                if not saved:
+                    return entities
+                cursor.goto_parent()
+                context = saved.pop()
     
     def _parse_function_node(
         self, 
         node, 
-        source_bytes: bytes, 
+        source_bytes: memoryview, 
         file_path: str, 
         repo_name: str,
         parent_class: Optional[str] = None
     ) -> Optional[CodeEntity]:
         """Parse a function_definition node into a CodeEntity."""
-        name = None
-        parameters = []
-        return_type = None
         decorators = []
         
         # Extract function components
-        for child in node.children:
-            if child.type == 'identifier':
-                name = self._get_node_text(child, source_bytes)
-            elif child.type == 'parameters':
-                parameters = self._extract_parameters(child, source_bytes)
-            elif child.type == 'type':
-                return_type = self._get_node_text(child, source_bytes)
+        name_node = node.child_by_field_name('name')
+        params_node = node.child_by_field_name('parameters')
+        ret_node = node.child_by_field_name('return_type')
+        
+        name = self._get_identifier_text(name_node, source_bytes) if name_node else None
+        parameters = self._extract_parameters(params_node, source_bytes) if params_node else []
+        return_type = self._get_node_text(ret_node, source_bytes) if ret_node else None
         
         # Get decorators (look at previous siblings)
         prev = node.prev_sibling
         while prev and prev.type == 'decorator':
-            dec_text = self._get_node_text(prev, source_bytes)
-            decorators.insert(0, dec_text)
+            decorators.append(sys.intern(self._get_node_text(prev, source_bytes)))
             prev = prev.prev_sibling
+        decorators.reverse()
         
         if not name:
             return None
         
-        source_code = self._get_node_text(node, source_bytes)
         docstring = self._extract_python_docstring(node, source_bytes)
         signature = self._build_signature(name, parameters, return_type)
         
         entity_type = CodeEntityType.METHOD if parent_class else CodeEntityType.FUNCTION
         
-        return CodeEntity(
+        return CodeEntity.from_source_span(
+            source_bytes.obj,
+            node.start_byte,
+            node.end_byte,
             name=name,
             entity_type=entity_type,
             language=Language.PYTHON,
@@ -149,7 +303,6 @@ class PythonParser(CodeParser):
             repo_name=repo_name,
             start_line=node.start_point[0] + 1,
             end_line=node.end_point[0] + 1,
-            source_code=source_code,
             docstring=docstring,
             signature=signature,
             parameters=parameters,
@@ -160,66 +313,45 @@ class PythonParser(CodeParser):
             loc=node.end_point[0] - node.start_point[0] + 1
         )
     
-    def _extract_classes(
-        self, 
-        root_node, 
-        source_bytes: bytes, 
-        file_path: str, 
-        repo_name: str
-    ) -> List[CodeEntity]:
-        """Extract class definitions from AST."""
-        entities = []
-        
-        def visit(node):
-            if node.type == 'class_definition':
-                entity = self._parse_class_node(node, source_bytes, file_path, repo_name)
-                if entity:
-                    entities.append(entity)
-                # Don't recurse into class body (nested classes handled separately if needed)
-                return
-            
-            for child in node.children:
-                visit(child)
-        
-        visit(root_node)
-        return entities
-    
     def _parse_class_node(
         self, 
         node, 
-        source_bytes: bytes, 
+        source_bytes: memoryview, 
         file_path: str, 
-        repo_name: str
+        repo_name: str,
+        parent_class: Optional[str] = None
     ) -> Optional[CodeEntity]:
         """Parse a class_definition node into a CodeEntity."""
-        name = None
         decorators = []
         bases = []
         
-        for child in node.children:
-            if child.type == 'identifier':
-                name = self._get_node_text(child, source_bytes)
-            elif child.type == 'argument_list':
-                # Base classes
-                for arg in child.children:
-                    if arg.type == 'identifier':
-                        bases.append(self._get_node_text(arg, source_bytes))
+        name_node = node.child_by_field_name('name')
+        name = self._get_identifier_text(name_node, source_bytes) if name_node else None
+        
+        # Base classes
+        superclasses = node.child_by_field_name('superclasses')
+        if superclasses:
+            for arg in superclasses.children:
+                if arg.type == 'identifier':
+                    bases.append(self._get_identifier_text(arg, source_bytes))
         
         # Get decorators
         prev = node.prev_sibling
         while prev and prev.type == 'decorator':
-            dec_text = self._get_node_text(prev, source_bytes)
-            decorators.insert(0, dec_text)
+            decorators.append(sys.intern(self._get_node_text(prev, source_bytes)))
             prev = prev.prev_sibling
+        decorators.reverse()
         
         if not name:
             return None
         
-        source_code = self._get_node_text(node, source_bytes)
         docstring = self._extract_python_docstring(node, source_bytes)
         signature = f"class {name}" + (f"({', '.join(bases)})" if bases else "")
         
-        return CodeEntity(
+        return CodeEntity.from_source_span(
+            source_bytes.obj,
+            node.start_byte,
+            node.end_byte,
             name=name,
             entity_type=CodeEntityType.CLASS,
             language=Language.PYTHON,
@@ -227,53 +359,70 @@ class PythonParser(CodeParser):
             repo_name=repo_name,
             start_line=node.start_point[0] + 1,
             end_line=node.end_point[0] + 1,
-            source_code=source_code,
             docstring=docstring,
             signature=signature,
             parameters=bases,  # Store base classes in parameters
             decorators=decorators,
+            parent_class=parent_class,
             complexity=self._calculate_complexity(node),
             loc=node.end_point[0] - node.start_point[0] + 1
         )
     
-    def _extract_parameters(self, params_node, source_bytes: bytes) -> List[str]:
+    def _extract_parameters(self, params_node, source_bytes: memoryview) -> List[str]:
         """Extract parameter names from a parameters node."""
         params = []
         for child in params_node.children:
             if child.type == 'identifier':
-                params.append(self._get_node_text(child, source_bytes))
-            elif child.type in ('default_parameter', 'typed_parameter', 'typed_default_parameter'):
-                # Get the parameter name from compound parameter types
+                params.append(self._get_identifier_text(child, source_bytes))
+            elif child.type in ('default_parameter', 'typed_default_parameter'):
+                name_node = child.child_by_field_name('name')
+                if name_node and name_node.type == 'identifier':
+                    params.append(self._get_identifier_text(name_node, source_bytes))
+            elif child.type == 'typed_parameter':
+                # typed_parameter has no name field; the name is its first identifier
                 for subchild in child.children:
                     if subchild.type == 'identifier':
-                        params.append(self._get_node_text(subchild, source_bytes))
+                        params.append(self._get_identifier_text(subchild, source_bytes))
                         break
             elif child.type == 'list_splat_pattern':  # *args
                 for subchild in child.children:
                     if subchild.type == 'identifier':
-                        params.append('*' + self._get_node_text(subchild, source_bytes))
+                        params.append(sys.intern('*' + self._get_identifier_text(subchild, source_bytes)))
                         break
             elif child.type == 'dictionary_splat_pattern':  # **kwargs
                 for subchild in child.children:
                     if subchild.type == 'identifier':
-                        params.append('**' + self._get_node_text(subchild, source_bytes))
+                        params.append(sys.intern('**' + self._get_identifier_text(subchild, source_bytes)))
                         break
         return params
     
-    def _extract_python_docstring(self, node, source_bytes: bytes) -> Optional[str]:
+    def _get_identifier_text(self, node, source_bytes: memoryview) -> str:
+        """
+        Extract an identifier, skipping UTF-8 validation for ASCII names.
+        
+        Identifiers are interned: names like ``self``, ``cls`` and common
+        base classes repeat across thousands of entities.
+        """
+        chunk = source_bytes[node.start_byte:node.end_byte]
+        try:
+            return sys.intern(str(chunk, 'ascii'))
+        except UnicodeDecodeError:
+            return sys.intern(str(chunk, 'utf-8', 'replace'))
+    
+    def _extract_python_docstring(self, node, source_bytes: memoryview) -> Optional[str]:
         """Extract docstring from a Python function or class."""
-        # Find the block/body
-        for child in node.children:
-            if child.type == 'block':
-                # First statement in block might be docstring
-                for stmt in child.children:
-                    if stmt.type == 'expression_statement':
-                        for expr in stmt.children:
-                            if expr.type == 'string':
-                                docstring = self._get_node_text(expr, source_bytes)
-                                # Clean up the docstring
-                                return docstring.strip('"""\'\'\'').strip()
-                    break  # Only check first statement
+        body = node.child_by_field_name('body')
+        if body is None or body.child_count == 0:
+            return None
+        
+        # Only the first statement in the body can be a docstring
+        first = body.children[0]
+        if first.type == 'expression_statement' and first.child_count > 0:
+            expr = first.children[0]
+            if expr.type == 'string':
+                docstring = self._get_node_text(expr, source_bytes)
+                # Clean up the docstring
+                return docstring.strip('"""\'\'\'').strip()
         return None
     
     def _build_signature(
@@ -283,10 +432,18 @@ class PythonParser(CodeParser):
         return_type: Optional[str]
     ) -> str:
         """Build a function signature string."""
-        sig = f"def {name}({', '.join(params)})"
+        # Assemble all pieces and join once instead of concatenating twice
+        parts = ['def ', name, '(']
+        if params:
+            parts.append(params[0])
+            for param in params[1:]:
+                parts.append(', ')
+                parts.append(param)
+        parts.append(')')
         if return_type:
-            sig += f" -> {return_type}"
-        return sig
+            parts.append(' -> ')
+            parts.append(return_type)
+        return ''.join(parts)
     
     def _fallback_parse(
         self, 
@@ -295,21 +452,40 @@ class PythonParser(CodeParser):
         repo_name: str
     ) -> List[CodeEntity]:
         """Fallback regex-based parsing when tree-sitter isn't available."""
-        import re
-        
         entities = []
-        lines = content.split('\n')
         
-        # Simple regex patterns for functions and classes
-        func_pattern = re.compile(r'^(\s*)def\s+(\w+)\s*\(([^)]*)\)')
-        class_pattern = re.compile(r'^(\s*)class\s+(\w+)(?:\s*\(([^)]*)\))?')
+        # Offsets of each line start; line j is content[starts[j]:starts[j + 1] - 1]
+        line_starts = [0]
+        pos = content.find('\n')
+        while pos != -1:
+            line_starts.append(pos + 1)
+            pos = content.find('\n', pos + 1)
+        line_starts.append(len(content) + 1)
+        num_lines = len(line_starts) - 1
+        
+        # Indentation of every line in one pass, -1 for blank lines, so body
+        # scans below are plain list lookups
+        indents = []
+        for k in range(num_lines):
+            line = content[line_starts[k]:line_starts[k + 1] - 1]
+            stripped_len = len(line.lstrip())
+            indents.append(len(line) - stripped_len if stripped_len else -1)
         
         current_class = None
         class_indent = 0
         
-        for i, line in enumerate(lines):
-            # Check for class definition
-            class_match = class_pattern.match(line)
+        for i in range(num_lines):
+            if indents[i] == -1:
+                continue
+            
+            # Comment lines can't open a definition or leave a class
+            line = content[line_starts[i]:line_starts[i + 1] - 1]
+            stripped = line[indents[i]:]
+            if stripped[0] == '#':
+                continue
+            
+            # Only run the regexes on lines that could start a definition
+            class_match = _CLASS_RE.match(line) if stripped.startswith('class') else None
             if class_match:
                 indent = len(class_match.group(1))
                 name = class_match.group(2)
@@ -334,7 +510,7 @@ class PythonParser(CodeParser):
                 continue
             
             # Check for function definition
-            func_match = func_pattern.match(line)
+            func_match = _FUNC_RE.match(line) if stripped.startswith('def') else None
             if func_match:
                 indent = len(func_match.group(1))
                 name = func_match.group(2)
@@ -350,25 +526,22 @@ class PythonParser(CodeParser):
                 # Extract full function body
                 func_start = i
                 func_end = i
-                func_lines = [line]
+                body_end = i
                 
                 # Find the end of the function by tracking indentation
-                for j in range(i + 1, len(lines)):
-                    next_line = lines[j]
-                    if not next_line.strip():  # Empty line, continue
-                        func_lines.append(next_line)
+                for j in range(i + 1, num_lines):
+                    next_indent = indents[j]
+                    if next_indent == -1:  # Empty line, continue
+                        body_end = j
                         continue
                     
-                    next_indent = len(next_line) - len(next_line.lstrip())
-                    
                     # If we hit a line at same or less indent (and not empty), function ended
-                    if next_indent <= indent and next_line.strip():
+                    if next_indent <= indent:
                         break
                     
-                    func_lines.append(next_line)
-                    func_end = j
+                    func_end = body_end = j
                 
-                full_source = '\n'.join(func_lines)
+                full_source = content[line_starts[func_start]:line_starts[body_end + 1] - 1]
                 
                 entities.append(CodeEntity(
                     name=name,
@@ -386,9 +559,8 @@ class PythonParser(CodeParser):
                 ))
             
             # Reset class context if we're back at module level
-            if line.strip() and not line.startswith(' ') and not line.startswith('\t'):
-                if not class_match:
-                    current_class = None
+            if not line.startswith(' ') and not line.startswith('\t'):
+                current_class = None
         
         return entities
 
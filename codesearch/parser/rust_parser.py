@@ -2,15 +2,193 @@
 Rust AST parser using tree-sitter.
 """
 
+import hashlib
+import os
+import pickle
+import queue
+import re
+import sqlite3
+import sys
+import threading
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import structlog
 
 from .base import CodeParser
 from ..models import CodeEntity, CodeEntityType, Language
+from ..config import settings
 
 logger = structlog.get_logger()
 
+# Fallback parser pattern: one alternation covering fn/struct/enum/trait
+# definitions, (unindented) impl blocks and the unindented `}` closing an
+# impl, scanned over the whole file. [^\S\n] and the \n exclusions keep
+# every match on a single line.
+_DEFINITION_RE = re.compile(
+    r'^(?:(?P<close>(?:[^\S\n ][^\S\n]*)?\}[^\S\n]*$)'
+    r'|(?P<indent>[^\S\n]*)(?:'
+    r'(?P<pub>pub[^\S\n]+)?(?:'
+    r'(?P<async>async[^\S\n]+)?fn[^\S\n]+(?P<fname>\w+)[^\S\n]*(?:<[^>\n]*>)?[^\S\n]*'
+    r'\((?P<params>[^)\n]*)\)'
+    r'|struct[^\S\n]+(?P<sname>\w+)'
+    r'|enum[^\S\n]+(?P<ename>\w+)'
+    r'|trait[^\S\n]+(?P<tname>\w+))'
+    r'|impl[^\S\n]*(?:<[^>\n]*>[^\S\n]*)?(?P<iname>\w+)))',
+    re.MULTILINE
+)
+
+# Opcodes of the flat definition program built by _compile_definitions
+OP_FUNCTION, OP_STRUCT, OP_ENUM, OP_TRAIT = range(4)
+_CAPTURE_OPS = {
+    'function': OP_FUNCTION,
+    'struct': OP_STRUCT,
+    'enum': OP_ENUM,
+    'trait': OP_TRAIT,
+}
+
+# Node kinds that add a path through a function, as (kind, is_named)
+BRANCH_KINDS = (
+    ('if_expression', True),
+    ('match_arm', True),
+    ('while_expression', True),
+    ('for_expression', True),
+    ('loop_expression', True),
+    ('&&', False),
+    ('||', False),
+)
+
+# Idle tree-sitter parsers shared by every RustParser in the process, so
+# threads reuse a parser (and its internal buffers) instead of building one
+_PARSER_POOL: "queue.LifoQueue" = queue.LifoQueue(maxsize=os.cpu_count() or 1)
+
+# Every node kind that yields an entity, plus impl blocks for method owners
+DEFINITION_QUERY = """
+(function_item) @function
+(struct_item) @struct
+(enum_item) @enum
+(trait_item) @trait
+(impl_item) @impl
+"""
+
+# Grammar and compiled DEFINITION_QUERY, shared by every RustParser in the
+# process; compiling the query dominates constructing a parser
+_TS_LANG = None
+_DEFINITION_QUERY = None
+
+
+def _get_ts_language():
+    """Load the tree-sitter Rust grammar and compile its query once per process."""
+    global _TS_LANG, _DEFINITION_QUERY
+    if _TS_LANG is None:
+        import tree_sitter_rust as tsrust
+        from tree_sitter import Language as TSLanguage
+        
+        ts_language = TSLanguage(tsrust.language())
+        _DEFINITION_QUERY = CodeParser._compile_query(ts_language, DEFINITION_QUERY)
+        _TS_LANG = ts_language
+    return _TS_LANG
+
+
+class _EntityCache:
+    """
+    Persistent cache of parsed entities keyed by (path, SHA-256 of content).
+    
+    Backed by a single SQLite database in WAL mode so several indexer
+    processes can share it. A matching mtime skips even the hash. Each
+    process opens its own connection on first use, so a connection is never
+    carried across a fork.
+    """
+    
+    def __init__(self, db_path: Path, version: int):
+        self.db_path = db_path
+        self.version = version
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+    
+    def _lock_for_process(self) -> threading.Lock:
+        """Return the lock, dropping state inherited from a parent process."""
+        if self._pid != os.getpid():
+            # A forked child must not touch the parent's connection (or a
+            # lock some parent thread may have held at fork time)
+            self._conn = None
+            self._lock = threading.Lock()
+            self._pid = os.getpid()
+        return self._lock
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entities ("
+                "path TEXT, repo TEXT, mtime_ns INTEGER, sha256 BLOB, "
+                "version INTEGER, entities BLOB, PRIMARY KEY (path, repo))"
+            )
+            self._conn = conn
+        return self._conn
+    
+    def get(
+        self,
+        path: str,
+        repo_name: str,
+        mtime_ns: int,
+        digest_fn
+    ) -> Optional[List[CodeEntity]]:
+        """
+        Look up cached entities for a file.
+        
+        Args:
+            path: File path
+            repo_name: Repository the entities belong to
+            mtime_ns: Current modification time of the file
+            digest_fn: Callable returning the file's SHA-256, only invoked
+                when the mtime doesn't match
+            
+        Returns:
+            Cached entities, or None on a miss
+        """
+        with self._lock_for_process():
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT mtime_ns, sha256, entities FROM entities "
+                "WHERE path = ? AND repo = ? AND version = ?",
+                (path, repo_name, self.version)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            cached_mtime, cached_digest, blob = row
+            if cached_mtime != mtime_ns:
+                if cached_digest != digest_fn():
+                    return None
+                # Touched but unchanged: remember the new mtime
+                conn.execute(
+                    "UPDATE entities SET mtime_ns = ? WHERE path = ? AND repo = ?",
+                    (mtime_ns, path, repo_name)
+                )
+                conn.commit()
+        return pickle.loads(blob)
+    
+    def put(
+        self,
+        path: str,
+        repo_name: str,
+        mtime_ns: int,
+        digest: bytes,
+        entities: List[CodeEntity]
+    ) -> None:
+        """Store the entities parsed from a file."""
+        blob = pickle.dumps(entities, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock_for_process():
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?, ?, ?)",
+                (path, repo_name, mtime_ns, digest, self.version, blob)
+            )
+            conn.commit()
+
 
 class RustParser(CodeParser):
     """Parser for Rust source files."""
@@ -18,31 +196,104 @@ class RustParser(CodeParser):
     language = Language.RUST
     file_extensions = ['.rs']
     
+    # Bump when extraction changes so cached entities are re-parsed
+    cache_version = 2
+    
+    # Items declared inside function bodies (helper fns, local structs) are
+    # rarely worth indexing; set to True to extract them anyway
+    index_nested_items = False
+    
     def _init_parser(self) -> None:
         """Initialize tree-sitter Rust parser."""
         try:
-            import tree_sitter_rust as tsrust
-            from tree_sitter import Language as TSLanguage, Parser
+            from tree_sitter import Parser
             
-            self.ts_language = TSLanguage(tsrust.language())
-            self.parser = Parser(self.ts_language)
+            self.ts_language = _get_ts_language()
+            self._parser_class = Parser
+            self._query = _DEFINITION_QUERY
+            self._branch_kind_ids = frozenset(
+                kind_id for kind_id in (
+                    self.ts_language.id_for_node_kind(kind, named)
+                    for kind, named in BRANCH_KINDS
+                ) if kind_id
+            )
+            
+            # Integer kind ids for the child-node checks in the builders
+            kind_id = self.ts_language.id_for_node_kind
+            self._k_identifier = kind_id('identifier', True)
+            self._k_type_identifier = kind_id('type_identifier', True)
+            self._k_generic_type = kind_id('generic_type', True)
+            self._k_parameters = kind_id('parameters', True)
+            self._k_visibility = kind_id('visibility_modifier', True)
+            self._k_async = kind_id('async', False)
+            self._k_attribute = kind_id('attribute_item', True)
+            self._param_kind_ids = frozenset(
+                (kind_id('parameter', True), kind_id('self_parameter', True))
+            )
+            self._comment_kind_ids = frozenset(
+                (kind_id('line_comment', True), kind_id('block_comment', True))
+            )
+            # Neither kind exists in current grammars (the return type hangs off
+            # a field instead), so these ids are usually None and never match
+            self._return_kind_ids = frozenset(
+                (kind_id('return_type', True), kind_id('type', True))
+            ) - {None}
             self._initialized = True
         except ImportError:
             logger.warning("tree-sitter-rust not installed, using fallback parser")
             self._initialized = False
-            self.parser = None
+        
+        # v2: rows keyed by (path, repo), so one checkout indexed under two
+        # repo names keeps both entries
+        self._cache = _EntityCache(
+            settings.cache_path / "rust_entities_v2.sqlite3", self.cache_version
+        )
     
     def parse_file(self, file_path: Path, repo_name: str) -> List[CodeEntity]:
         """Parse a Rust file and extract functions and types."""
         try:
-            content = file_path.read_text(encoding='utf-8', errors='replace')
-            return self.parse_content(content, str(file_path), repo_name)
+            path = str(file_path)
+            mtime_ns = file_path.stat().st_mtime_ns
+            data = None
+            sha256 = None
+            
+            def digest() -> bytes:
+                # Read and hashed at most once, whether by the lookup or the store
+                nonlocal data, sha256
+                if sha256 is None:
+                    if data is None:
+                        data = file_path.read_bytes()
+                    sha256 = hashlib.sha256(data).digest()
+                return sha256
+            
+            try:
+                cached = self._cache.get(path, repo_name, mtime_ns, digest)
+                if cached is not None:
+                    return cached
+            except (sqlite3.Error, pickle.UnpicklingError) as e:
+                logger.debug("Entity cache lookup failed", file=path, error=str(e))
+            
+            if data is None:
+                data = file_path.read_bytes()
+            content = data.decode('utf-8', errors='replace')
+            entities = self.parse_content(content, path, repo_name)
+            
+            try:
+                self._cache.put(path, repo_name, mtime_ns, digest(), entities)
+            except (sqlite3.Error, OSError) as e:
+                logger.debug("Entity cache write failed", file=path, error=str(e))
+            
+            return entities
         except Exception as e:
             logger.error("Failed to parse file", file=str(file_path), error=str(e))
             return []
     
     def parse_content(self, content: str, file_path: str, repo_name: str) -> List[CodeEntity]:
         """Parse Rust source code and extract entities."""
+        # Every entity from this file shares one copy of these strings
+        file_path = sys.intern(file_path)
+        repo_name = sys.intern(repo_name)
+        
         if not self._initialized:
             return self._fallback_parse(content, file_path, repo_name)
         
@@ -50,10 +301,8 @@ class RustParser(CodeParser):
         source_bytes = content.encode('utf-8')
         
         try:
-            tree = self.parser.parse(source_bytes)
-            root = tree.root_node
-            
-            self._extract_entities(root, source_bytes, file_path, repo_name, entities)
+            tree = self._parse_tree(source_bytes, file_path, repo_name)
+            self._extract_entities(tree.root_node, source_bytes, file_path, repo_name, entities)
             
         except Exception as e:
             logger.error("Tree-sitter parsing failed", error=str(e))
@@ -61,50 +310,106 @@ class RustParser(CodeParser):
         
         return entities
     
+    def _parse_tree(self, source_bytes: bytes, file_path: str, repo_name: str):
+        """Parse source bytes with a pooled parser, reusing the file's previous tree."""
+        parser = self._acquire_parser()
+        try:
+            return self._parse_incremental(parser, source_bytes, file_path, repo_name)
+        finally:
+            self._release_parser(parser)
+    
+    def _acquire_parser(self):
+        """Take an idle parser from the pool, or build one if none is free."""
+        try:
+            return _PARSER_POOL.get_nowait()
+        except queue.Empty:
+            return self._parser_class(self.ts_language)
+    
+    @staticmethod
+    def _release_parser(parser) -> None:
+        """Return a parser to the pool, dropping it if the pool is full."""
+        try:
+            _PARSER_POOL.put_nowait(parser)
+        except queue.Full:
+            pass
+    
     def _extract_entities(
         self, 
-        node, 
+        root, 
         source_bytes: bytes, 
         file_path: str, 
         repo_name: str,
-        entities: List[CodeEntity],
-        impl_type: Optional[str] = None
+        entities: List[CodeEntity]
     ) -> None:
-        """Recursively extract code entities from AST."""
-        
-        # Function items
-        if node.type == 'function_item':
-            entity = self._parse_function(node, source_bytes, file_path, repo_name, impl_type)
-            if entity:
-                entities.append(entity)
-        
-        # Struct definitions
-        elif node.type == 'struct_item':
-            entity = self._parse_struct(node, source_bytes, file_path, repo_name)
-            if entity:
-                entities.append(entity)
-        
-        # Enum definitions
-        elif node.type == 'enum_item':
-            entity = self._parse_enum(node, source_bytes, file_path, repo_name)
-            if entity:
-                entities.append(entity)
-        
-        # Trait definitions
-        elif node.type == 'trait_item':
-            entity = self._parse_trait(node, source_bytes, file_path, repo_name)
-            if entity:
-                entities.append(entity)
-        
-        # Impl blocks
-        elif node.type == 'impl_item':
-            impl_name = self._get_impl_type(node, source_bytes)
-            for child in node.children:
-                self._extract_entities(child, source_bytes, file_path, repo_name, entities, impl_name)
-            return  # Don't recurse children again
-        
-        for child in node.children:
-            self._extract_entities(child, source_bytes, file_path, repo_name, entities, impl_type)
+        """
+        Extract code entities from AST.
+        
+        Entities keep a byte span into source_bytes and only decode their
+        source_code when it is first read.
+        """
+        for node, fields in self._extract_fields(root, source_bytes, file_path, repo_name):
+            entities.append(CodeEntity.from_source_span(
+                source_bytes, node.start_byte, node.end_byte, **fields
+            ))
+    
+    def _extract_fields(
+        self, 
+        root, 
+        source_bytes: bytes, 
+        file_path: str, 
+        repo_name: str
+    ) -> List[Tuple[Any, Dict[str, Any]]]:
+        """
+        Extract (node, CodeEntity fields) for every definition in the AST.
+        
+        The fields leave out source_code; callers take it from the node's
+        byte span.
+        
+        The tree is first compiled into a flat program of definitions, then
+        a tight loop dispatches each instruction to its field builder.
+        """
+        rows = []
+        type_handlers = (None, self._parse_struct, self._parse_enum, self._parse_trait)
+        
+        for op, node, impl_type in self._compile_definitions(root, source_bytes):
+            if op == OP_FUNCTION:
+                fields = self._parse_function(node, source_bytes, file_path, repo_name, impl_type)
+            else:
+                fields = type_handlers[op](node, source_bytes, file_path, repo_name)
+            
+            if fields:
+                rows.append((node, fields))
+        return rows
+    
+    def _compile_definitions(self, root, source_bytes: bytes) -> List[Tuple[int, object, Optional[str]]]:
+        """
+        Compile an AST into a flat list of (opcode, node, impl type).
+        
+        Tree-sitter's query engine finds the definition nodes, so only they
+        are visited from Python. Captures come back in document order, which
+        lets a stack of open impl blocks (by byte range) resolve each
+        function's owning type here, once. Unless index_nested_items is set,
+        captures inside a function body are skipped without being built.
+        """
+        program = []
+        # (end_byte, impl type) for impl blocks enclosing the current node
+        impls = []
+        # End of the function whose body is being skipped
+        skip_until = -1
+        for node, kind in self._query_all_captures(self._query, root):
+            if node.start_byte < skip_until:
+                continue
+            while impls and impls[-1][0] <= node.start_byte:
+                impls.pop()
+            
+            if kind == 'impl':
+                impls.append((node.end_byte, self._get_impl_type(node, source_bytes)))
+            else:
+                op = _CAPTURE_OPS[kind]
+                program.append((op, node, impls[-1][1] if impls else None))
+                if op == OP_FUNCTION and not self.index_nested_items:
+                    skip_until = node.end_byte
+        return program
     
     def _parse_function(
         self, 
@@ -113,8 +418,8 @@ class RustParser(CodeParser):
         file_path: str, 
         repo_name: str,
         impl_type: Optional[str] = None
-    ) -> Optional[CodeEntity]:
-        """Parse a function item."""
+    ) -> Optional[Dict[str, Any]]:
+        """Parse a function item into CodeEntity fields."""
         name = None
         parameters = []
         return_type = None
@@ -122,21 +427,21 @@ class RustParser(CodeParser):
         is_async = False
         
         for child in node.children:
-            if child.type == 'identifier':
-                name = self._get_node_text(child, source_bytes)
-            elif child.type == 'parameters':
+            kind = child.kind_id
+            if kind == self._k_identifier:
+                name = self._get_identifier_text(child, source_bytes)
+            elif kind == self._k_parameters:
                 parameters = self._extract_parameters(child, source_bytes)
-            elif child.type == 'return_type' or child.type == 'type':
+            elif kind in self._return_kind_ids:
                 return_type = self._get_node_text(child, source_bytes).lstrip('-> ').strip()
-            elif child.type == 'visibility_modifier':
-                is_public = 'pub' in self._get_node_text(child, source_bytes)
-            elif child.type == 'async':
+            elif kind == self._k_visibility:
+                is_public = source_bytes.startswith(b'pub', child.start_byte)
+            elif kind == self._k_async:
                 is_async = True
         
         if not name:
             return None
         
-        source_code = self._get_node_text(node, source_bytes)
         docstring = self._extract_rust_doc(node, source_bytes)
         
         # Build signature
@@ -152,7 +457,7 @@ class RustParser(CodeParser):
         
         entity_type = CodeEntityType.METHOD if impl_type else CodeEntityType.FUNCTION
         
-        return CodeEntity(
+        return dict(
             name=name,
             entity_type=entity_type,
             language=Language.RUST,
@@ -160,7 +465,6 @@ class RustParser(CodeParser):
             repo_name=repo_name,
             start_line=node.start_point[0] + 1,
             end_line=node.end_point[0] + 1,
-            source_code=source_code,
             docstring=docstring,
             signature=' '.join(sig_parts),
             parameters=parameters,
@@ -176,27 +480,27 @@ class RustParser(CodeParser):
         source_bytes: bytes, 
         file_path: str, 
         repo_name: str
-    ) -> Optional[CodeEntity]:
-        """Parse a struct definition."""
+    ) -> Optional[Dict[str, Any]]:
+        """Parse a struct definition into CodeEntity fields."""
         name = None
         is_public = False
         
         for child in node.children:
-            if child.type == 'type_identifier':
-                name = self._get_node_text(child, source_bytes)
-            elif child.type == 'visibility_modifier':
-                is_public = 'pub' in self._get_node_text(child, source_bytes)
+            kind = child.kind_id
+            if kind == self._k_type_identifier:
+                name = self._get_identifier_text(child, source_bytes)
+            elif kind == self._k_visibility:
+                is_public = source_bytes.startswith(b'pub', child.start_byte)
         
         if not name:
             return None
         
-        source_code = self._get_node_text(node, source_bytes)
         docstring = self._extract_rust_doc(node, source_bytes)
         
         sig = "pub struct " if is_public else "struct "
         sig += name
         
-        return CodeEntity(
+        return dict(
             name=name,
             entity_type=CodeEntityType.STRUCT,
             language=Language.RUST,
@@ -204,7 +508,6 @@ class RustParser(CodeParser):
             repo_name=repo_name,
             start_line=node.start_point[0] + 1,
             end_line=node.end_point[0] + 1,
-            source_code=source_code,
             docstring=docstring,
             signature=sig,
             complexity=1,
@@ -217,27 +520,27 @@ class RustParser(CodeParser):
         source_bytes: bytes, 
         file_path: str, 
         repo_name: str
-    ) -> Optional[CodeEntity]:
-        """Parse an enum definition."""
+    ) -> Optional[Dict[str, Any]]:
+        """Parse an enum definition into CodeEntity fields."""
         name = None
         is_public = False
         
         for child in node.children:
-            if child.type == 'type_identifier':
-                name = self._get_node_text(child, source_bytes)
-            elif child.type == 'visibility_modifier':
-                is_public = 'pub' in self._get_node_text(child, source_bytes)
+            kind = child.kind_id
+            if kind == self._k_type_identifier:
+                name = self._get_identifier_text(child, source_bytes)
+            elif kind == self._k_visibility:
+                is_public = source_bytes.startswith(b'pub', child.start_byte)
         
         if not name:
             return None
         
-        source_code = self._get_node_text(node, source_bytes)
         docstring = self._extract_rust_doc(node, source_bytes)
         
         sig = "pub enum " if is_public else "enum "
         sig += name
         
-        return CodeEntity(
+        return dict(
             name=name,
             entity_type=CodeEntityType.ENUM,
             language=Language.RUST,
@@ -245,7 +548,6 @@ class RustParser(CodeParser):
             repo_name=repo_name,
             start_line=node.start_point[0] + 1,
             end_line=node.end_point[0] + 1,
-            source_code=source_code,
             docstring=docstring,
             signature=sig,
             complexity=1,
@@ -258,27 +560,27 @@ class RustParser(CodeParser):
         source_bytes: bytes, 
         file_path: str, 
         repo_name: str
-    ) -> Optional[CodeEntity]:
-        """Parse a trait definition."""
+    ) -> Optional[Dict[str, Any]]:
+        """Parse a trait definition into CodeEntity fields."""
         name = None
         is_public = False
         
         for child in node.children:
-            if child.type == 'type_identifier':
-                name = self._get_node_text(child, source_bytes)
-            elif child.type == 'visibility_modifier':
-                is_public = 'pub' in self._get_node_text(child, source_bytes)
+            kind = child.kind_id
+            if kind == self._k_type_identifier:
+                name = self._get_identifier_text(child, source_bytes)
+            elif kind == self._k_visibility:
+                is_public = source_bytes.startswith(b'pub', child.start_byte)
         
         if not name:
             return None
         
-        source_code = self._get_node_text(node, source_bytes)
         docstring = self._extract_rust_doc(node, source_bytes)
         
         sig = "pub trait " if is_public else "trait "
         sig += name
         
-        return CodeEntity(
+        return dict(
             name=name,
             entity_type=CodeEntityType.INTERFACE,  # Traits are like interfaces
             language=Language.RUST,
@@ -286,7 +588,6 @@ class RustParser(CodeParser):
             repo_name=repo_name,
             start_line=node.start_point[0] + 1,
             end_line=node.end_point[0] + 1,
-            source_code=source_code,
             docstring=docstring,
             signature=sig,
             complexity=1,
@@ -296,23 +597,58 @@ class RustParser(CodeParser):
     def _get_impl_type(self, node, source_bytes: bytes) -> Optional[str]:
         """Get the type name from an impl block."""
         for child in node.children:
-            if child.type == 'type_identifier':
-                return self._get_node_text(child, source_bytes)
-            elif child.type == 'generic_type':
+            kind = child.kind_id
+            if kind == self._k_type_identifier:
+                return self._get_identifier_text(child, source_bytes)
+            elif kind == self._k_generic_type:
                 for subchild in child.children:
-                    if subchild.type == 'type_identifier':
-                        return self._get_node_text(subchild, source_bytes)
+                    if subchild.kind_id == self._k_type_identifier:
+                        return self._get_identifier_text(subchild, source_bytes)
         return None
     
+    def _calculate_complexity(self, node) -> int:
+        """
+        Calculate cyclomatic complexity of a Rust item.
+        
+        Walks the subtree with a TreeCursor and compares integer kind ids,
+        so there is no recursion and no per-node string comparison.
+        """
+        branch_ids = self._branch_kind_ids
+        complexity = 1
+        cursor = node.walk()
+        while True:
+            if cursor.node.kind_id in branch_ids:
+                complexity += 1
+            if cursor.goto_first_child():
+                continue
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return complexity
+    
+    def _get_identifier_text(self, node, source_bytes: bytes) -> str:
+        """
+        Extract an identifier, skipping UTF-8 validation for ASCII names.
+        
+        Identifiers are interned so names repeated across entities (``new``,
+        ``fmt``, ``Error``) share one string.
+        """
+        chunk = source_bytes[node.start_byte:node.end_byte]
+        try:
+            return sys.intern(chunk.decode('ascii'))
+        except UnicodeDecodeError:
+            return sys.intern(chunk.decode('utf-8', errors='replace'))
+    
     def _extract_parameters(self, params_node, source_bytes: bytes) -> List[str]:
         """Extract parameter names from parameters node."""
         params = []
+        param_kind_ids = self._param_kind_ids
         for child in params_node.children:
-            if child.type == 'parameter':
-                param_text = self._get_node_text(child, source_bytes).strip()
-                params.append(param_text)
-            elif child.type == 'self_parameter':
-                params.append(self._get_node_text(child, source_bytes).strip())
+            if child.kind_id in param_kind_ids:
+                # Strip the raw bytes before decoding rather than the decoded str
+                # and intern, since `self`/`&self`/`&mut self` repeat constantly
+                params.append(sys.intern(
+                    source_bytes[child.start_byte:child.end_byte].strip().decode('utf-8', 'replace')
+                ))
         return params
     
     def _extract_rust_doc(self, node, source_bytes: bytes) -> Optional[str]:
@@ -321,22 +657,26 @@ class RustParser(CodeParser):
         prev = node.prev_sibling
         
         while prev:
-            if prev.type in ('line_comment', 'block_comment'):
-                text = self._get_node_text(prev, source_bytes).strip()
-                if text.startswith('///') or text.startswith('//!'):
-                    doc_lines.insert(0, text[3:].strip())
-                elif text.startswith('/**') or text.startswith('/*!'):
-                    doc_lines.insert(0, text[3:-2].strip())
+            prev_kind = prev.kind_id
+            if prev_kind in self._comment_kind_ids:
+                # Classify the comment by its raw prefix before decoding anything
+                raw = source_bytes[prev.start_byte:prev.end_byte].strip()
+                prefix = raw[:3]
+                if prefix in (b'///', b'//!'):
+                    doc_lines.append(raw[3:].decode('utf-8', 'replace').strip())
+                elif prefix in (b'/**', b'/*!'):
+                    doc_lines.append(raw[3:-2].decode('utf-8', 'replace').strip())
                 else:
                     break
-            elif prev.type == 'attribute_item':
+            elif prev_kind == self._k_attribute:
                 # Skip attributes
                 pass
             else:
                 break
             prev = prev.prev_sibling
         
-        return ' '.join(doc_lines) if doc_lines else None
+        # Collected bottom-up; restore source order
+        return ' '.join(reversed(doc_lines)) if doc_lines else None
     
     def _fallback_parse(
         self, 
@@ -344,42 +684,49 @@ class RustParser(CodeParser):
         file_path: str, 
         repo_name: str
     ) -> List[CodeEntity]:
-        """Fallback regex-based parsing."""
-        import re
+        """
+        Fallback regex-based parsing.
         
+        The pattern is run over the whole file rather than line by line, so
+        only matched lines are ever sliced out of it.
+        """
         entities = []
-        lines = content.split('\n')
-        
-        # Patterns
-        func_pattern = re.compile(r'^(\s*)(pub\s+)?(async\s+)?fn\s+(\w+)\s*(<[^>]*>)?\s*\(([^)]*)\)')
-        struct_pattern = re.compile(r'^(\s*)(pub\s+)?struct\s+(\w+)')
-        enum_pattern = re.compile(r'^(\s*)(pub\s+)?enum\s+(\w+)')
-        trait_pattern = re.compile(r'^(\s*)(pub\s+)?trait\s+(\w+)')
-        impl_pattern = re.compile(r'^impl\s*(?:<[^>]*>\s*)?(\w+)')
-        
         current_impl = None
         
-        for i, line in enumerate(lines):
-            # Impl block
-            impl_match = impl_pattern.match(line)
-            if impl_match:
-                current_impl = impl_match.group(1)
+        # Line numbers are counted incrementally between matches
+        i = 0
+        counted_to = 0
+        
+        for m in _DEFINITION_RE.finditer(content):
+            if m.group('close'):
+                # End of impl block
+                current_impl = None
+                continue
+            if m.group('iname') and m.group('indent'):
                 continue
             
+            line_start = m.start()
+            i += content.count('\n', counted_to, line_start)
+            counted_to = line_start
+            line_end = content.find('\n', line_start)
+            line = content[line_start:] if line_end == -1 else content[line_start:line_end]
+            
+            is_pub = bool(m.group('pub'))
+            
+            # Impl block
+            if m.group('iname'):
+                current_impl = m.group('iname')
+            
             # Function
-            func_match = func_pattern.match(line)
-            if func_match:
-                is_pub = bool(func_match.group(2))
-                is_async = bool(func_match.group(3))
-                name = func_match.group(4)
-                params = func_match.group(6)
+            elif m.group('fname'):
+                name = m.group('fname')
                 
                 sig_parts = []
                 if is_pub:
                     sig_parts.append("pub")
-                if is_async:
+                if m.group('async'):
                     sig_parts.append("async")
-                sig_parts.append(f"fn {name}({params})")
+                sig_parts.append(f"fn {name}({m.group('params')})")
                 
                 entity_type = CodeEntityType.METHOD if current_impl else CodeEntityType.FUNCTION
                 
@@ -396,71 +743,28 @@ class RustParser(CodeParser):
                     parent_class=current_impl,
                     loc=1
                 ))
-                continue
-            
-            # Struct
-            struct_match = struct_pattern.match(line)
-            if struct_match:
-                is_pub = bool(struct_match.group(2))
-                name = struct_match.group(3)
-                entities.append(CodeEntity(
-                    name=name,
-                    entity_type=CodeEntityType.STRUCT,
-                    language=Language.RUST,
-                    file_path=file_path,
-                    repo_name=repo_name,
-                    start_line=i + 1,
-                    end_line=i + 1,
-                    source_code=line,
-                    signature=f"{'pub ' if is_pub else ''}struct {name}",
-                    loc=1
-                ))
-                current_impl = None
-                continue
-            
-            # Enum
-            enum_match = enum_pattern.match(line)
-            if enum_match:
-                is_pub = bool(enum_match.group(2))
-                name = enum_match.group(3)
-                entities.append(CodeEntity(
-                    name=name,
-                    entity_type=CodeEntityType.ENUM,
-                    language=Language.RUST,
-                    file_path=file_path,
-                    repo_name=repo_name,
-                    start_line=i + 1,
-                    end_line=i + 1,
-                    source_code=line,
-                    signature=f"{'pub ' if is_pub else ''}enum {name}",
-                    loc=1
-                ))
-                current_impl = None
-                continue
             
-            # Trait
-            trait_match = trait_pattern.match(line)
-            if trait_match:
-                is_pub = bool(trait_match.group(2))
-                name = trait_match.group(3)
+            # Struct, enum or trait
+            else:
+                if m.group('sname'):
+                    name, keyword, entity_type = m.group('sname'), 'struct', CodeEntityType.STRUCT
+                elif m.group('ename'):
+                    name, keyword, entity_type = m.group('ename'), 'enum', CodeEntityType.ENUM
+                else:
+                    name, keyword, entity_type = m.group('tname'), 'trait', CodeEntityType.INTERFACE
+                
                 entities.append(CodeEntity(
                     name=name,
-                    entity_type=CodeEntityType.INTERFACE,
+                    entity_type=entity_type,
                     language=Language.RUST,
                     file_path=file_path,
                     repo_name=repo_name,
                     start_line=i + 1,
                     end_line=i + 1,
                     source_code=line,
-                    signature=f"{'pub ' if is_pub else ''}trait {name}",
+                    signature=f"{'pub ' if is_pub else ''}{keyword} {name}",
                     loc=1
                 ))
                 current_impl = None
-                continue
-            
-            # End of impl block
-            if line.strip() == '}' and not line.startswith(' '):
-                current_impl = None
         
         return entities
-
@@ -2,8 +2,8 @@
 Distributed job queue module using RabbitMQ.
 """
 
-from .publisher import JobPublisher
+from .publisher import JobPublisher, AsyncJobPublisher
 from .worker import IndexingWorker
 
-__all__ = ["JobPublisher", "IndexingWorker"]
+__all__ = ["JobPublisher", "AsyncJobPublisher", "IndexingWorker"]
 
@@ -2,8 +2,11 @@
 Job publisher for distributing indexing tasks to workers.
 """
 
-import json
-from typing import Optional, Dict, Any
+import asyncio
+import hashlib
+import math
+from typing import Optional, Dict, Any, Iterable, List, Set
+import orjson
 import structlog
 import pika
 from pika.exceptions import AMQPConnectionError
@@ -14,6 +17,67 @@ from ..config import settings
 logger = structlog.get_logger()
 
 
+class _JobBloomFilter:
+    """
+    Probabilistic set of (repo_url, branch) pairs that were already published.
+    
+    Membership tests can return false positives at roughly ``error_rate``
+    but never false negatives, in a fixed ~180 KB for the default capacity.
+    """
+    
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001):
+        self.num_bits = int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+    
+    @staticmethod
+    def key(job: IndexingJob) -> bytes:
+        """Identity of a job for deduplication purposes."""
+        return f"{job.repo_url}\0{job.branch}".encode('utf-8')
+    
+    def _positions(self, job: IndexingJob) -> List[int]:
+        # Double hashing: k positions derived from two 64-bit halves
+        digest = hashlib.blake2b(self.key(job), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+    
+    def __contains__(self, job: IndexingJob) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(job))
+    
+    def add(self, job: IndexingJob) -> None:
+        for p in self._positions(job):
+            self._bits[p >> 3] |= 1 << (p & 7)
+
+
+def _serialize_job(job: IndexingJob) -> bytes:
+    """Serialize a job to JSON bytes with orjson (datetimes handled natively)."""
+    return orjson.dumps(job.model_dump(), default=str)
+
+
+def _make_repo_job(
+    repo_url: str,
+    repo_name: Optional[str],
+    branch: str,
+    priority: int,
+    metadata: Optional[Dict[str, Any]]
+) -> IndexingJob:
+    """Build an IndexingJob for a repository URL."""
+    # Extract repo name from URL if not provided
+    if not repo_name:
+        repo_name = repo_url.rstrip('/').split('/')[-1]
+        if repo_name.endswith('.git'):
+            repo_name = repo_name[:-4]
+    
+    return IndexingJob(
+        repo_url=repo_url,
+        repo_name=repo_name,
+        branch=branch,
+        priority=min(max(priority, 0), 10),
+        metadata=metadata or {}
+    )
+
+
 class JobPublisher:
     """
     Publishes indexing jobs to RabbitMQ for distributed processing.
@@ -21,14 +85,16 @@ class JobPublisher:
     Supports:
     - Priority queues for urgent jobs
     - Dead letter queues for failed jobs
-    - Job deduplication
+    - Optional job deduplication (with dedup=True, a repo/branch is
+      published at most once per publisher, tracked with a Bloom filter)
     """
     
     def __init__(
         self,
         host: Optional[str] = None,
         port: Optional[int] = None,
-        queue_name: Optional[str] = None
+        queue_name: Optional[str] = None,
+        dedup: bool = False
     ):
         """
         Initialize the job publisher.
@@ -37,6 +103,9 @@ class JobPublisher:
             host: RabbitMQ host
             port: RabbitMQ port  
             queue_name: Name of the job queue
+            dedup: Skip jobs for a repo/branch this publisher already sent,
+                for as long as the publisher lives (Bloom filter false
+                positives also skip a small fraction of new jobs)
         """
         self.host = host or settings.rabbitmq_host
         self.port = port or settings.rabbitmq_port
@@ -44,6 +113,8 @@ class JobPublisher:
         
         self._connection: Optional[pika.BlockingConnection] = None
         self._channel: Optional[pika.channel.Channel] = None
+        self._confirms_enabled = False
+        self._published: Optional[_JobBloomFilter] = _JobBloomFilter() if dedup else None
     
     def connect(self) -> None:
         """Establish connection to RabbitMQ."""
@@ -63,6 +134,7 @@ class JobPublisher:
             
             self._connection = pika.BlockingConnection(parameters)
             self._channel = self._connection.channel()
+            self._confirms_enabled = False
             
             # Declare main queue with priority support
             self._channel.queue_declare(
@@ -110,39 +182,72 @@ class JobPublisher:
             job: The indexing job to publish
             
         Returns:
-            True if published successfully
+            True if published successfully, False if it failed or was a
+            duplicate
+        """
+        return self.publish_jobs([job]) == 1
+    
+    def publish_jobs(self, jobs: Iterable[IndexingJob]) -> int:
+        """
+        Publish a batch of indexing jobs over the one open channel.
+        
+        Publisher confirms are enabled on the channel the first time, so a
+        job only counts as published once the broker has accepted it. On a
+        BlockingChannel each basic_publish then waits for its own confirm,
+        so a batch costs one broker round-trip per job and is slower than
+        unconfirmed publishing; use AsyncJobPublisher.publish_jobs to keep
+        many publishes in flight and await their confirms together.
+        
+        Args:
+            jobs: The indexing jobs to publish
+            
+        Returns:
+            Number of jobs the broker confirmed
         """
         if not self._channel:
             self.connect()
         
-        try:
-            message = job.model_dump_json()
-            
-            properties = pika.BasicProperties(
-                delivery_mode=2,  # Persistent
-                content_type='application/json',
-                priority=job.priority,
-                message_id=job.id
-            )
-            
-            self._channel.basic_publish(
-                exchange='',
-                routing_key=self.queue_name,
-                body=message,
-                properties=properties
-            )
-            
-            logger.info(
-                "Published indexing job",
-                job_id=job.id,
-                repo=job.repo_name,
-                priority=job.priority
-            )
-            return True
+        if not self._confirms_enabled:
+            self._channel.confirm_delivery()
+            self._confirms_enabled = True
+        
+        published = 0
+        for job in jobs:
+            if self._published is not None and job in self._published:
+                logger.info("Skipping duplicate job", job_id=job.id, repo=job.repo_name)
+                continue
             
-        except Exception as e:
-            logger.error("Failed to publish job", job_id=job.id, error=str(e))
-            return False
+            try:
+                message = _serialize_job(job)
+                
+                properties = pika.BasicProperties(
+                    delivery_mode=2,  # Persistent
+                    content_type='application/json',
+                    priority=job.priority,
+                    message_id=job.id
+                )
+                
+                self._channel.basic_publish(
+                    exchange='',
+                    routing_key=self.queue_name,
+                    body=message,
+                    properties=properties
+                )
+                
+                logger.info(
+                    "Published indexing job",
+                    job_id=job.id,
+                    repo=job.repo_name,
+                    priority=job.priority
+                )
+                published += 1
+                if self._published is not None:
+                    self._published.add(job)
+                
+            except Exception as e:
+                logger.error("Failed to publish job", job_id=job.id, error=str(e))
+        
+        return published
     
     def publish_repo(
         self, 
@@ -151,7 +256,7 @@ class JobPublisher:
         branch: str = "main",
         priority: int = 0,
         metadata: Optional[Dict[str, Any]] = None
-    ) -> IndexingJob:
+    ) -> Optional[IndexingJob]:
         """
         Convenience method to create and publish a repo indexing job.
         
@@ -163,24 +268,11 @@ class JobPublisher:
             metadata: Additional metadata
             
         Returns:
-            The created IndexingJob
-        """
-        # Extract repo name from URL if not provided
-        if not repo_name:
-            repo_name = repo_url.rstrip('/').split('/')[-1]
-            if repo_name.endswith('.git'):
-                repo_name = repo_name[:-4]
-        
-        job = IndexingJob(
-            repo_url=repo_url,
-            repo_name=repo_name,
-            branch=branch,
-            priority=min(max(priority, 0), 10),
-            metadata=metadata or {}
-        )
-        
-        self.publish_job(job)
-        return job
+            The created IndexingJob, or None if it was not queued (publishing
+            failed or it was skipped as a duplicate)
+        """
+        job = _make_repo_job(repo_url, repo_name, branch, priority, metadata)
+        return job if self.publish_job(job) else None
     
     def get_queue_length(self) -> int:
         """Get the current number of jobs in the queue."""
@@ -214,3 +306,190 @@ class JobPublisher:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.disconnect()
 
+
+class AsyncJobPublisher:
+    """
+    Publishes indexing jobs to RabbitMQ from asyncio code using aio-pika.
+    
+    Unlike JobPublisher, publishing never blocks the event loop, and a batch
+    of jobs is written concurrently with the broker's confirms awaited
+    together rather than one round-trip at a time.
+    """
+    
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        queue_name: Optional[str] = None,
+        dedup: bool = False
+    ):
+        """
+        Initialize the async job publisher.
+        
+        Args:
+            host: RabbitMQ host
+            port: RabbitMQ port
+            queue_name: Name of the job queue
+            dedup: Skip jobs for a repo/branch this publisher already sent,
+                for as long as the publisher lives (Bloom filter false
+                positives also skip a small fraction of new jobs)
+        """
+        self.host = host or settings.rabbitmq_host
+        self.port = port or settings.rabbitmq_port
+        self.queue_name = queue_name or settings.rabbitmq_queue
+        
+        self._connection = None
+        self._channel = None
+        self._published: Optional[_JobBloomFilter] = _JobBloomFilter() if dedup else None
+        # Jobs being published right now, so concurrent duplicates are caught
+        self._in_flight: Set[bytes] = set()
+    
+    async def connect(self) -> None:
+        """Establish a robust (auto-reconnecting) connection to RabbitMQ."""
+        import aio_pika
+        
+        try:
+            self._connection = await aio_pika.connect_robust(
+                host=self.host,
+                port=self.port,
+                login=settings.rabbitmq_user,
+                password=settings.rabbitmq_password,
+                heartbeat=600
+            )
+            self._channel = await self._connection.channel(publisher_confirms=True)
+            
+            # Same topology as JobPublisher: priority queue plus dead letters
+            await self._channel.declare_queue(
+                self.queue_name,
+                durable=True,
+                arguments={
+                    'x-max-priority': 10,
+                    'x-dead-letter-exchange': f'{self.queue_name}_dlx'
+                }
+            )
+            dlx = await self._channel.declare_exchange(
+                f'{self.queue_name}_dlx',
+                aio_pika.ExchangeType.DIRECT,
+                durable=True
+            )
+            failed = await self._channel.declare_queue(
+                f'{self.queue_name}_failed',
+                durable=True
+            )
+            await failed.bind(dlx, routing_key=self.queue_name)
+            
+            logger.info("Connected to RabbitMQ", host=self.host, queue=self.queue_name)
+            
+        except Exception as e:
+            logger.error("Failed to connect to RabbitMQ", error=str(e))
+            raise
+    
+    async def disconnect(self) -> None:
+        """Close RabbitMQ connection."""
+        if self._connection and not self._connection.is_closed:
+            await self._connection.close()
+            logger.info("Disconnected from RabbitMQ")
+    
+    async def publish_job(self, job: IndexingJob) -> bool:
+        """
+        Publish an indexing job to the queue.
+        
+        Args:
+            job: The indexing job to publish
+            
+        Returns:
+            True if the broker confirmed the job, False if it failed or was a
+            duplicate
+        """
+        import aio_pika
+        
+        key = _JobBloomFilter.key(job)
+        if self._published is not None:
+            if key in self._in_flight or job in self._published:
+                logger.info("Skipping duplicate job", job_id=job.id, repo=job.repo_name)
+                return False
+            self._in_flight.add(key)
+        
+        if not self._channel:
+            await self.connect()
+        
+        try:
+            message = aio_pika.Message(
+                body=_serialize_job(job),
+                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                content_type='application/json',
+                priority=job.priority,
+                message_id=job.id
+            )
+            
+            await self._channel.default_exchange.publish(
+                message,
+                routing_key=self.queue_name
+            )
+            
+            logger.info(
+                "Published indexing job",
+                job_id=job.id,
+                repo=job.repo_name,
+                priority=job.priority
+            )
+            if self._published is not None:
+                self._published.add(job)
+            return True
+            
+        except Exception as e:
+            logger.error("Failed to publish job", job_id=job.id, error=str(e))
+            return False
+        
+        finally:
+            self._in_flight.discard(key)
+    
+    async def publish_jobs(self, jobs: Iterable[IndexingJob]) -> int:
+        """
+        Publish a batch of jobs concurrently.
+        
+        Args:
+            jobs: The indexing jobs to publish
+            
+        Returns:
+            Number of jobs the broker confirmed
+        """
+        if not self._channel:
+            await self.connect()
+        
+        results: List[bool] = await asyncio.gather(
+            *(self.publish_job(job) for job in jobs)
+        )
+        return sum(results)
+    
+    async def publish_repo(
+        self, 
+        repo_url: str, 
+        repo_name: Optional[str] = None,
+        branch: str = "main",
+        priority: int = 0,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Optional[IndexingJob]:
+        """
+        Convenience method to create and publish a repo indexing job.
+        
+        Args:
+            repo_url: URL of the repository
+            repo_name: Optional name (extracted from URL if not provided)
+            branch: Git branch to index
+            priority: Job priority (0-10)
+            metadata: Additional metadata
+            
+        Returns:
+            The created IndexingJob, or None if it was not queued (publishing
+            failed or it was skipped as a duplicate)
+        """
+        job = _make_repo_job(repo_url, repo_name, branch, priority, metadata)
+        return job if await self.publish_job(job) else None
+    
+    async def __aenter__(self):
+        await self.connect()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.disconnect()
@@ -2,14 +2,16 @@
 Worker process for consuming and processing indexing jobs.
 """
 
-import json
+import importlib.util
 import signal
 import sys
+import threading
 from pathlib import Path
 from typing import Optional, Callable
 import structlog
 import pika
-from pika.exceptions import AMQPConnectionError
+from pika.exceptions import AMQPConnectionError, ChannelClosed
+from pydantic import ValidationError
 
 from ..models import IndexingJob, Repository
 from ..config import settings
@@ -17,14 +19,56 @@ from ..config import settings
 logger = structlog.get_logger()
 
 
+def _lazy_module(name: str):
+    """
+    Import a module whose body only runs on first attribute access.
+    
+    Keeps worker startup fast for heavyweight modules that are only needed
+    once the first job arrives.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# The indexer pulls in the embedding and storage stacks
+_indexer = _lazy_module(f"{__package__.rpartition('.')[0]}.indexer")
+
+# Seconds a partial batch of acks may wait before it is flushed
+ACK_FLUSH_INTERVAL = 1.0
+
+# Backoff between start()'s reconnect attempts, doubling up to the cap
+RECONNECT_INITIAL_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+
+
+def _queue_arguments(queue_name: str) -> dict:
+    """Arguments shared by every declaration of the job queue."""
+    return {
+        'x-max-priority': 10,
+        'x-dead-letter-exchange': f'{queue_name}_dlx'
+    }
+
+
 class IndexingWorker:
     """
     Worker that consumes indexing jobs from RabbitMQ and processes them.
     
+    start() runs on an event-driven SelectConnection: the process sleeps in
+    the IOLoop's epoll/select wait until a frame or a shutdown signal arrives,
+    rather than waking on a polling timer. run_once() uses a short-lived
+    BlockingConnection.
+    
     Features:
     - Graceful shutdown handling
-    - Automatic reconnection
-    - Job acknowledgment/rejection
+    - Automatic reconnection with exponential backoff; the queue is declared
+      once, reconnects only reopen the channel, set QoS and consume
+    - Job acknowledgment/rejection, with successes acked in batches
     - Prefetch control for load balancing
     """
     
@@ -33,7 +77,8 @@ class IndexingWorker:
         host: Optional[str] = None,
         port: Optional[int] = None,
         queue_name: Optional[str] = None,
-        prefetch_count: int = 1
+        prefetch_count: Optional[int] = None,
+        ack_batch_size: Optional[int] = None
     ):
         """
         Initialize the worker.
@@ -43,16 +88,31 @@ class IndexingWorker:
             port: RabbitMQ port
             queue_name: Name of the job queue
             prefetch_count: Number of messages to prefetch
+            ack_batch_size: Number of successful jobs to acknowledge at once
         """
         self.host = host or settings.rabbitmq_host
         self.port = port or settings.rabbitmq_port
         self.queue_name = queue_name or settings.rabbitmq_queue
-        self.prefetch_count = prefetch_count
+        self.prefetch_count = prefetch_count or settings.rabbitmq_prefetch_count
+        self.ack_batch_size = ack_batch_size or settings.rabbitmq_ack_batch_size
         
-        self._connection: Optional[pika.BlockingConnection] = None
+        self._connection: Optional[pika.connection.Connection] = None
         self._channel: Optional[pika.channel.Channel] = None
         self._job_handler: Optional[Callable[[IndexingJob], bool]] = None
         self._should_stop = False
+        # Set on shutdown; interrupts the wait between reconnect attempts
+        self._stop_event = threading.Event()
+        # Error that stopped the IOLoop, logged before reconnecting
+        self._error: Optional[BaseException] = None
+        # Whether the current connection got as far as consuming
+        self._consuming = False
+        # The queue is durable, so one declaration outlives reconnects
+        self._queue_declared = False
+        
+        # Highest delivery tag of the successful jobs not yet acked, and how many
+        self._pending_ack_tag: Optional[int] = None
+        self._pending_ack_count = 0
+        self._ack_timer = None
         
         # Set up signal handlers
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -62,40 +122,45 @@ class IndexingWorker:
         """Handle shutdown signals gracefully."""
         logger.info("Received shutdown signal", signal=signum)
         self._should_stop = True
-        if self._connection and not self._connection.is_closed:
+        self._stop_event.set()
+        if isinstance(self._connection, pika.SelectConnection):
+            # Safe to call from a signal handler: wakes the IOLoop via its pipe
+            self._connection.ioloop.add_callback_threadsafe(self._shutdown)
+        elif self._connection and not self._connection.is_closed:
             self._connection.close()
     
+    def _connection_parameters(self) -> pika.ConnectionParameters:
+        """Build the RabbitMQ connection parameters."""
+        credentials = pika.PlainCredentials(
+            settings.rabbitmq_user,
+            settings.rabbitmq_password
+        )
+        
+        return pika.ConnectionParameters(
+            host=self.host,
+            port=self.port,
+            credentials=credentials,
+            heartbeat=600,
+            blocked_connection_timeout=300
+        )
+    
     def connect(self) -> None:
-        """Establish connection to RabbitMQ."""
+        """Establish a blocking connection to RabbitMQ (used by run_once)."""
         try:
-            credentials = pika.PlainCredentials(
-                settings.rabbitmq_user,
-                settings.rabbitmq_password
-            )
-            
-            parameters = pika.ConnectionParameters(
-                host=self.host,
-                port=self.port,
-                credentials=credentials,
-                heartbeat=600,
-                blocked_connection_timeout=300
-            )
-            
-            self._connection = pika.BlockingConnection(parameters)
+            self._connection = pika.BlockingConnection(self._connection_parameters())
             self._channel = self._connection.channel()
             
             # Set QoS for fair dispatch
             self._channel.basic_qos(prefetch_count=self.prefetch_count)
             
             # Ensure queue exists
-            self._channel.queue_declare(
-                queue=self.queue_name,
-                durable=True,
-                arguments={
-                    'x-max-priority': 10,
-                    'x-dead-letter-exchange': f'{self.queue_name}_dlx'
-                }
-            )
+            if not self._queue_declared:
+                self._channel.queue_declare(
+                    queue=self.queue_name,
+                    durable=True,
+                    arguments=_queue_arguments(self.queue_name)
+                )
+                self._queue_declared = True
             
             logger.info("Worker connected to RabbitMQ", host=self.host)
             
@@ -112,6 +177,45 @@ class IndexingWorker:
         """
         self._job_handler = handler
     
+    def _ack(self, channel: pika.channel.Channel, delivery_tag: int) -> None:
+        """Queue a successful job's ack, sending one multi-ack per batch."""
+        self._pending_ack_tag = delivery_tag
+        self._pending_ack_count += 1
+        if self._pending_ack_count >= self.ack_batch_size:
+            self._flush_acks(channel)
+        elif self._ack_timer is None and isinstance(self._connection, pika.SelectConnection):
+            # Flush a partial batch if no more jobs arrive soon; the timer only
+            # exists while acks are pending, so an idle worker never wakes
+            self._ack_timer = self._connection.ioloop.call_later(
+                ACK_FLUSH_INTERVAL, self._flush_acks
+            )
+    
+    def _flush_acks(self, channel: Optional[pika.channel.Channel] = None) -> None:
+        """
+        Acknowledge every pending successful job with a single multi-ack.
+        
+        Messages are handled in delivery order on one channel, and pending
+        acks are flushed before any reject, so acking the highest pending
+        tag with multiple=True covers exactly the pending jobs.
+        """
+        if self._ack_timer is not None:
+            self._connection.ioloop.remove_timeout(self._ack_timer)
+            self._ack_timer = None
+        if self._pending_ack_tag is None:
+            return
+        channel = channel or self._channel
+        if channel is not None and channel.is_open:
+            channel.basic_ack(delivery_tag=self._pending_ack_tag, multiple=True)
+        self._pending_ack_tag = None
+        self._pending_ack_count = 0
+    
+    def _reject(self, channel: pika.channel.Channel, delivery_tag: int, requeue: bool) -> None:
+        """Reject a job, first acking the successes queued ahead of it."""
+        # Settles messages in delivery order, so no later multi-ack ever
+        # spans a rejected tag
+        self._flush_acks(channel)
+        channel.basic_reject(delivery_tag=delivery_tag, requeue=requeue)
+    
     def _process_message(
         self,
         channel: pika.channel.Channel,
@@ -123,10 +227,16 @@ class IndexingWorker:
         job_id = properties.message_id or "unknown"
         
         try:
-            # Parse job
-            job_data = json.loads(body.decode('utf-8'))
-            job = IndexingJob(**job_data)
-            
+            # Parse and validate the raw bytes in one pass, with no
+            # intermediate dict
+            job = IndexingJob.model_validate_json(body)
+        except ValidationError as e:
+            # Malformed JSON or a bad job shape; retrying won't help
+            logger.error("Invalid job format", job_id=job_id, error=str(e))
+            self._reject(channel, method.delivery_tag, requeue=False)
+            return
+        
+        try:
             logger.info(
                 "Processing job",
                 job_id=job.id,
@@ -141,47 +251,144 @@ class IndexingWorker:
                 success = True
             
             if success:
-                channel.basic_ack(delivery_tag=method.delivery_tag)
+                self._ack(channel, method.delivery_tag)
                 logger.info("Job completed successfully", job_id=job.id)
             else:
                 # Reject and don't requeue (goes to DLQ)
-                channel.basic_reject(delivery_tag=method.delivery_tag, requeue=False)
+                self._reject(channel, method.delivery_tag, requeue=False)
                 logger.warning("Job failed, sent to DLQ", job_id=job.id)
                 
-        except json.JSONDecodeError as e:
-            logger.error("Invalid job format", error=str(e))
-            channel.basic_reject(delivery_tag=method.delivery_tag, requeue=False)
-            
         except Exception as e:
-            logger.error("Job processing error", job_id=job_id, error=str(e))
+            logger.error("Job processing error", job_id=job.id, error=str(e))
             # Requeue for retry
-            channel.basic_reject(delivery_tag=method.delivery_tag, requeue=True)
+            self._reject(channel, method.delivery_tag, requeue=True)
     
     def start(self) -> None:
-        """Start consuming jobs from the queue."""
-        if not self._connection:
-            self.connect()
+        """
+        Start consuming jobs from the queue.
         
+        Blocks in the connection's IOLoop until a shutdown signal arrives.
+        If the connection fails or drops, reconnects with exponential backoff,
+        starting over at the initial delay once a connection gets as far as
+        consuming.
+        """
         logger.info("Worker starting", queue=self.queue_name)
         
-        self._channel.basic_consume(
-            queue=self.queue_name,
-            on_message_callback=self._process_message,
-            auto_ack=False
-        )
-        
+        delay = RECONNECT_INITIAL_DELAY
         try:
             while not self._should_stop:
-                self._connection.process_data_events(time_limit=1)
-        except Exception as e:
-            if not self._should_stop:
-                logger.error("Worker error", error=str(e))
-                raise
+                self._error = None
+                self._consuming = False
+                # Delivery tags are per channel; unacked jobs from a dropped
+                # connection are redelivered by the broker
+                self._pending_ack_tag = None
+                self._pending_ack_count = 0
+                self._ack_timer = None
+                
+                self._connection = pika.SelectConnection(
+                    self._connection_parameters(),
+                    on_open_callback=self._on_connection_open,
+                    on_open_error_callback=self._on_connection_open_error,
+                    on_close_callback=self._on_connection_closed
+                )
+                try:
+                    self._connection.ioloop.start()
+                finally:
+                    self._connection = None
+                    self._channel = None
+                
+                if self._should_stop:
+                    break
+                if self._consuming:
+                    delay = RECONNECT_INITIAL_DELAY
+                logger.warning(
+                    "Worker reconnecting",
+                    error=str(self._error),
+                    delay=delay
+                )
+                if self._stop_event.wait(delay):
+                    break
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
         finally:
-            if self._connection and not self._connection.is_closed:
-                self._connection.close()
             logger.info("Worker stopped")
     
+    def _on_connection_open(self, connection: pika.SelectConnection) -> None:
+        """Open the consuming channel once the connection is up."""
+        connection.channel(on_open_callback=self._on_channel_open)
+    
+    def _on_connection_open_error(
+        self,
+        connection: pika.SelectConnection,
+        error: BaseException
+    ) -> None:
+        """Stop the IOLoop if the connection couldn't be established."""
+        logger.error("Worker failed to connect", error=str(error))
+        self._error = error
+        connection.ioloop.stop()
+    
+    def _on_connection_closed(
+        self,
+        connection: pika.SelectConnection,
+        reason: BaseException
+    ) -> None:
+        """Stop the IOLoop once the connection is closed."""
+        if not self._should_stop:
+            logger.error("Worker error", error=str(reason))
+            self._error = reason
+        connection.ioloop.stop()
+    
+    def _on_channel_open(self, channel: pika.channel.Channel) -> None:
+        """Set QoS and declare the queue if not yet declared, then start consuming."""
+        self._channel = channel
+        channel.add_on_close_callback(self._on_channel_closed)
+        
+        def on_declared(_frame) -> None:
+            self._queue_declared = True
+            channel.basic_consume(
+                queue=self.queue_name,
+                on_message_callback=self._process_message,
+                auto_ack=False
+            )
+            self._consuming = True
+            logger.info("Worker connected to RabbitMQ", host=self.host)
+        
+        def on_qos(_frame) -> None:
+            if self._queue_declared:
+                on_declared(None)
+                return
+            channel.queue_declare(
+                queue=self.queue_name,
+                durable=True,
+                arguments=_queue_arguments(self.queue_name),
+                callback=on_declared
+            )
+        
+        # Set QoS for fair dispatch
+        channel.basic_qos(prefetch_count=self.prefetch_count, callback=on_qos)
+    
+    def _on_channel_closed(
+        self,
+        channel: pika.channel.Channel,
+        reason: BaseException
+    ) -> None:
+        """Close the connection so start() reconnects with a fresh channel."""
+        if isinstance(reason, ChannelClosed) and reason.reply_code == 404:
+            # The queue is gone (e.g. a fresh broker); declare it again
+            self._queue_declared = False
+        if not self._should_stop:
+            logger.error("Worker channel closed", error=str(reason))
+            self._error = reason
+        connection = self._connection
+        if connection is not None and not (connection.is_closing or connection.is_closed):
+            connection.close()
+    
+    def _shutdown(self) -> None:
+        """Flush pending acks and close the connection (runs on the IOLoop)."""
+        if self._connection is None or self._connection.is_closing or self._connection.is_closed:
+            return
+        self._flush_acks()
+        self._connection.close()
+    
     def run_once(self) -> bool:
         """
         Process a single job and return.
@@ -201,7 +408,49 @@ class IndexingWorker:
             return False
         
         self._process_message(self._channel, method, properties, body)
+        self._flush_acks()
         return True
+    
+    def run_batch(self, max_jobs: Optional[int] = None, idle_timeout: float = 0.1) -> int:
+        """
+        Process up to max_jobs queued jobs and return.
+        
+        Unlike repeated run_once calls, which pay a basic_get round-trip per
+        job, this opens one consumer and lets the broker stream up to
+        prefetch_count messages ahead; successes are acked in batches.
+        
+        Args:
+            max_jobs: Maximum number of jobs to process (default: prefetch_count)
+            idle_timeout: Seconds to wait for a message before giving up
+        
+        Returns:
+            Number of jobs processed
+        """
+        if not self._connection:
+            self.connect()
+        
+        max_jobs = max_jobs or self.prefetch_count
+        processed = 0
+        try:
+            for method, properties, body in self._channel.consume(
+                queue=self.queue_name,
+                auto_ack=False,
+                inactivity_timeout=idle_timeout
+            ):
+                if method is None:
+                    # Queue drained
+                    break
+                self._process_message(self._channel, method, properties, body)
+                processed += 1
+                if processed >= max_jobs or self._should_stop:
+                    break
+        finally:
+            if self._channel.is_open:
+                # Ack before cancelling: cancel() multi-nacks (and requeues)
+                # prefetched messages, which would cover pending acks too
+                self._flush_acks()
+                self._channel.cancel()
+        return processed
 
 
 def create_indexing_handler():
@@ -214,9 +463,7 @@ def create_indexing_handler():
     3. Generates embeddings
     4. Stores in vector database
     """
-    from ..indexer import RepoIndexer
-    
-    indexer = RepoIndexer()
+    indexer = _indexer.RepoIndexer()
     
     def handler(job: IndexingJob) -> bool:
         try:
@@ -2,16 +2,101 @@
 Hybrid search engine combining semantic and lexical search.
 """
 
-from typing import List, Optional, Dict, Any, Tuple
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, Dict, Any, Tuple
+import numpy as np
 import structlog
 
 from ..models import CodeEntity, SearchResult, SearchQuery, Language, CodeEntityType
 from ..embeddings import EmbeddingGenerator, CodeBERTEmbedder
+from ..embeddings.generator import MockEmbedder
+from ..parser import ParserFactory
 from ..storage import VectorStore, QdrantStore, BM25Index
 from ..config import settings
 
 logger = structlog.get_logger()
 
+# Number of recent query embeddings HybridSearchEngine keeps
+QUERY_EMBEDDING_CACHE_SIZE = 4096
+
+# Threads HybridSearchEngine scores BM25 queries on. Scoring releases the
+# GIL (numpy's scatter-adds, or the nogil numba kernel), so concurrent
+# searches and search_many's queries run in parallel up to the core count
+BM25_SEARCH_THREADS = min(8, os.cpu_count() or 1)
+
+# Candidates HybridSearchEngine fetches from each backend, as a multiple of
+# the requested limit; latency-sensitive callers can pass a lower factor
+# (RRF's top results usually settle by about 1.3x)
+DEFAULT_OVERFETCH = 2.0
+
+# How HybridSearchEngine merges the two result lists: "rrf" fuses ranks,
+# "combsum" sums min-max normalized scores
+FUSION_METHODS = ("rrf", "combsum")
+
+# Directories LocalSearchEngine never descends into
+_SKIP_DIRS = frozenset({
+    'node_modules', 'venv', '.venv', '__pycache__',
+    '.git', 'dist', 'build', 'target'
+})
+
+# Query keyword buckets for HybridSearchEngine._enhance_query. Each is one
+# alternation scanned in a single pass; like the substring checks they
+# replace, they match anywhere in the query (no word boundaries)
+_HTTP_TERMS_RE = re.compile(r'http|request|api|url|web')
+_HANDLE_CONTEXT_RE = re.compile(r'redirect|response|error|exception|cookie|process')
+_SEND_TERMS_RE = re.compile(r'make|send|perform|execute|do')
+_JSON_TERMS_RE = re.compile(r'json|parse|decode')
+_AUTH_TERMS_RE = re.compile(r'auth|login|token')
+_FILE_TERMS_RE = re.compile(r'download|file|save')
+
+# Lowercased queries that get the RRF HTTP boost, and lowercased names it
+# demotes
+_HTTP_BOOST_QUERY_RE = re.compile(r'http|request|api')
+_HANDLER_OR_TEST_RE = re.compile(r'handle_|test_')
+
+# Lowercased names in api.py that get the RRF HTTP boost; matches anywhere
+# in the name, like the substring checks it replaces
+_HTTP_VERB_NAME_RE = re.compile(r'request|get|post|put|patch|delete|head|options')
+
+
+def _iter_source_files(root: str, extensions: Tuple[str, ...]) -> Iterator[str]:
+    """
+    Yield paths of files under root whose names end with one of extensions.
+    
+    Directories in _SKIP_DIRS are pruned as soon as their entry is seen, so
+    trees like node_modules are never listed. Symlinks are not followed.
+    """
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in _SKIP_DIRS:
+                    subdirs.append(entry.path)
+            elif entry.name.endswith(extensions):
+                yield entry.path
+        # Reversed so directories are visited in listing order
+        stack.extend(reversed(subdirs))
+
+
+def _min_max(scores: np.ndarray) -> np.ndarray:
+    """Scale scores to 0-1 by their range; all-equal scores all become 1."""
+    if not len(scores):
+        return scores
+    low = scores.min()
+    spread = scores.max() - low
+    return (scores - low) / spread if spread > 0 else np.ones(len(scores))
+
 
 class SearchEngine:
     """
@@ -85,6 +170,7 @@ class SearchEngine:
             limit=limit,
             filters=filters if filters else None
         )
+        self.vector_store.load_sources([entity for entity, _ in results])
         
         # Convert to SearchResult objects
         search_results = []
@@ -137,7 +223,9 @@ class HybridSearchEngine(SearchEngine):
         vector_store: Optional[VectorStore] = None,
         bm25_index: Optional[BM25Index] = None,
         embedder: Optional[EmbeddingGenerator] = None,
-        semantic_weight: float = 0.7
+        semantic_weight: float = 0.7,
+        overfetch: float = DEFAULT_OVERFETCH,
+        fusion: str = "rrf"
     ):
         """
         Initialize the hybrid search engine.
@@ -147,10 +235,29 @@ class HybridSearchEngine(SearchEngine):
             bm25_index: BM25 lexical index
             embedder: Embedding generator
             semantic_weight: Weight for semantic vs BM25 (0-1)
+            overfetch: Candidates fetched from each backend per requested
+                result, for merging
+            fusion: How to merge the result lists, one of FUSION_METHODS
         """
+        if fusion not in FUSION_METHODS:
+            raise ValueError(f"Unknown fusion method: {fusion}")
         super().__init__(vector_store, embedder)
         self.bm25_index = bm25_index or BM25Index()
         self.semantic_weight = semantic_weight
+        self.overfetch = overfetch
+        self.fusion = fusion
+        
+        # Runs BM25 scoring alongside query embedding and the vector search
+        self._bm25_executor = ThreadPoolExecutor(
+            max_workers=BM25_SEARCH_THREADS, thread_name_prefix="bm25"
+        )
+        
+        # LRU of normalized query -> embedding of its enhanced form; popular
+        # queries repeat, and embedding is the most expensive step of a search
+        self._embedding_cache: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
+        # Embedder the cached vectors came from; a different one empties it
+        self._embedding_cache_owner = self.embedder
         
         # Try to load existing BM25 index
         self.bm25_index.load()
@@ -175,7 +282,8 @@ class HybridSearchEngine(SearchEngine):
             entity_type: Filter by entity type
             repo_filter: Filter by repository name
             use_hybrid: Use hybrid search (False = semantic only)
-            semantic_weight: Override default semantic weight
+            semantic_weight: Override default semantic weight (0 = BM25
+                only, skipping the embedder and vector store)
             
         Returns:
             List of SearchResult objects sorted by relevance
@@ -183,8 +291,6 @@ class HybridSearchEngine(SearchEngine):
         if not use_hybrid:
             return super().search(query, limit, language, entity_type, repo_filter)
         
-        self._ensure_embedder()
-        
         weight = semantic_weight if semantic_weight is not None else self.semantic_weight
         
         # Build filters
@@ -196,24 +302,152 @@ class HybridSearchEngine(SearchEngine):
         if repo_filter:
             filters["repo_name"] = repo_filter
         
-        # Enhance query for better semantic matching
-        # Add code-related context to help the model understand it's a code search query
-        enhanced_query = self._enhance_query(query)
+        # BM25 doesn't need the embedding, so score it on a worker thread
+        # while the query is embedded and the vector store is searched
+        bm25_future = self._submit_bm25(query, limit, filters)
         
-        # Get semantic results
-        query_embedding = self.embedder.embed_text(enhanced_query)
-        semantic_results = self.vector_store.search(
-            query_embedding=query_embedding,
-            limit=limit * 2,  # Get more for merging
-            filters=filters if filters else None
-        )
+        query_embedding = self._embed_queries([query])[0] if weight > 0 else None
         
-        # Get BM25 results
-        bm25_results = self.bm25_index.search(
+        return self._hybrid_results(query, query_embedding, bm25_future, limit, weight, filters)
+    
+    def search_many(
+        self,
+        queries: List[str],
+        limit: int = 20,
+        language: Optional[Language] = None,
+        entity_type: Optional[CodeEntityType] = None,
+        repo_filter: Optional[str] = None,
+        semantic_weight: Optional[float] = None
+    ) -> List[List[SearchResult]]:
+        """
+        Run several hybrid searches, embedding all queries in one batch.
+        
+        Args:
+            queries: Natural language search queries
+            limit: Maximum number of results per query
+            language: Filter by programming language
+            entity_type: Filter by entity type
+            repo_filter: Filter by repository name
+            semantic_weight: Override default semantic weight (0 = BM25
+                only, skipping the embedder and vector store)
+            
+        Returns:
+            One list of SearchResult objects per query, in query order
+        """
+        if not queries:
+            return []
+        
+        weight = semantic_weight if semantic_weight is not None else self.semantic_weight
+        
+        filters = {}
+        if language:
+            filters["language"] = language.value
+        if entity_type:
+            filters["entity_type"] = entity_type.value
+        if repo_filter:
+            filters["repo_name"] = repo_filter
+        
+        bm25_futures = [self._submit_bm25(query, limit, filters) for query in queries]
+        embeddings = self._embed_queries(queries) if weight > 0 else [None] * len(queries)
+        
+        return [
+            self._hybrid_results(query, embedding, bm25_future, limit, weight, filters)
+            for query, embedding, bm25_future in zip(queries, embeddings, bm25_futures)
+        ]
+    
+    def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        Embed queries (after enhancement), reusing cached embeddings.
+        
+        Queries are keyed with whitespace collapsed but case kept, since
+        cased models like CodeBERT embed "URL" and "url" differently. Cache
+        misses are embedded together in one batch.
+        """
+        self._ensure_embedder()
+        keys = [' '.join(query.split()) for query in queries]
+        if self.embedder is not self._embedding_cache_owner:
+            self.invalidate_embedding_cache()
+        cache = self._embedding_cache
+        
+        with self._embedding_cache_lock:
+            cached = {}
+            for key in keys:
+                if key in cache:
+                    cache.move_to_end(key)
+                    cached[key] = cache[key]
+        
+        misses = list(dict.fromkeys(key for key in keys if key not in cached))
+        if misses:
+            # Enhance query for better semantic matching
+            # Add code-related context to help the model understand it's a code search query
+            embeddings = self.embedder.embed_batch([self._enhance_query(key) for key in misses])
+            with self._embedding_cache_lock:
+                for key, embedding in zip(misses, embeddings):
+                    # Stored as tuples so callers can't mutate a cached vector
+                    cached[key] = tuple(embedding)
+                    # All-zero vectors are the embedder's failure fallback
+                    if any(embedding):
+                        cache[key] = cached[key]
+                while len(cache) > QUERY_EMBEDDING_CACHE_SIZE:
+                    cache.popitem(last=False)
+        
+        return [list(cached[key]) for key in keys]
+    
+    def invalidate_embedding_cache(self) -> None:
+        """Drop all cached query embeddings (e.g. after swapping the embedder)."""
+        with self._embedding_cache_lock:
+            self._embedding_cache.clear()
+            self._embedding_cache_owner = self.embedder
+    
+    def close(self) -> None:
+        """Stop the BM25 worker threads; searches after this fail."""
+        self._bm25_executor.shutdown(wait=False)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def _fetch_limit(self, limit: int) -> int:
+        """Number of candidates to fetch from each backend for a search of limit results."""
+        return max(limit, int(limit * self.overfetch))
+    
+    def _submit_bm25(self, query: str, limit: int, filters: Dict[str, Any]) -> Future:
+        """Start a BM25 search on a worker thread."""
+        return self._bm25_executor.submit(
+            self.bm25_index.search,
             query=query,
-            limit=limit * 2,
+            limit=self._fetch_limit(limit),
             filters=filters if filters else None
         )
+    
+    def _hybrid_results(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]],
+        bm25_future: Future,
+        limit: int,
+        weight: float,
+        filters: Dict[str, Any]
+    ) -> List[SearchResult]:
+        """
+        Search the vector store, then fuse with the pending BM25 results.
+        
+        With no query embedding (a semantic weight of 0) the vector store
+        is never queried and the results are ranked by BM25 alone.
+        """
+        # Get semantic results
+        semantic_results = []
+        if query_embedding is not None:
+            semantic_results = self.vector_store.search(
+                query_embedding=query_embedding,
+                limit=self._fetch_limit(limit),  # Get more for merging
+                filters=filters if filters else None
+            )
+        
+        # Get BM25 results
+        bm25_results = bm25_future.result()
         
         # Merge results using RRF
         combined = self._reciprocal_rank_fusion(
@@ -221,12 +455,16 @@ class HybridSearchEngine(SearchEngine):
             bm25_results,
             semantic_weight=weight,
             k=60,  # RRF parameter
-            query=query  # Pass query for HTTP boost
-        )
+            query=query,  # Pass query for HTTP boost
+            limit=limit,
+            fusion=self.fusion
+        )[:limit]
+        # Semantic hits come back without their bodies; fetch just the kept ones
+        self.vector_store.load_sources([entity for entity, *_ in combined])
         
         # Convert to SearchResult objects
         search_results = []
-        for entity, score, sem_score, bm25_score in combined[:limit]:
+        for entity, score, sem_score, bm25_score in combined:
             search_results.append(SearchResult(
                 entity=entity,
                 score=score,
@@ -246,23 +484,23 @@ class HybridSearchEngine(SearchEngine):
         query_lower = query.lower()
         
         # If query mentions HTTP/API/web, add more context
-        if any(term in query_lower for term in ['http', 'request', 'api', 'url', 'web']):
+        if _HTTP_TERMS_RE.search(query_lower):
             # "handle http requests" is ambiguous - usually means "send/make" not "process"
             # Unless context clearly indicates processing (redirect, response, error, cookie)
-            if 'handle' in query_lower and not any(term in query_lower for term in ['redirect', 'response', 'error', 'exception', 'cookie', 'process']):
+            if 'handle' in query_lower and not _HANDLE_CONTEXT_RE.search(query_lower):
                 # "handle http requests" → "send/make http requests"
                 enhanced = "function that sends makes HTTP requests GET POST PUT DELETE PATCH"
-            elif any(term in query_lower for term in ['make', 'send', 'perform', 'execute', 'do']):
+            elif _SEND_TERMS_RE.search(query_lower):
                 # Explicitly about making/sending
                 enhanced = f"function that sends or makes HTTP requests: {query}"
             else:
                 # Generic HTTP request function
                 enhanced = f"HTTP request function: {query}"
-        elif any(term in query_lower for term in ['json', 'parse', 'decode']):
+        elif _JSON_TERMS_RE.search(query_lower):
             enhanced = f"JSON parsing function: {query}"
-        elif any(term in query_lower for term in ['auth', 'login', 'token']):
+        elif _AUTH_TERMS_RE.search(query_lower):
             enhanced = f"authentication function: {query}"
-        elif any(term in query_lower for term in ['download', 'file', 'save']):
+        elif _FILE_TERMS_RE.search(query_lower):
             enhanced = f"file handling function: {query}"
         else:
             # Add code-related context
@@ -276,120 +514,138 @@ class HybridSearchEngine(SearchEngine):
         bm25_results: List[Tuple[CodeEntity, float]],
         semantic_weight: float = 0.7,
         k: int = 60,
-        query: Optional[str] = None
+        query: Optional[str] = None,
+        limit: Optional[int] = None,
+        fusion: str = "rrf"
     ) -> List[Tuple[CodeEntity, float, float, float]]:
         """
         Combine results using Reciprocal Rank Fusion (RRF) with quality checks.
         
         RRF Score = Σ (1 / (k + rank))
         
+        With fusion="combsum", each list contributes its scores min-max
+        normalized to 0-1 instead of its ranks (CombSUM), so a clear winner
+        in one list outweighs a near tie in the other.
+        
         Args:
             semantic_results: Results from semantic search
             bm25_results: Results from BM25 search
             semantic_weight: Weight for semantic results
             k: RRF constant (typically 60)
+            query: Original query, used for the HTTP boost
+            limit: Number of top results to return (default: all)
+            fusion: "rrf" to fuse ranks, "combsum" to fuse scores
             
         Returns:
-            Combined list of (entity, combined_score, semantic_score, bm25_score)
+            Combined list of (entity, combined_score, semantic_score, bm25_score),
+            best first
         """
+        semantic_scores = np.fromiter(
+            (score for _, score in semantic_results),
+            dtype=np.float64,
+            count=len(semantic_results)
+        )
+        
         # If semantic results are all very similar (low quality), reduce their weight
+        weight = semantic_weight
         if semantic_results:
-            semantic_scores = [s for _, s in semantic_results]
-            score_range = max(semantic_scores) - min(semantic_scores)
+            score_range = float(np.ptp(semantic_scores))
             # If scores are too similar (< 0.05 range), semantic search is low quality
             if score_range < 0.05:
-                semantic_weight = 0.3  # Reduce semantic weight, favor BM25
+                weight = 0.3  # Reduce semantic weight, favor BM25
                 logger.debug("Low semantic score diversity, reducing semantic weight", range=score_range)
         
-        bm25_weight = 1 - semantic_weight
-        
-        # Build entity scores dictionary
-        scores: Dict[str, Dict[str, Any]] = {}
-        
-        # Process semantic results
-        # Note: For cosine similarity, scores are typically 0.9+ for good matches
-        # But we need to check if they're actually relevant, not just similar
-        for rank, (entity, score) in enumerate(semantic_results):
-            rrf_score = 1 / (k + rank + 1)
-            scores[entity.id] = {
-                'entity': entity,
-                'semantic_rrf': rrf_score * semantic_weight,
-                'semantic_raw': score,
-                'bm25_rrf': 0.0,
-                'bm25_raw': 0.0
-            }
-        
-        # Process BM25 results - always include (keyword search is reliable)
-        for rank, (entity, score) in enumerate(bm25_results):
-            rrf_score = 1 / (k + rank + 1)
-            
-            if entity.id in scores:
-                scores[entity.id]['bm25_rrf'] = rrf_score * bm25_weight
-                scores[entity.id]['bm25_raw'] = score
-            else:
-                scores[entity.id] = {
-                    'entity': entity,
-                    'semantic_rrf': 0.0,
-                    'semantic_raw': 0.0,
-                    'bm25_rrf': rrf_score * bm25_weight,
-                    'bm25_raw': score
-                }
+        bm25_weight = 1 - weight
+        
+        # Give each distinct entity a dense index, in first-seen order
+        # (semantic results first), and note where each result lands
+        index: Dict[str, int] = {}
+        entities: List[CodeEntity] = []
+        
+        def positions(results: List[Tuple[CodeEntity, float]]) -> np.ndarray:
+            pos = np.empty(len(results), dtype=np.intp)
+            for rank, (entity, _) in enumerate(results):
+                i = index.get(entity.id)
+                if i is None:
+                    i = index[entity.id] = len(entities)
+                    entities.append(entity)
+                pos[rank] = i
+            return pos
+        
+        sem_pos = positions(semantic_results)
+        bm25_pos = positions(bm25_results)
+        n = len(entities)
+        
+        # Score arrays indexed by entity. Note: for cosine similarity, scores
+        # are typically 0.9+ for good matches, but we need to check if they're
+        # actually relevant, not just similar. BM25 results are always
+        # included (keyword search is reliable)
+        semantic_rrf = np.zeros(n)
+        semantic_raw = np.zeros(n)
+        bm25_rrf = np.zeros(n)
+        bm25_raw = np.zeros(n)
+        
+        semantic_raw[sem_pos] = semantic_scores
+        bm25_raw[bm25_pos] = [score for _, score in bm25_results]
+        if fusion == "combsum":
+            # Entities missing from a list get 0 from it, like its minimum
+            semantic_rrf[sem_pos] = _min_max(semantic_scores) * weight
+            bm25_rrf[bm25_pos] = _min_max(bm25_raw[bm25_pos]) * bm25_weight
+        else:
+            # 1 / (k + rank) for every rank either list reaches, computed once
+            rrf_base = 1.0 / (k + np.arange(max(len(semantic_results), len(bm25_results))) + 1)
+            semantic_rrf[sem_pos] = rrf_base[:len(semantic_results)] * weight
+            bm25_rrf[bm25_pos] = rrf_base[:len(bm25_results)] * bm25_weight
         
         # Apply boosts for HTTP request functions when query is about HTTP
         # This helps prioritize actual request functions (api.py, sessions.py) over handlers
-        if query and any(term in query.lower() for term in ['http', 'request', 'api']):
-            for entity_id, data in scores.items():
-                entity = data['entity']
-                file_path = entity.file_path.lower()
-                name_lower = entity.name.lower()
+        http_boost = np.ones(n)
+        if query and _HTTP_BOOST_QUERY_RE.search(query.lower()):
+            for i, entity in enumerate(entities):
+                file_path = entity.file_path_lc
+                name_lower = entity.name_lc
                 
                 # Boost actual HTTP request functions
                 if 'api.py' in file_path:
                     # Boost functions in api.py (request, get, post, etc.)
-                    if any(term in name_lower for term in ['request', 'get', 'post', 'put', 'patch', 'delete', 'head', 'options']):
-                        data['http_boost'] = 1.5
-                    else:
-                        data['http_boost'] = 1.0
+                    if _HTTP_VERB_NAME_RE.search(name_lower):
+                        http_boost[i] = 1.5
                 elif 'sessions.py' in file_path and 'send' in name_lower:
                     # Boost send() in sessions.py
-                    data['http_boost'] = 1.5
+                    http_boost[i] = 1.5
                 elif 'adapters.py' in file_path and 'send' in name_lower:
                     # Boost send() in adapters.py
-                    data['http_boost'] = 1.3
-                elif any(term in name_lower for term in ['handle_', 'test_']):
+                    http_boost[i] = 1.3
+                elif _HANDLER_OR_TEST_RE.search(name_lower):
                     # Reduce score for handlers and tests
-                    data['http_boost'] = 0.7
-                else:
-                    data['http_boost'] = 1.0
-        else:
-            # No boost if not HTTP-related query
-            for entity_id, data in scores.items():
-                data['http_boost'] = 1.0
-        
-        # Combine scores and sort
-        combined = []
-        for entity_id, data in scores.items():
-            boost = data.get('http_boost', 1.0)
-            combined_score = (data['semantic_rrf'] + data['bm25_rrf']) * boost
-            combined.append((
-                data['entity'],
-                combined_score,
-                data['semantic_raw'],
-                data['bm25_raw']
-            ))
+                    http_boost[i] = 0.7
+        
+        combined = (semantic_rrf + bm25_rrf) * http_boost
         
-        combined.sort(key=lambda x: x[1], reverse=True)
+        # Pick the top `limit` without fully sorting: partition, keep every
+        # candidate tied with the cutoff score, then sort just those (stable,
+        # so ties stay in first-seen order)
+        if limit is not None and 0 < limit < n:
+            cutoff = combined[np.argpartition(-combined, limit - 1)[limit - 1]]
+            candidates = np.flatnonzero(combined >= cutoff)
+        else:
+            candidates = np.arange(n)
+        order = candidates[np.argsort(-combined[candidates], kind='stable')][:limit]
         
         # Normalize scores to 0-1 range for better UX
-        if combined:
-            max_score = combined[0][1]  # Highest score
-            if max_score > 0:
-                combined = [
-                    (entity, score / max_score, sem_score, bm25_score)
-                    for entity, score, sem_score, bm25_score in combined
-                ]
-        
-        return combined
+        scores = combined[order]
+        if scores.size and scores[0] > 0:
+            scores = scores / scores[0]
+        
+        return [
+            (entities[i], score, sem_score, bm25_score)
+            for i, score, sem_score, bm25_score in zip(
+                order.tolist(),
+                scores.tolist(),
+                semantic_raw[order].tolist(),
+                bm25_raw[order].tolist()
+            )
+        ]
     
     def search_by_query(self, query: SearchQuery) -> List[SearchResult]:
         """Search using a SearchQuery object."""
@@ -420,8 +676,6 @@ class LocalSearchEngine:
     
     def __init__(self):
         """Initialize the local search engine."""
-        from ..embeddings.generator import MockEmbedder
-        
         self.bm25_index = BM25Index()
         self.embedder = MockEmbedder()  # Use mock for local search
         self._entities: Dict[str, CodeEntity] = {}
@@ -437,31 +691,28 @@ class LocalSearchEngine:
         Returns:
             Number of entities indexed
         """
-        from pathlib import Path
-        from ..parser import ParserFactory
-        
         dir_path = Path(directory)
         if not dir_path.exists():
             raise FileNotFoundError(f"Directory not found: {directory}")
         
-        entities = []
-        
-        # Find all supported files
-        for ext in ParserFactory.supported_extensions():
-            for file_path in dir_path.rglob(f"*{ext}"):
-                # Skip common non-source directories
-                if any(p in file_path.parts for p in [
-                    'node_modules', 'venv', '.venv', '__pycache__',
-                    '.git', 'dist', 'build', 'target'
-                ]):
-                    continue
-                
-                file_entities = ParserFactory.parse_file(file_path, repo_name)
-                entities.extend(file_entities)
+        # Find all supported files in one walk, grouped by extension in
+        # registration order
+        extensions = tuple(ParserFactory.supported_extensions())
+        by_extension: Dict[str, List[Path]] = {ext: [] for ext in extensions}
+        for path in _iter_source_files(str(dir_path), extensions):
+            for ext in extensions:
+                if path.endswith(ext):
+                    by_extension[ext].append(Path(path))
+                    break
+        
+        # Parsing is CPU-bound, so fan it out over processes
+        entities = ParserFactory.parse_files(
+            [path for paths in by_extension.values() for path in paths],
+            repo_name
+        )
         
         # Add to BM25 index
-        for entity in entities:
-            self._entities[entity.id] = entity
+        self._entities.update((entity.id, entity) for entity in entities)
         
         self.bm25_index.add_entities(entities)
         
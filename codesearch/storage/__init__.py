@@ -2,8 +2,8 @@
 Storage module for vector database and index management.
 """
 
-from .vector_store import VectorStore, QdrantStore
+from .vector_store import VectorStore, QdrantStore, InMemoryVectorStore
 from .bm25_index import BM25Index
 
-__all__ = ["VectorStore", "QdrantStore", "BM25Index"]
+__all__ = ["VectorStore", "QdrantStore", "InMemoryVectorStore", "BM25Index"]
 
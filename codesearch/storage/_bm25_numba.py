@@ -0,0 +1,29 @@
+"""
+Numba-compiled BM25 scoring kernel, used when numba is installed.
+"""
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; BM25 falls back to numpy
+    accumulate_scores = None
+else:
+    @njit(cache=True, nogil=True)
+    def accumulate_scores(term_ids, data, indices, indptr, out):
+        """
+        Add each query term's precomputed BM25 contributions into out.
+
+        Walks the CSC postings of every term in term_ids in order, so out
+        ends up exactly as numpy's per-term scatter-add would leave it.
+        Runs without the GIL, so searches on other threads score at the
+        same time.
+
+        Args:
+            term_ids: Vocabulary ids of the query terms (int64, repeats allowed)
+            data: Per-posting BM25 contributions
+            indices: Document id of each posting
+            indptr: Postings of term t are indptr[t]:indptr[t + 1]
+            out: Per-document scores to accumulate into
+        """
+        for t in term_ids:
+            for j in range(indptr[t], indptr[t + 1]):
+                out[indices[j]] += data[j]
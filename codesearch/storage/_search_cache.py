@@ -0,0 +1,128 @@
+"""
+Small in-process cache of recent search results, shared by the stores.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Sequence, Tuple
+import numpy as np
+
+
+class SearchCache:
+    """
+    Thread-safe LRU of search results, each kept for at most ttl seconds.
+    
+    Stores put a version number in their keys and bump it on every write,
+    so entries from before a change are never hit again and just age out.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Args:
+            maxsize: Maximum number of cached searches (0 disables caching)
+            ttl: Seconds a cached result stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, List[Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[List[Any]]:
+        """Return a copy of the cached results for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            # A copy, so callers can't reorder or truncate the cached list
+            return list(entry[1])
+    
+    def put(self, key: Hashable, results: List[Any]) -> None:
+        """Cache results for key, evicting the least recently used entries."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, list(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class SimilarQueryCache:
+    """
+    Thread-safe cache of vector search results, hit by near-duplicate queries.
+    
+    A lookup hits an entry whose query vector has cosine similarity of at
+    least threshold with the new one and whose context (store version,
+    limit, filters) is equal. Cached vectors are rows of one matrix, so a
+    lookup is a single matrix-vector product: at a few thousand entries that
+    is cheaper than hashing, and unlike LSH buckets it never misses a close
+    query. Full, the cache overwrites its oldest entry.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float, threshold: float):
+        """
+        Args:
+            maxsize: Maximum number of cached searches (0 disables caching)
+            ttl: Seconds a cached result stays valid
+            threshold: Minimum cosine similarity for a hit (above 1 disables)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self._vectors: Optional[np.ndarray] = None  # allocated on first put
+        self._entries: List[Tuple[float, Hashable, List[Any]]] = []
+        self._next = 0  # slot the next put overwrites once full
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _unit(vector: Sequence[float]) -> Optional[np.ndarray]:
+        """The vector scaled to unit length, or None for a zero vector."""
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else None
+    
+    def get(self, vector: Sequence[float], context: Hashable) -> Optional[List[Any]]:
+        """Return a copy of the results of the closest similar query, or None on a miss."""
+        if self.maxsize <= 0 or self.threshold > 1:
+            return None
+        query = self._unit(vector)
+        with self._lock:
+            if query is None or self._vectors is None or len(query) != self._vectors.shape[1]:
+                return None
+            similarities = self._vectors[:len(self._entries)] @ query
+            now = time.monotonic()
+            for slot in np.argsort(-similarities).tolist():
+                if similarities[slot] < self.threshold:
+                    break
+                expires, entry_context, results = self._entries[slot]
+                if entry_context == context and expires >= now:
+                    return list(results)
+            return None
+    
+    def put(self, vector: Sequence[float], context: Hashable, results: List[Any]) -> None:
+        """Cache results for a query vector in a context."""
+        if self.maxsize <= 0 or self.threshold > 1:
+            return
+        query = self._unit(vector)
+        if query is None:
+            return
+        with self._lock:
+            if self._vectors is None or len(query) != self._vectors.shape[1]:
+                # First put, or the embedding model changed
+                self._vectors = np.zeros((self.maxsize, len(query)), dtype=np.float32)
+                self._entries = []
+                self._next = 0
+            entry = (time.monotonic() + self.ttl, context, list(results))
+            if len(self._entries) < self.maxsize:
+                slot = len(self._entries)
+                self._entries.append(entry)
+            else:
+                slot = self._next
+                self._entries[slot] = entry
+                self._next = (slot + 1) % self.maxsize
+            self._vectors[slot] = query
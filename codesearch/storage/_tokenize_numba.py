@@ -0,0 +1,52 @@
+"""
+Numba-compiled BM25 tokenizer pass for ASCII text, used when numba is installed.
+"""
+
+import numpy as np
+
+
+def _normalize_ascii(src: np.ndarray, out: np.ndarray) -> int:
+    """
+    Apply the tokenizer's CamelCase splits and character cleanup in one pass.
+    
+    Matches the regex passes plus the ASCII translate table byte for byte:
+    a space goes between a lowercase and an uppercase letter and after an
+    uppercase letter that starts an uppercase-then-lowercase pair, letters
+    are lowercased, digits and NUL separators are kept, and every other
+    byte becomes a space.
+    
+    Args:
+        src: ASCII text as uint8
+        out: Output buffer of at least 3 * len(src) bytes
+    
+    Returns:
+        Number of bytes written to out
+    """
+    n = len(src)
+    j = 0
+    for i in range(n):
+        c = src[i]
+        if 65 <= c <= 90:  # A-Z
+            if i > 0 and 97 <= src[i - 1] <= 122:
+                out[j] = 32
+                j += 1
+            out[j] = c + 32
+            j += 1
+            if i + 2 < n and 65 <= src[i + 1] <= 90 and 97 <= src[i + 2] <= 122:
+                out[j] = 32
+                j += 1
+        elif 97 <= c <= 122 or 48 <= c <= 57 or c == 0:
+            out[j] = c
+            j += 1
+        else:
+            out[j] = 32
+            j += 1
+    return j
+
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the tokenizer falls back to regexes
+    normalize_ascii = None
+else:
+    normalize_ascii = njit(cache=True)(_normalize_ascii)
@@ -2,18 +2,352 @@
 BM25 index for lexical/keyword search to complement semantic search.
 """
 
+import functools
+import itertools
 import json
+import os
 import pickle
+import re
+import shutil
+import sys
+import threading
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Set
+from typing import List, Dict, Optional, Tuple, Union
+import numpy as np
 import structlog
-from rank_bm25 import BM25Okapi
 
 from ..models import CodeEntity
 from ..config import settings
+from ._bm25_numba import accumulate_scores
+from ._search_cache import SearchCache
+from ._tokenize_numba import normalize_ascii
 
 logger = structlog.get_logger()
 
+# MaxScore only pays off once a query's postings outnumber its per-step
+# overhead, and it gives up once it has scored more than 1/8 of the
+# corpus: by then a plain scatter over every posting is cheaper
+PRUNE_MIN_POSTINGS = 1 << 16
+PRUNE_MAX_TOUCHED_FRACTION = 8
+
+# add_entities tokenizes batches at least this large in worker processes;
+# below it, starting the pool costs more than it saves
+PARALLEL_TOKENIZE_MIN_DOCS = 20000
+
+# Entity fields that search filters match on
+FILTER_FIELDS = ("language", "entity_type", "repo_name")
+
+# The largest arrays, each saved as its own .npy file and memory-mapped on
+# load, so only the pages a query or rebuild touches are ever read
+MMAP_ARRAYS = ("term_ids", "data", "indices", "indptr")
+
+# Names the generation directory holding the current index; replaced
+# atomically by every save
+MANIFEST_FILE = "bm25_current.json"
+
+# Tells apart generations saved by one process within the clock's resolution
+_generation_counter = itertools.count()
+
+# Tokenizer passes. CamelCase splits run before lowercasing:
+# parseJSON -> parse JSON, then JSONData -> JSON Data (uppercase run
+# followed by a capitalized word)
+_CAMEL_LOWER_UPPER_RE = re.compile(r'([a-z])([A-Z])')
+_CAMEL_ACRONYM_RE = re.compile(r'[A-Z](?=[A-Z][a-z])')
+# After lowercasing, every run of anything but alphanumerics and whitespace
+# (snake_case and path separators included) becomes one space
+_NON_TOKEN_RE = re.compile(r'[^a-z0-9\s]+')
+# The same, keeping _tokenize_batch's NUL document separators
+_NON_TOKEN_OR_NUL_RE = re.compile(r'[^a-z0-9\s\0]+')
+# ASCII fast path for lowercasing plus the cleanup above: one table lookup
+# per character, lowercasing letters and blanking all but digits
+_ASCII_TOKEN_TABLE = str.maketrans({
+    chr(i): chr(i).lower() if chr(i).isalnum() else ' ' for i in range(128)
+})
+_ASCII_TOKEN_OR_NUL_TABLE = {**_ASCII_TOKEN_TABLE, 0: '\0'}
+
+
+@functools.lru_cache(maxsize=8192)
+def _tokenize_text(text: str) -> Tuple[str, ...]:
+    """Tokenize text for BM25 (cached: queries repeat)."""
+    # Split CamelCase BEFORE converting to lowercase
+    text = _CAMEL_LOWER_UPPER_RE.sub(r'\1 \2', text)
+    text = _CAMEL_ACRONYM_RE.sub(r'\g<0> ', text)
+    
+    # Convert to lowercase, split snake_case and other separators, and
+    # remove special characters but keep alphanumeric
+    if text.isascii():
+        text = text.translate(_ASCII_TOKEN_TABLE)
+    else:
+        text = _NON_TOKEN_RE.sub(' ', text.lower())
+    
+    # Split and filter
+    return tuple(t for t in text.split() if len(t) >= 2)  # Min length 2
+
+
+def _tokenize_batch(texts: List[str]) -> List[List[str]]:
+    """
+    Tokenize many texts at once, exactly as _tokenize_text would one by one.
+    
+    The texts are joined with a NUL separator so each regex pass runs
+    once over the whole batch in C, instead of once per text. None of
+    the passes can match across the separator, and the final character
+    filter leaves it in place so the batch can be split back apart.
+    """
+    if not texts:
+        return []
+    
+    # One non-ASCII text would send the whole batch down the slower
+    # unicode path, so ASCII and non-ASCII texts are batched separately
+    is_ascii = [t.isascii() for t in texts]
+    if not all(is_ascii) and any(is_ascii):
+        documents: List[List[str]] = [[] for _ in texts]
+        for ascii_only in (True, False):
+            rows = [i for i, flag in enumerate(is_ascii) if flag is ascii_only]
+            for i, doc in zip(rows, _tokenize_batch([texts[i] for i in rows])):
+                documents[i] = doc
+        return documents
+    
+    # A NUL inside a text would only become a space in the last pass
+    text = '\0'.join(t.replace('\0', ' ') for t in texts)
+    if is_ascii[0] and normalize_ascii is not None:
+        # All three passes in one compiled loop over the bytes
+        src = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+        out = np.empty(3 * len(src), dtype=np.uint8)
+        text = out[:normalize_ascii(src, out)].tobytes().decode('ascii')
+    else:
+        text = _CAMEL_LOWER_UPPER_RE.sub(r'\1 \2', text)
+        text = _CAMEL_ACRONYM_RE.sub(r'\g<0> ', text)
+        if is_ascii[0]:
+            text = text.translate(_ASCII_TOKEN_OR_NUL_TABLE)
+        else:
+            text = _NON_TOKEN_OR_NUL_RE.sub(' ', text.lower())
+    
+    # Interned: a corpus repeats a small vocabulary millions of times,
+    # and vocabulary lookups on shared strings compare by identity
+    return [
+        [sys.intern(t) for t in chunk.split() if len(t) >= 2]
+        for chunk in text.split('\0')
+    ]
+
+
+def _encode_batch(texts: List[str]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Tokenize texts into term ids against a vocabulary local to the batch.
+    
+    Run in add_entities' worker processes: a few arrays and the batch's
+    distinct terms pickle far smaller than every token would.
+    
+    Returns:
+        Tuple of (local vocabulary in first-seen order, every text's local
+        term ids concatenated, each text's length in tokens)
+    """
+    documents = _tokenize_batch(texts)
+    vocab: Dict[str, int] = {}
+    term_ids = np.fromiter(
+        (vocab.setdefault(t, len(vocab)) for doc in documents for t in doc),
+        dtype=np.int32
+    )
+    doc_lengths = np.fromiter((len(doc) for doc in documents), dtype=np.int64, count=len(documents))
+    return list(vocab), term_ids, doc_lengths
+
+
+class _EagerBM25:
+    """
+    Okapi BM25 with every (term, document) score computed at build time.
+    
+    Scores match rank_bm25's BM25Okapi, including its floor of
+    epsilon * average IDF for negative IDFs. Contributions are stored by
+    term id, CSC style: the postings of term t are the documents
+    indices[indptr[t]:indptr[t + 1]], scoring data[indptr[t]:indptr[t + 1]].
+    A query is then one gather-add per query term, instead of a Python pass
+    over every document's term counts. With numba installed, the
+    accumulation runs in one compiled loop over the query's postings.
+    """
+    
+    def __init__(
+        self,
+        term_ids: np.ndarray,
+        doc_lengths: np.ndarray,
+        n_terms: int,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25
+    ):
+        """
+        Build the score matrix.
+        
+        Args:
+            term_ids: Term ids of every document, concatenated in document
+                order; ids are numbered in first-seen order
+            doc_lengths: Number of terms in each document (at least one document)
+            n_terms: Vocabulary size; every id below it occurs
+            k1: Term frequency saturation
+            b: Document length normalization
+            epsilon: IDF floor, as a fraction of the average IDF
+        """
+        self.n_docs = len(doc_lengths)
+        self.n_terms = n_terms
+        doc_ids = np.repeat(np.arange(self.n_docs, dtype=np.int64), doc_lengths)
+        
+        # One entry per distinct (term, document) pair, ordered by term then
+        # document, with its term frequency
+        pairs, tf = np.unique(term_ids.astype(np.int64) * self.n_docs + doc_ids, return_counts=True)
+        terms = pairs // self.n_docs
+        self.indices = (pairs - terms * self.n_docs).astype(np.int32)
+        
+        df = np.bincount(terms, minlength=n_terms)
+        self.indptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(df, out=self.indptr[1:])
+        
+        idf = np.log(self.n_docs - df + 0.5) - np.log(df + 0.5)
+        # The average is summed in first-seen order, as rank_bm25 does,
+        # which is simply id order
+        if n_terms:
+            idf[idf < 0] = epsilon * (sum(idf.tolist()) / n_terms)
+        
+        avgdl = int(doc_lengths.sum()) / self.n_docs
+        dl = doc_lengths[self.indices]
+        self.data = idf[terms] * (tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl)))
+        self._init_bounds()
+    
+    @classmethod
+    def from_arrays(
+        cls,
+        data: np.ndarray,
+        indices: np.ndarray,
+        indptr: np.ndarray,
+        n_docs: int,
+        max_scores: Optional[np.ndarray] = None,
+        prunable: Optional[bool] = None
+    ) -> "_EagerBM25":
+        """
+        Wrap a previously built score matrix without recomputing it.
+        
+        Passing the saved pruning bounds too keeps a memory-mapped data
+        array from being read in full just to recompute them.
+        """
+        bm25 = cls.__new__(cls)
+        bm25.data = data
+        bm25.indices = indices
+        bm25.indptr = indptr
+        bm25.n_docs = n_docs
+        bm25.n_terms = len(indptr) - 1
+        if max_scores is None or prunable is None:
+            bm25._init_bounds()
+        else:
+            bm25.max_scores = max_scores
+            bm25.prunable = prunable
+        return bm25
+    
+    def _init_bounds(self) -> None:
+        """Compute each term's largest contribution, for MaxScore pruning."""
+        self.max_scores = np.zeros(self.n_terms)
+        nonempty = self.indptr[1:] > self.indptr[:-1]
+        if len(self.data):
+            self.max_scores[nonempty] = np.maximum.reduceat(self.data, self.indptr[:-1][nonempty])
+        # Pruning relies on a document's score only growing as terms are added
+        self.prunable = not len(self.data) or bool(self.data.min() >= 0)
+    
+    def _find_postings(self, t: int, docs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Look up documents in a term's postings by binary search.
+        
+        Returns:
+            Tuple of (mask of docs that contain the term, each doc's position
+            in data and indices, meaningful where the mask is set)
+        """
+        start, end = self.indptr[t], self.indptr[t + 1]
+        postings = self.indices[start:end]
+        pos = np.searchsorted(postings, docs)
+        hit = pos < len(postings)
+        hit[hit] = postings[pos[hit]] == docs[hit]
+        return hit, start + pos
+    
+    def get_top_scores(self, term_ids: List[int], limit: int) -> np.ndarray:
+        """
+        Score documents against the query, exactly for any that can make the top limit.
+        
+        MaxScore pruning: terms are accumulated in decreasing order of their
+        largest contribution, so rare terms come first. Once the limit-th
+        best score so far exceeds what an unscored document could still
+        gain, only documents that can still reach it are scored further, and
+        the long postings of common terms are probed rather than scattered
+        in full. The candidates are then rescored in query order, so their
+        scores match get_scores exactly; every other document keeps a
+        partial score below the top `limit`.
+        """
+        term_ids = [t for t in term_ids if t < self.n_terms]
+        if not self.prunable or not 0 < limit < self.n_docs or len(term_ids) < 2:
+            return self.get_scores(term_ids)
+        postings = sum(self.indptr[t + 1] - self.indptr[t] for t in term_ids)
+        if postings < PRUNE_MIN_POSTINGS:
+            return self.get_scores(term_ids)
+        
+        order = sorted(term_ids, key=lambda t: -self.max_scores[t])
+        # Most a document can still gain once order[:i] has been added
+        remaining = np.append(np.cumsum(self.max_scores[order][::-1])[::-1], 0.0)
+        
+        scores = np.zeros(self.n_docs)
+        seen = np.zeros(self.n_docs, dtype=bool)
+        touched = np.empty(0, dtype=self.indices.dtype)
+        candidates: Optional[np.ndarray] = None
+        for i, t in enumerate(order[:-1]):
+            start, end = self.indptr[t], self.indptr[t + 1]
+            if candidates is None:
+                docs = self.indices[start:end]
+                scores[docs] += self.data[start:end]
+                docs = docs[~seen[docs]]
+                seen[docs] = True
+                touched = np.concatenate((touched, docs))
+                if len(touched) * PRUNE_MAX_TOUCHED_FRACTION > self.n_docs:
+                    # Too little left to skip for pruning to pay off
+                    break
+                pool = touched
+            else:
+                hit, pos = self._find_postings(t, candidates)
+                scores[candidates[hit]] += self.data[pos[hit]]
+                pool = candidates
+            
+            if len(pool) <= limit:
+                continue
+            # Slack keeps rounding (partial sums here run in a different
+            # order than the final scores) from dropping a tied document
+            cutoff = np.partition(scores[pool], -limit)[-limit] * (1 - 1e-9)
+            if cutoff > remaining[i + 1]:
+                # Untouched documents score 0, so none of them can make it
+                candidates = pool[scores[pool] + remaining[i + 1] >= cutoff]
+        
+        if candidates is None:
+            return self.get_scores(term_ids)
+        
+        exact = np.zeros(len(candidates))
+        for t in term_ids:
+            hit, pos = self._find_postings(t, candidates)
+            exact[hit] += self.data[pos[hit]]
+        scores[candidates] = exact
+        return scores
+    
+    def get_scores(self, term_ids: List[int]) -> np.ndarray:
+        """Score every document against the query's term ids."""
+        scores = np.zeros(self.n_docs)
+        # Terms added to the vocabulary after this build have no postings yet
+        term_ids = [t for t in term_ids if t < self.n_terms]
+        
+        if accumulate_scores is not None:
+            accumulate_scores(
+                np.array(term_ids, dtype=np.int64),
+                self.data, self.indices, self.indptr, scores
+            )
+            return scores
+        
+        for t in term_ids:
+            start, end = self.indptr[t], self.indptr[t + 1]
+            scores[self.indices[start:end]] += self.data[start:end]
+        return scores
+
 
 class BM25Index:
     """
@@ -34,10 +368,38 @@ class BM25Index:
         self.index_path = Path(self.index_path)
         self.index_path.mkdir(parents=True, exist_ok=True)
         
-        self._bm25: Optional[BM25Okapi] = None
-        self._entities: List[CodeEntity] = []
-        self._entity_ids: Dict[str, int] = {}  # entity_id -> index
-        self._corpus: List[List[str]] = []
+        self._bm25: Optional[_EagerBM25] = None
+        # Entities loaded from disk stay JSON bytes until a search returns them
+        self._entities: List[Union[CodeEntity, bytes]] = []
+        self._entity_ids: Dict[str, int] = {}  # entity_id -> index, in index order
+        # Each entity's filterable fields as small int codes, assigned per
+        # field in first-seen order, so filtering and removing a repository
+        # are vectorized compares and loading never decodes entities
+        self._field_ids: Dict[str, Dict[str, int]] = {field: {} for field in FILTER_FIELDS}
+        self._field_codes: Dict[str, array] = {field: array('i') for field in FILTER_FIELDS}
+        # Tokenized documents as structure-of-arrays: every document's term
+        # ids concatenated in document order, and each document's length.
+        # Batches added since the arrays were last touched wait in _pending.
+        # The vocabulary holds exactly the terms in the corpus, numbered in
+        # first-seen order, so building the index needn't recover that order
+        self._vocab: Dict[str, int] = {}  # term -> id
+        self._term_ids = np.zeros(0, dtype=np.int32)
+        self._doc_lengths = np.zeros(0, dtype=np.int64)
+        self._pending: List[Tuple[np.ndarray, np.ndarray]] = []
+        # Saved generation whose .npy files the arrays above may map, kept
+        # on disk by save() while this index uses it
+        self._mapped_generation: Optional[str] = None
+        # Field codes as of the last build, as arrays for masking
+        self._filter_fields: Dict[str, Tuple[Dict[str, int], np.ndarray]] = {}
+        
+        # Set when entities change; the score matrix is rebuilt on the next
+        # search rather than per batch, so bulk ingestion stays linear
+        self._dirty = False
+        self._rebuild_lock = threading.Lock()
+        
+        # Bumped whenever entities change; part of every search cache key
+        self._version = 0
+        self._search_cache = SearchCache(settings.search_cache_size, settings.search_cache_ttl)
     
     def _tokenize(self, text: str) -> List[str]:
         """
@@ -48,28 +410,35 @@ class BM25Index:
         - snake_case splitting
         - Preserving important code patterns
         """
-        import re
-        
-        # Split CamelCase BEFORE converting to lowercase
-        # Handle: parseJSON -> parse JSON
-        text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
-        # Handle: JSONData -> JSON Data (uppercase followed by lowercase)
-        text = re.sub(r'([A-Z]+)([A-Z][a-z])', r'\1 \2', text)
-        
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Split snake_case and other separators
-        text = re.sub(r'[_\-./\\]', ' ', text)
-        
-        # Remove special characters but keep alphanumeric
-        text = re.sub(r'[^a-z0-9\s]', ' ', text)
-        
-        # Split and filter
-        tokens = text.split()
-        tokens = [t for t in tokens if len(t) >= 2]  # Min length 2
-        
-        return tokens
+        return list(_tokenize_text(text))
+    
+    def _tokenize_many(self, texts: List[str]) -> List[List[str]]:
+        """Tokenize many texts at once, exactly as _tokenize would one by one."""
+        return _tokenize_batch(texts)
+    
+    def _append_field_codes(self, entity: CodeEntity) -> None:
+        """Append an entity's filterable field codes, assigning new ones on first sight."""
+        values = (entity.language.value, entity.entity_type.value, entity.repo_name)
+        for field, value in zip(FILTER_FIELDS, values):
+            ids = self._field_ids[field]
+            code = ids.get(value)
+            if code is None:
+                code = ids[value] = len(ids)
+            self._field_codes[field].append(code)
+    
+    def _reset_field_codes(self) -> None:
+        """Recompute every entity's field codes (after loading entities)."""
+        self._field_ids = {field: {} for field in FILTER_FIELDS}
+        self._field_codes = {field: array('i') for field in FILTER_FIELDS}
+        for entity in self._entities:
+            self._append_field_codes(entity)
+    
+    def _entity(self, i: int) -> CodeEntity:
+        """Get the entity at index i, decoding it on first access after a load."""
+        entity = self._entities[i]
+        if isinstance(entity, bytes):
+            entity = self._entities[i] = CodeEntity.model_validate_json(entity)
+        return entity
     
     def _entity_to_document(self, entity: CodeEntity) -> str:
         """Convert a code entity to a searchable document."""
@@ -85,34 +454,124 @@ class BM25Index:
     
     def add_entities(self, entities: List[CodeEntity]) -> int:
         """Add entities to the BM25 index."""
-        added = 0
-        
+        new_entities = []
         for entity in entities:
             if entity.id in self._entity_ids:
                 continue  # Skip duplicates
             
-            doc = self._entity_to_document(entity)
-            tokens = self._tokenize(doc)
-            
             self._entity_ids[entity.id] = len(self._entities)
             self._entities.append(entity)
-            self._corpus.append(tokens)
-            added += 1
+            self._append_field_codes(entity)
+            new_entities.append(entity)
+        
+        # Tokenize the whole batch in one pass, or in one pass per worker
+        # process for big batches
+        documents = [self._entity_to_document(entity) for entity in new_entities]
+        workers = min(settings.max_workers, os.cpu_count() or 1)
+        if len(documents) >= PARALLEL_TOKENIZE_MIN_DOCS and workers > 1:
+            chunk = -(-len(documents) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for encoded in executor.map(_encode_batch, [
+                    documents[i:i + chunk] for i in range(0, len(documents), chunk)
+                ]):
+                    self._append_encoded(*encoded)
+        else:
+            self._append_documents(self._tokenize_many(documents))
+        added = len(new_entities)
         
-        # Rebuild BM25 index
+        # Rebuild BM25 index before the next search
         if added > 0:
-            self._rebuild_index()
+            self._dirty = True
+            self._version += 1
         
         logger.debug("Added entities to BM25 index", count=added)
         return added
     
+    def _append_documents(self, documents: List[List[str]]) -> None:
+        """Queue tokenized documents for the corpus arrays, as term ids."""
+        vocab = self._vocab
+        term_ids = np.fromiter(
+            (vocab.setdefault(t, len(vocab)) for doc in documents for t in doc),
+            dtype=np.int32
+        )
+        doc_lengths = np.fromiter((len(doc) for doc in documents), dtype=np.int64, count=len(documents))
+        self._pending.append((term_ids, doc_lengths))
+    
+    def _append_encoded(
+        self,
+        local_vocab: List[str],
+        term_ids: np.ndarray,
+        doc_lengths: np.ndarray
+    ) -> None:
+        """
+        Queue documents encoded by _encode_batch, translating their term ids.
+        
+        Batches must arrive in document order: local vocabularies are in
+        first-seen order, so terms get the same ids _append_documents would
+        have given them.
+        """
+        vocab = self._vocab
+        to_global = np.fromiter(
+            (vocab.setdefault(sys.intern(t), len(vocab)) for t in local_vocab),
+            dtype=np.int32,
+            count=len(local_vocab)
+        )
+        self._pending.append((to_global[term_ids], doc_lengths))
+    
+    def _corpus_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Fold pending batches into the corpus arrays and return them."""
+        if self._pending:
+            self._term_ids = np.concatenate([self._term_ids] + [t for t, _ in self._pending])
+            self._doc_lengths = np.concatenate([self._doc_lengths] + [n for _, n in self._pending])
+            self._pending = []
+        return self._term_ids, self._doc_lengths
+    
+    def _compact_vocab(self) -> None:
+        """Renumber the vocabulary in first-seen order, dropping terms no longer in the corpus."""
+        term_ids, _ = self._corpus_arrays()
+        first_seen = np.unique(term_ids, return_index=True)[1]
+        present = term_ids[np.sort(first_seen)]
+        new_ids = np.zeros(len(self._vocab), dtype=np.int32)
+        new_ids[present] = np.arange(len(present), dtype=np.int32)
+        terms = list(self._vocab)
+        self._vocab = {terms[t]: i for i, t in enumerate(present.tolist())}
+        self._term_ids = new_ids[term_ids]
+    
+    def _ensure_index(self) -> None:
+        """Rebuild the BM25 index if entities changed since the last build."""
+        # A search arriving mid-rebuild waits for it, rather than pairing
+        # the old score matrix with the new entities
+        if not self._dirty and not self._rebuild_lock.locked():
+            return
+        with self._rebuild_lock:
+            if self._dirty:
+                # Cleared first, so a change made during the rebuild
+                # triggers another one
+                self._dirty = False
+                self._rebuild_index()
+    
     def _rebuild_index(self) -> None:
         """Rebuild the BM25 index from corpus."""
-        if not self._corpus:
+        if not self._entities:
             self._bm25 = None
+            self._filter_fields = {}
             return
         
-        self._bm25 = BM25Okapi(self._corpus)
+        self._bm25 = _EagerBM25(*self._corpus_arrays(), n_terms=len(self._vocab))
+        self._filter_fields = self._build_filter_fields()
+    
+    def _build_filter_fields(self) -> Dict[str, Tuple[Dict[str, int], np.ndarray]]:
+        """
+        Snapshot each filterable field of the entities as an int-encoded column.
+        
+        Returns:
+            Dict of field name to (value -> code, each entity's code), so
+            filtering compares small ints instead of strings
+        """
+        return {
+            field: (dict(self._field_ids[field]), np.array(self._field_codes[field], dtype=np.intc))
+            for field in FILTER_FIELDS
+        }
     
     def search(
         self,
@@ -131,93 +590,246 @@ class BM25Index:
         Returns:
             List of (entity, score) tuples sorted by relevance
         """
+        key = (self._version, query, limit, tuple(sorted(filters.items())) if filters else None)
+        results = self._search_cache.get(key)
+        if results is None:
+            results = self._search(query, limit, filters)
+            self._search_cache.put(key, results)
+        return results
+    
+    def _search(
+        self,
+        query: str,
+        limit: int,
+        filters: Optional[Dict[str, str]]
+    ) -> List[Tuple[CodeEntity, float]]:
+        """Search the BM25 index, bypassing the result cache."""
+        self._ensure_index()
         if not self._bm25 or not self._entities:
             return []
         
-        # Tokenize query
-        query_tokens = self._tokenize(query)
+        # Tokenize query (memoized; the cached tuple is used as is)
+        query_tokens = _tokenize_text(query)
         
         if not query_tokens:
             return []
         
         # Get BM25 scores
-        scores = self._bm25.get_scores(query_tokens)
+        term_ids = [self._vocab[token] for token in query_tokens if token in self._vocab]
+        if filters:
+            scores = self._bm25.get_scores(term_ids)
+        else:
+            # Exact wherever it matters: no document left with a partial
+            # score can reach the top `limit` (nor holds the maximum score)
+            scores = self._bm25.get_top_scores(term_ids, limit)
         
-        # Create (index, score) pairs and filter
+        # Filter
         # Note: BM25 can return negative scores when IDF is negative (few documents)
         # We use a threshold instead of strictly positive to handle edge cases
-        min_score = max(scores) * 0.01 if len(scores) > 0 and max(scores) > 0 else float('-inf')
-        results = []
-        for idx, score in enumerate(scores):
-            if score < min_score:
-                continue
-            
-            entity = self._entities[idx]
-            
-            # Apply filters
-            if filters:
-                if "language" in filters and entity.language.value != filters["language"]:
-                    continue
-                if "entity_type" in filters and entity.entity_type.value != filters["entity_type"]:
-                    continue
-                if "repo_name" in filters and entity.repo_name != filters["repo_name"]:
-                    continue
-            
-            results.append((entity, score))
+        max_score = scores.max()
+        mask = scores >= max_score * 0.01 if max_score > 0 else np.ones(len(scores), dtype=bool)
+        
+        # Apply filters
+        if filters:
+            for field, (ids, codes) in self._filter_fields.items():
+                if field in filters:
+                    code = ids.get(filters[field])
+                    if code is not None:
+                        mask &= codes == code
+                    else:
+                        mask[:] = False
+        
+        candidates = np.flatnonzero(mask)
         
-        # Sort by score and limit
-        results.sort(key=lambda x: x[1], reverse=True)
-        return results[:limit]
+        # Pick the top `limit` without fully sorting: partition, keep every
+        # candidate tied with the cutoff score, then sort just those (stable,
+        # so ties stay in index order)
+        limit = max(limit, 0)
+        if 0 < limit < len(candidates):
+            candidate_scores = scores[candidates]
+            cutoff = candidate_scores[np.argpartition(-candidate_scores, limit - 1)[limit - 1]]
+            candidates = candidates[candidate_scores >= cutoff]
+        top = candidates[np.argsort(-scores[candidates], kind='stable')][:limit]
+        
+        return [(self._entity(i), score) for i, score in zip(top.tolist(), scores[top].tolist())]
     
     def remove_by_repo(self, repo_name: str) -> int:
         """Remove all entities from a specific repository."""
-        # Find indices to remove
-        to_remove: Set[int] = set()
-        for entity_id, idx in self._entity_ids.items():
-            if self._entities[idx].repo_name == repo_name:
-                to_remove.add(idx)
-        
-        if not to_remove:
+        code = self._field_ids["repo_name"].get(repo_name)
+        if code is None:
             return 0
         
-        # Rebuild without removed entities
-        new_entities = []
-        new_corpus = []
-        new_ids = {}
-        
-        for idx, (entity, tokens) in enumerate(zip(self._entities, self._corpus)):
-            if idx not in to_remove:
-                new_ids[entity.id] = len(new_entities)
-                new_entities.append(entity)
-                new_corpus.append(tokens)
-        
-        removed_count = len(to_remove)
+        keep = np.frombuffer(self._field_codes["repo_name"], dtype=np.intc) != code
+        removed_count = len(keep) - int(np.count_nonzero(keep))
+        if not removed_count:
+            return 0
         
-        self._entities = new_entities
-        self._corpus = new_corpus
-        self._entity_ids = new_ids
-        self._rebuild_index()
+        # Drop the removed rows from every parallel array; the score matrix
+        # is rebuilt lazily, since IDF and average length change too
+        term_ids, doc_lengths = self._corpus_arrays()
+        keep_list = keep.tolist()
+        self._entities = list(itertools.compress(self._entities, keep_list))
+        self._entity_ids = {
+            entity_id: i for i, entity_id in enumerate(itertools.compress(self._entity_ids, keep_list))
+        }
+        self._term_ids = term_ids[np.repeat(keep, doc_lengths)]
+        self._doc_lengths = doc_lengths[keep]
+        self._field_codes = {
+            field: array('i', np.frombuffer(codes, dtype=np.intc)[keep].tobytes())
+            for field, codes in self._field_codes.items()
+        }
+        self._compact_vocab()
+        self._dirty = True
+        self._version += 1
         
         logger.info("Removed entities from BM25", repo=repo_name, count=removed_count)
         return removed_count
     
     def save(self) -> None:
-        """Save the index to disk."""
-        index_file = self.index_path / "bm25_index.pkl"
+        """
+        Save the index to disk.
         
-        data = {
-            "entities": [e.model_dump() for e in self._entities],
-            "corpus": self._corpus,
-            "entity_ids": self._entity_ids,
-        }
+        Small arrays go to an uncompressed .npz archive and the MMAP_ARRAYS
+        to .npy files, the vocabulary to JSON and entities to JSONL, so
+        loading never unpickles millions of small objects. The built score
+        matrix is saved too, so loading doesn't rebuild it, and so are
+        entity ids and field codes, so loading doesn't decode entities
+        either.
+        
+        Every save writes a fresh generation directory, then atomically
+        replaces the small MANIFEST_FILE naming it. A concurrent load reads
+        either the old generation or the new one, never a mix, and no file
+        another index may still have memory-mapped is overwritten (which
+        Windows refuses anyway). Older generations are then removed, except
+        the one just replaced (a load may have just read its name) and the
+        one this index has mapped.
+        """
+        self._ensure_index()
+        term_ids, doc_lengths = self._corpus_arrays()
+        arrays = {"doc_lengths": doc_lengths}
+        for field, codes in self._field_codes.items():
+            arrays[f"{field}_codes"] = np.frombuffer(codes, dtype=np.intc)
+        mapped = {"term_ids": term_ids}
+        if self._bm25 is not None:
+            mapped.update(
+                data=self._bm25.data,
+                indices=self._bm25.indices,
+                indptr=self._bm25.indptr
+            )
+            arrays.update(
+                max_scores=self._bm25.max_scores,
+                prunable=np.array(self._bm25.prunable)
+            )
+        
+        generation = f"bm25-{time.time_ns()}-{os.getpid()}-{next(_generation_counter)}"
+        generation_dir = self.index_path / generation
+        generation_dir.mkdir()
+        for name, values in mapped.items():
+            np.save(generation_dir / f"{name}.npy", values)
+        np.savez(generation_dir / "arrays.npz", **arrays)
+        
+        with open(generation_dir / "vocab.json", 'w', encoding='utf-8') as f:
+            json.dump(list(self._vocab), f)
+        
+        with open(generation_dir / "fields.json", 'w', encoding='utf-8') as f:
+            json.dump({
+                "entity_ids": list(self._entity_ids),
+                "fields": {field: list(ids) for field, ids in self._field_ids.items()},
+            }, f)
+        
+        with open(generation_dir / "entities.jsonl", 'wb') as f:
+            for entity in self._entities:
+                # Entities never decoded since loading are written back as is
+                f.write(entity if isinstance(entity, bytes) else entity.model_dump_json().encode())
+                f.write(b'\n')
         
-        with open(index_file, 'wb') as f:
-            pickle.dump(data, f)
+        previous = self._current_generation()
+        manifest = self.index_path / MANIFEST_FILE
+        tmp_file = manifest.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({"generation": generation}, f)
+        os.replace(tmp_file, manifest)
         
-        logger.info("Saved BM25 index", path=str(index_file), count=len(self._entities))
+        keep = {generation, previous, self._mapped_generation}
+        for path in self.index_path.glob("bm25-*"):
+            if path.is_dir() and path.name not in keep:
+                # Files still mapped elsewhere can't be removed on Windows;
+                # what is left over goes on a later save
+                shutil.rmtree(path, ignore_errors=True)
+        
+        logger.info("Saved BM25 index", path=str(generation_dir), count=len(self._entities))
+    
+    def _current_generation(self) -> Optional[str]:
+        """Name of the generation directory MANIFEST_FILE points to, if any."""
+        try:
+            with open(self.index_path / MANIFEST_FILE, encoding='utf-8') as f:
+                return json.load(f)["generation"]
+        except FileNotFoundError:
+            return None
     
     def load(self) -> bool:
         """Load the index from disk."""
+        try:
+            generation = self._current_generation()
+            if generation is None:
+                return self._load_pickle()
+            generation_dir = self.index_path / generation
+            
+            with np.load(generation_dir / "arrays.npz") as archive:
+                arrays = dict(archive)
+            for name in MMAP_ARRAYS:
+                array_file = generation_dir / f"{name}.npy"
+                if array_file.exists():
+                    # asarray drops the memmap subclass, whose per-slice
+                    # bookkeeping would slow down every posting lookup
+                    arrays[name] = np.asarray(np.load(array_file, mmap_mode='r'))
+            
+            with open(generation_dir / "vocab.json", encoding='utf-8') as f:
+                vocab = json.load(f)
+            
+            with open(generation_dir / "entities.jsonl", 'rb') as f:
+                lines = f.read().splitlines()
+            
+            with open(generation_dir / "fields.json", encoding='utf-8') as f:
+                fields = json.load(f)
+            self._entities = lines
+            self._entity_ids = {entity_id: i for i, entity_id in enumerate(fields["entity_ids"])}
+            self._field_ids = {
+                field: {value: i for i, value in enumerate(fields["fields"][field])}
+                for field in FILTER_FIELDS
+            }
+            self._field_codes = {
+                field: array('i', arrays[f"{field}_codes"].astype(np.intc).tobytes())
+                for field in FILTER_FIELDS
+            }
+            self._vocab = {term: i for i, term in enumerate(vocab)}
+            self._term_ids = arrays["term_ids"]
+            self._doc_lengths = arrays["doc_lengths"]
+            self._pending = []
+            self._mapped_generation = generation
+            
+            if "indptr" in arrays:
+                self._bm25 = _EagerBM25.from_arrays(
+                    arrays["data"], arrays["indices"], arrays["indptr"],
+                    n_docs=len(self._doc_lengths),
+                    max_scores=arrays.get("max_scores"),
+                    prunable=bool(arrays["prunable"]) if "prunable" in arrays else None
+                )
+                self._filter_fields = self._build_filter_fields()
+                self._dirty = False
+            else:
+                self._dirty = True
+            self._version += 1
+            
+            logger.info("Loaded BM25 index", count=len(self._entities))
+            return True
+            
+        except Exception as e:
+            logger.error("Failed to load BM25 index", error=str(e))
+            return False
+    
+    def _load_pickle(self) -> bool:
+        """Load an index saved as a pickle by the original (pre-npz) format."""
         index_file = self.index_path / "bm25_index.pkl"
         
         if not index_file.exists():
@@ -229,9 +841,16 @@ class BM25Index:
                 data = pickle.load(f)
             
             self._entities = [CodeEntity(**e) for e in data["entities"]]
-            self._corpus = data["corpus"]
-            self._entity_ids = data["entity_ids"]
-            self._rebuild_index()
+            self._entity_ids = {entity.id: i for i, entity in enumerate(self._entities)}
+            self._reset_field_codes()
+            self._pending = []
+            # The baseline pickle stores the corpus as token lists
+            self._vocab = {}
+            self._term_ids = np.zeros(0, dtype=np.int32)
+            self._doc_lengths = np.zeros(0, dtype=np.int64)
+            self._append_documents(data["corpus"])
+            self._dirty = True
+            self._version += 1
             
             logger.info("Loaded BM25 index", count=len(self._entities))
             return True
@@ -249,5 +868,13 @@ class BM25Index:
         self._bm25 = None
         self._entities = []
         self._entity_ids = {}
-        self._corpus = []
+        self._field_ids = {field: {} for field in FILTER_FIELDS}
+        self._field_codes = {field: array('i') for field in FILTER_FIELDS}
+        self._vocab = {}
+        self._term_ids = np.zeros(0, dtype=np.int32)
+        self._doc_lengths = np.zeros(0, dtype=np.int64)
+        self._pending = []
+        self._filter_fields = {}
+        self._dirty = False
+        self._version += 1
 
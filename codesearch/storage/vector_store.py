@@ -2,16 +2,22 @@
 Vector database integration for storing and querying code embeddings.
 """
 
+import threading
 from abc import ABC, abstractmethod
 from typing import List, Optional, Dict, Any, Tuple
+import numpy as np
 import structlog
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from ..models import CodeEntity, SearchResult
 from ..config import settings
+from ._search_cache import SearchCache, SimilarQueryCache
 
 logger = structlog.get_logger()
 
+# Entity fields that search filters match on
+_FILTER_FIELDS = ("language", "entity_type", "repo_name")
+
 
 class VectorStore(ABC):
     """Abstract base class for vector storage backends."""
@@ -49,6 +55,15 @@ class VectorStore(ABC):
     def count(self) -> int:
         """Get total count of indexed entities."""
         pass
+    
+    def load_sources(self, entities: List[CodeEntity]) -> None:
+        """
+        Fill in the source code of search results that came back without it.
+        
+        Stores whose search already returns full entities need not
+        override this.
+        """
+        pass
 
 
 class QdrantStore(VectorStore):
@@ -64,7 +79,11 @@ class QdrantStore(VectorStore):
         port: Optional[int] = None,
         collection_name: Optional[str] = None,
         embedding_dimension: int = 768,
-        use_memory: bool = False
+        use_memory: bool = False,
+        int8_quantization: Optional[bool] = None,
+        prefer_grpc: Optional[bool] = None,
+        grpc_port: Optional[int] = None,
+        upsert_batch_size: Optional[int] = None
     ):
         """
         Initialize Qdrant connection.
@@ -75,15 +94,40 @@ class QdrantStore(VectorStore):
             collection_name: Name of the collection
             embedding_dimension: Dimension of embeddings
             use_memory: Use in-memory storage (for testing)
+            int8_quantization: Build new collections with int8 scalar
+                quantization (default: settings.qdrant_int8_quantization)
+            prefer_grpc: Use the gRPC API where possible
+                (default: settings.qdrant_prefer_grpc)
+            grpc_port: Qdrant gRPC port
+            upsert_batch_size: Points sent per upsert request
         """
         self.host = host or settings.qdrant_host
         self.port = port or settings.qdrant_port
         self.collection_name = collection_name or settings.qdrant_collection
         self.embedding_dimension = embedding_dimension
         self.use_memory = use_memory
+        self.int8_quantization = (
+            settings.qdrant_int8_quantization if int8_quantization is None else int8_quantization
+        )
+        self.prefer_grpc = settings.qdrant_prefer_grpc if prefer_grpc is None else prefer_grpc
+        self.grpc_port = grpc_port or settings.qdrant_grpc_port
+        self.upsert_batch_size = upsert_batch_size or settings.qdrant_upsert_batch_size
         
         self._client = None
+        # Set once the collection is known to exist, so searches skip the
+        # get_collections round-trip
+        self._collection_verified = False
         self._connect()
+        
+        # Bumped on every write through this store; part of every search
+        # cache key (writes from other processes show up once entries expire)
+        self._version = 0
+        self._search_cache = SearchCache(settings.search_cache_size, settings.search_cache_ttl)
+        # Opt-in (SEARCH_CACHE_SIMILARITY <= 1): serves near-duplicate query
+        # embeddings the results of a close one
+        self._similar_cache = SimilarQueryCache(
+            settings.search_cache_size, settings.search_cache_ttl, settings.search_cache_similarity
+        )
     
     def _connect(self) -> None:
         """Establish connection to Qdrant."""
@@ -95,8 +139,26 @@ class QdrantStore(VectorStore):
                 self._client = QdrantClient(":memory:")
                 logger.info("Connected to in-memory Qdrant")
             else:
-                self._client = QdrantClient(host=self.host, port=self.port)
-                logger.info("Connected to Qdrant", host=self.host, port=self.port)
+                self._client = QdrantClient(
+                    host=self.host,
+                    port=self.port,
+                    grpc_port=self.grpc_port,
+                    prefer_grpc=self.prefer_grpc
+                )
+                logger.info(
+                    "Connected to Qdrant",
+                    host=self.host,
+                    port=self.port,
+                    grpc=self.prefer_grpc
+                )
+            
+            # query_points superseded search in qdrant-client 1.10 (and
+            # search is gone from newer clients); pick the API once here
+            # rather than trying each on every query
+            if hasattr(self._client, 'query_points'):
+                self._query = self._query_points
+            else:
+                self._query = self._search_points
                 
         except ImportError:
             raise RuntimeError("Please install: pip install qdrant-client")
@@ -106,7 +168,21 @@ class QdrantStore(VectorStore):
     
     def create_collection(self, recreate: bool = False) -> None:
         """Create the code embeddings collection."""
-        from qdrant_client.http.models import Distance, VectorParams, PayloadSchemaType
+        from qdrant_client.http.models import (
+            Distance, VectorParams, PayloadSchemaType,
+            ScalarQuantization, ScalarQuantizationConfig, ScalarType
+        )
+        
+        # int8 vectors are a quarter the size of FP32, so the ANN scan
+        # reads far less memory; originals are kept for rescoring
+        quantization_config = None
+        if self.int8_quantization:
+            quantization_config = ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8,
+                    always_ram=True
+                )
+            )
         
         try:
             collections = self._client.get_collections().collections
@@ -116,8 +192,20 @@ class QdrantStore(VectorStore):
                 if recreate:
                     logger.info("Deleting existing collection", collection=self.collection_name)
                     self._client.delete_collection(self.collection_name)
+                    self._collection_verified = False
+                    self._version += 1
                 else:
                     logger.info("Collection already exists", collection=self.collection_name)
+                    self._collection_verified = True
+                    # Collections created before quantization was enabled
+                    # get it in place; Qdrant quantizes them in the background
+                    info = self._client.get_collection(self.collection_name)
+                    if quantization_config and info.config.quantization_config is None:
+                        logger.info("Enabling int8 quantization", collection=self.collection_name)
+                        self._client.update_collection(
+                            collection_name=self.collection_name,
+                            quantization_config=quantization_config
+                        )
                     return
             
             # Create collection with optimal settings for code search
@@ -128,7 +216,8 @@ class QdrantStore(VectorStore):
                     distance=Distance.COSINE
                 ),
                 # Enable payload indexing for filtering
-                on_disk_payload=True
+                on_disk_payload=True,
+                quantization_config=quantization_config
             )
             
             # Create payload indexes for common filters
@@ -149,6 +238,7 @@ class QdrantStore(VectorStore):
             )
             
             logger.info("Created collection", collection=self.collection_name)
+            self._collection_verified = True
             
         except Exception as e:
             logger.error("Failed to create collection", error=str(e))
@@ -160,7 +250,15 @@ class QdrantStore(VectorStore):
         entities: List[CodeEntity], 
         embeddings: List[List[float]]
     ) -> int:
-        """Insert code entities with their embeddings."""
+        """
+        Insert code entities with their embeddings.
+        
+        Points are built and sent one chunk at a time, so only one chunk's
+        payloads are in memory at once. Every chunk but the last is sent
+        without waiting for it to be applied, pipelining the commits;
+        Qdrant applies each shard's updates in order, so once the last
+        (waited-on) chunk returns, the earlier ones are in too.
+        """
         from qdrant_client.http.models import PointStruct
         
         if len(entities) != len(embeddings):
@@ -168,9 +266,9 @@ class QdrantStore(VectorStore):
         
         if not entities:
             return 0
+        self._version += 1
         
-        points = []
-        for entity, embedding in zip(entities, embeddings):
+        def to_point(entity: CodeEntity, embedding: List[float]) -> PointStruct:
             # Convert entity to payload
             payload = {
                 "name": entity.name,
@@ -180,9 +278,9 @@ class QdrantStore(VectorStore):
                 "repo_name": entity.repo_name,
                 "start_line": entity.start_line,
                 "end_line": entity.end_line,
-                "source_code": entity.source_code[:10000],  # Limit size
                 "docstring": entity.docstring,
                 "signature": entity.signature,
+                "source_code": entity.source_code[:10000],  # Limit size
                 "parameters": entity.parameters,
                 "return_type": entity.return_type,
                 "decorators": entity.decorators,
@@ -191,18 +289,24 @@ class QdrantStore(VectorStore):
                 "loc": entity.loc,
             }
             
-            points.append(PointStruct(
+            return PointStruct(
                 id=entity.id,
                 vector=embedding,
                 payload=payload
-            ))
+            )
         
-        # Batch upsert
-        self._client.upsert(
-            collection_name=self.collection_name,
-            points=points,
-            wait=True
-        )
+        # Chunked upserts
+        batch_size = self.upsert_batch_size
+        for start in range(0, len(entities), batch_size):
+            end = start + batch_size
+            self._client.upsert(
+                collection_name=self.collection_name,
+                points=[
+                    to_point(entity, embedding)
+                    for entity, embedding in zip(entities[start:end], embeddings[start:end])
+                ],
+                wait=end >= len(entities)
+            )
         
         logger.debug("Inserted entities", count=len(entities))
         return len(entities)
@@ -213,17 +317,34 @@ class QdrantStore(VectorStore):
         limit: int = 20,
         filters: Optional[Dict[str, Any]] = None
     ) -> List[Tuple[CodeEntity, float]]:
-        """Search for similar code entities."""
-        from qdrant_client.http.models import Filter, FieldCondition, MatchValue
+        """Search for similar code entities, reusing recent identical or near-identical searches."""
+        context = (self._version, limit, tuple(sorted(filters.items())) if filters else None)
+        key = (tuple(query_embedding),) + context
+        results = self._search_cache.get(key)
+        if results is None:
+            results = self._similar_cache.get(query_embedding, context)
+        if results is None:
+            results = self._search(query_embedding, limit, filters)
+            # Empty results may stand for a failed or missing collection,
+            # which shouldn't stick around for the whole TTL
+            if results:
+                self._search_cache.put(key, results)
+                self._similar_cache.put(query_embedding, context, results)
+        return results
+    
+    def _search(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        filters: Optional[Dict[str, Any]]
+    ) -> List[Tuple[CodeEntity, float]]:
+        """Search for similar code entities, bypassing the result cache."""
+        from qdrant_client.http.models import (
+            Filter, FieldCondition, MatchValue, SearchParams, QuantizationSearchParams
+        )
         
-        # Check if collection exists
-        try:
-            collections = self._client.get_collections().collections
-            if not any(c.name == self.collection_name for c in collections):
-                logger.warning("Collection does not exist", collection=self.collection_name)
-                return []
-        except Exception as e:
-            logger.error("Failed to check collection", error=str(e))
+        # Check if collection exists (once; a failed query checks again)
+        if not self._collection_verified and not self._check_collection():
             return []
         
         # Build filter conditions
@@ -252,40 +373,24 @@ class QdrantStore(VectorStore):
             if conditions:
                 query_filter = Filter(must=conditions)
         
-        # Execute search - try new API first, fallback to old API
+        # Scan the int8 vectors with 2x oversampling, then rescore the
+        # candidates with the original FP32 vectors (ignored by collections
+        # without quantization)
+        search_params = SearchParams(
+            quantization=QuantizationSearchParams(rescore=True, oversampling=2.0)
+        )
+        
         try:
-            # New Qdrant API (v1.7+)
-            search_results = self._client.search(
-                collection_name=self.collection_name,
-                query_vector=query_embedding,
-                query_filter=query_filter,
-                limit=limit,
-                with_payload=True,
-                score_threshold=0.0  # Get all results, let ranking handle it
-            )
-            results = search_results
-        except (AttributeError, TypeError) as e:
-            # Fallback: try query_points API
-            try:
-                response = self._client.query_points(
-                    collection_name=self.collection_name,
-                    query=query_embedding,
-                    query_filter=query_filter,
-                    limit=limit,
-                    with_payload=True
-                )
-                results = response.points
-            except Exception:
-                # Last resort: old search API
-                results = self._client.search(
-                    collection_name=self.collection_name,
-                    query_vector=query_embedding,
-                    query_filter=query_filter,
-                    limit=limit,
-                    with_payload=True
-                )
+            results = self._query(query_embedding, query_filter, search_params, limit)
+        except Exception:
+            # The collection may have been dropped since it was verified
+            self._collection_verified = False
+            if not self._check_collection():
+                return []
+            raise
         
-        # Convert results to CodeEntity objects
+        # Convert results to CodeEntity objects, without source code until
+        # load_sources is called for the ones that are kept
         entities_with_scores = []
         for result in results:
             # Handle different result formats
@@ -303,7 +408,9 @@ class QdrantStore(VectorStore):
                 result_id = result.get('id', '')
                 score = result.get('score', 0.0)
             
-            entity = CodeEntity(
+            # source_code is left out of search payloads; load_sources
+            # fetches it for the results that are kept
+            entity = CodeEntity.without_source(
                 id=result_id,
                 name=payload.get("name", ""),
                 entity_type=payload.get("entity_type", "function"),
@@ -312,7 +419,6 @@ class QdrantStore(VectorStore):
                 repo_name=payload.get("repo_name", ""),
                 start_line=payload.get("start_line", 0),
                 end_line=payload.get("end_line", 0),
-                source_code=payload.get("source_code", ""),
                 docstring=payload.get("docstring"),
                 signature=payload.get("signature"),
                 parameters=payload.get("parameters", []),
@@ -327,6 +433,92 @@ class QdrantStore(VectorStore):
         
         return entities_with_scores
     
+    def _check_collection(self) -> bool:
+        """Check that the collection exists, remembering it if so."""
+        try:
+            collections = self._client.get_collections().collections
+        except Exception as e:
+            logger.error("Failed to check collection", error=str(e))
+            return False
+        if not any(c.name == self.collection_name for c in collections):
+            logger.warning("Collection does not exist", collection=self.collection_name)
+            return False
+        self._collection_verified = True
+        return True
+    
+    def load_sources(self, entities: List[CodeEntity]) -> None:
+        """
+        Fetch the source code of search results in one retrieve call.
+        
+        Searches leave source_code out of the returned payloads, since most
+        candidates are dropped during fusion; only the results that are
+        kept pay for their bodies.
+        """
+        from qdrant_client.http.models import PayloadSelectorInclude
+        
+        missing = [entity for entity in entities if not entity.has_source]
+        if not missing:
+            return
+        
+        try:
+            records = self._client.retrieve(
+                collection_name=self.collection_name,
+                ids=list(dict.fromkeys(entity.id for entity in missing)),
+                with_payload=PayloadSelectorInclude(include=["source_code"]),
+                with_vectors=False
+            )
+        except Exception as e:
+            logger.error("Failed to fetch source code", error=str(e))
+            records = []
+        
+        sources = {str(record.id): (record.payload or {}).get("source_code") for record in records}
+        for entity in missing:
+            source = sources.get(entity.id)
+            if source is None:
+                logger.warning("Search result has no source code", entity_id=entity.id)
+                source = ""
+            entity.source_code = source
+    
+    def _query_points(
+        self,
+        query_embedding: List[float],
+        query_filter: Any,
+        search_params: Any,
+        limit: int
+    ) -> list:
+        """Run a nearest-neighbour query with the query_points API."""
+        from qdrant_client.http.models import PayloadSelectorExclude
+        
+        return self._client.query_points(
+            collection_name=self.collection_name,
+            query=query_embedding,
+            query_filter=query_filter,
+            search_params=search_params,
+            limit=limit,
+            with_payload=PayloadSelectorExclude(exclude=["source_code"]),
+            score_threshold=0.0  # Get all results, let ranking handle it
+        ).points
+    
+    def _search_points(
+        self,
+        query_embedding: List[float],
+        query_filter: Any,
+        search_params: Any,
+        limit: int
+    ) -> list:
+        """Run a nearest-neighbour query with the search API of older clients."""
+        from qdrant_client.http.models import PayloadSelectorExclude
+        
+        return self._client.search(
+            collection_name=self.collection_name,
+            query_vector=query_embedding,
+            query_filter=query_filter,
+            search_params=search_params,
+            limit=limit,
+            with_payload=PayloadSelectorExclude(exclude=["source_code"]),
+            score_threshold=0.0  # Get all results, let ranking handle it
+        )
+    
     def delete_by_repo(self, repo_name: str) -> int:
         """Delete all entities from a specific repository."""
         from qdrant_client.http.models import Filter, FieldCondition, MatchValue
@@ -345,6 +537,7 @@ class QdrantStore(VectorStore):
             ),
             wait=True
         )
+        self._version += 1
         
         logger.info("Deleted entities", repo=repo_name, count=count_before)
         return count_before
@@ -384,3 +577,171 @@ class QdrantStore(VectorStore):
             "status": info.status,
         }
 
+
+class InMemoryVectorStore(VectorStore):
+    """
+    Vector store keeping every embedding in one in-process matrix.
+    
+    For corpora that fit in memory (local runs, tests): embeddings are
+    L2-normalized once on insert, so a search is a single matrix-vector
+    product over all rows, with no round-trip to Qdrant. Rows stay float32,
+    since numpy has no BLAS path for float16 and its float16 products are
+    several times slower than sgemv.
+    """
+    
+    def __init__(self, dimension: Optional[int] = None):
+        """
+        Initialize an empty store.
+        
+        Args:
+            dimension: Embedding dimension (default from settings)
+        """
+        self.dimension = dimension or settings.embedding_dimension
+        self._ids: Dict[str, int] = {}  # entity_id -> row, used by writers only
+        # (vectors, entities, field codes, field ids): every row's vector and
+        # entity, plus its filterable fields as small int codes for masking
+        # and the code of each field value. Writers build new objects and
+        # publish them together by replacing this one attribute, so a search
+        # reads it once and runs on a consistent snapshot without locking
+        self._state: Tuple[np.ndarray, List[CodeEntity], Dict[str, np.ndarray], Dict[str, Dict[str, int]]]
+        self._lock = threading.Lock()
+        self._reset()
+    
+    def create_collection(self, recreate: bool = False) -> None:
+        """Nothing to create up front; recreate drops every stored vector."""
+        if recreate:
+            with self._lock:
+                self._reset()
+    
+    def _reset(self) -> None:
+        """Drop every stored entity and vector."""
+        self._ids = {}
+        self._state = (
+            np.zeros((0, self.dimension), dtype=np.float32),
+            [],
+            {field: np.zeros(0, dtype=np.int32) for field in _FILTER_FIELDS},
+            {field: {} for field in _FILTER_FIELDS},
+        )
+    
+    @staticmethod
+    def _field_code(ids: Dict[str, int], value: str) -> int:
+        """Code of a field value, assigning the next one on first sight."""
+        code = ids.get(value)
+        if code is None:
+            code = ids[value] = len(ids)
+        return code
+    
+    def insert(
+        self, 
+        entities: List[CodeEntity], 
+        embeddings: List[List[float]]
+    ) -> int:
+        """Insert code entities with their embeddings, replacing any with the same id."""
+        if len(entities) != len(embeddings):
+            raise ValueError("Number of entities must match number of embeddings")
+        
+        if not entities:
+            return 0
+        
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(entities), self.dimension)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms > 0, norms, 1.0)
+        
+        with self._lock:
+            old_vectors, old_entities, old_field_codes, old_field_ids = self._state
+            stored = list(old_entities)
+            rows = []
+            for entity in entities:
+                row = self._ids.get(entity.id)
+                if row is None:
+                    row = self._ids[entity.id] = len(stored)
+                    stored.append(entity)
+                else:
+                    stored[row] = entity
+                rows.append(row)
+            
+            n = len(stored)
+            values = [(e.language.value, e.entity_type.value, e.repo_name) for e in entities]
+            field_codes = {}
+            field_ids = {}
+            for k, field in enumerate(_FILTER_FIELDS):
+                ids = field_ids[field] = dict(old_field_ids[field])
+                codes = np.resize(old_field_codes[field], n)
+                codes[rows] = [self._field_code(ids, v[k]) for v in values]
+                field_codes[field] = codes
+            all_vectors = np.resize(old_vectors, (n, self.dimension))
+            all_vectors[rows] = vectors
+            
+            self._state = (all_vectors, stored, field_codes, field_ids)
+        
+        logger.debug("Inserted entities", count=len(entities))
+        return len(entities)
+    
+    def search(
+        self,
+        query_embedding: List[float],
+        limit: int = 20,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[CodeEntity, float]]:
+        """Search for similar code entities by cosine similarity."""
+        vectors, entities, field_codes, field_ids = self._state
+        n = len(vectors)
+        
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if not n or limit <= 0 or norm == 0:
+            return []
+        scores = vectors @ (query / norm)
+        
+        candidates = np.arange(n)
+        if filters:
+            mask = np.ones(n, dtype=bool)
+            for field in _FILTER_FIELDS:
+                if field in filters:
+                    code = field_ids[field].get(filters[field])
+                    if code is None:
+                        return []
+                    mask &= field_codes[field] == code
+            candidates = np.flatnonzero(mask)
+        
+        # Partition out the top `limit`, then sort just those
+        candidate_scores = scores[candidates]
+        if limit < len(candidates):
+            top = np.argpartition(-candidate_scores, limit - 1)[:limit]
+            candidates, candidate_scores = candidates[top], candidate_scores[top]
+        order = np.argsort(-candidate_scores, kind='stable')
+        
+        return [
+            (entities[i], score)
+            for i, score in zip(candidates[order].tolist(), candidate_scores[order].tolist())
+        ]
+    
+    def delete_by_repo(self, repo_name: str) -> int:
+        """Delete all entities from a specific repository."""
+        with self._lock:
+            vectors, entities, field_codes, field_ids = self._state
+            code = field_ids["repo_name"].get(repo_name)
+            if code is None:
+                return 0
+            
+            keep = field_codes["repo_name"] != code
+            removed_count = len(keep) - int(np.count_nonzero(keep))
+            if not removed_count:
+                return 0
+            
+            entities = [entity for entity, kept in zip(entities, keep.tolist()) if kept]
+            self._ids = {entity.id: i for i, entity in enumerate(entities)}
+            self._state = (
+                vectors[keep],
+                entities,
+                {field: codes[keep] for field, codes in field_codes.items()},
+                field_ids,
+            )
+        
+        logger.info("Deleted entities", repo=repo_name, count=removed_count)
+        return removed_count
+    
+    def count(self) -> int:
+        """Get total count of indexed entities."""
+        return len(self._state[1])
+
@@ -0,0 +1,12 @@
+"""
+Shared test fixtures.
+"""
+
+import pytest
+from codesearch.config import settings
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Keep parse caches out of the user's ~/.cache."""
+    monkeypatch.setattr(settings, "cache_path", tmp_path / "cache")
@@ -2,9 +2,30 @@
 Tests for the code parser module.
 """
 
+import multiprocessing
+import os
+import pickle
+import time
+
 import pytest
+from pydantic import ValidationError
 from codesearch.parser import PythonParser, JavaScriptParser, GoParser, RustParser
-from codesearch.models import CodeEntityType, Language
+from codesearch.parser.base import iter_parse_files
+from codesearch.models import CodeEntity, CodeEntityType, Language
+
+
+def parse_or_fail(file_path, repo_name):
+    """Parse function that raises on files named bad.py."""
+    if file_path.name == "bad.py":
+        raise ValueError("unparseable")
+    return PythonParser().parse_file(file_path, repo_name)
+
+
+def parse_or_crash_worker(file_path, repo_name):
+    """Parse function that kills its worker process on files named bad.py."""
+    if file_path.name == "bad.py" and multiprocessing.parent_process() is not None:
+        os._exit(1)
+    return PythonParser().parse_file(file_path, repo_name)
 
 
 class TestPythonParser:
@@ -60,6 +81,133 @@ class Calculator:
         assert add_method is not None
         assert add_method.parent_class == "Calculator"
     
+    def test_parse_nested_class(self):
+        """Test that nested classes are indexed alongside their methods."""
+        code = '''
+class Outer:
+    class Inner:
+        def method(self):
+            pass
+'''
+        entities = self.parser.parse_content(code, "test.py", "test-repo")
+        by_name = {e.name: e for e in entities}
+        
+        assert by_name["Inner"].entity_type == CodeEntityType.CLASS
+        assert by_name["Inner"].parent_class == "Outer"
+        assert by_name["method"].parent_class == "Inner"
+    
+    def test_reparse_after_edit(self):
+        """Test that re-parsing an edited file reflects the edit."""
+        parser = PythonParser(reuse_trees=True)
+        code = '''
+def first(a):
+    return a
+
+def second(b):
+    return b
+'''
+        parser.parse_content(code, "test.py", "test-repo")
+        
+        edited = code.replace("def second(b)", "def renamed(b, c)")
+        entities = parser.parse_content(edited, "test.py", "test-repo")
+        by_name = {e.name: e for e in entities}
+        
+        assert set(by_name) == {"first", "renamed"}
+        assert by_name["renamed"].parameters == ["b", "c"]
+    
+    def test_trees_not_kept_by_default(self):
+        """Test that only parsers built with reuse_trees keep syntax trees."""
+        self.parser.parse_content("def first(a):\n    return a\n", "test.py", "test-repo")
+        
+        assert not self.parser._trees
+    
+    def test_disk_cache_is_versioned(self, tmp_path, monkeypatch):
+        """Test that bumping CACHE_VERSION bypasses entities cached by older versions."""
+        from codesearch.config import settings
+        from codesearch.parser import python_parser
+        
+        source = tmp_path / "module.py"
+        source.write_text("def greet(name):\n    return name\n")
+        
+        assert [e.name for e in PythonParser().parse_file(source, "test-repo")] == ["greet"]
+        monkeypatch.setattr(python_parser, "CACHE_VERSION", python_parser.CACHE_VERSION + 1)
+        assert [e.name for e in PythonParser().parse_file(source, "test-repo")] == ["greet"]
+        
+        versions = sorted(p.name for p in (settings.cache_path / "entities").iterdir())
+        assert versions == [f"v{python_parser.CACHE_VERSION - 1}-ts", f"v{python_parser.CACHE_VERSION}-ts"]
+    
+    def test_disk_cache_keeps_identical_files_apart(self, tmp_path):
+        """Test that files with the same content get their own cache entries."""
+        from codesearch.config import settings
+        
+        for name in ["a", "b"]:
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "__init__.py").write_text("")
+            PythonParser().parse_file(tmp_path / name / "__init__.py", "test-repo")
+        
+        assert len(list((settings.cache_path / "entities").rglob("*.pkl"))) == 2
+    
+    def test_disk_cache_prunes_unused_entries(self, tmp_path, monkeypatch):
+        """Test that cache files unused for CACHE_MAX_AGE are deleted on the next write."""
+        from codesearch.config import settings
+        from codesearch.parser import python_parser
+        
+        stale = settings.cache_path / "entities" / "v0-ts" / "ab" / "stale.pkl"
+        stale.parent.mkdir(parents=True)
+        stale.write_bytes(b"")
+        old = time.time() - python_parser.CACHE_MAX_AGE - 60
+        os.utime(stale, (old, old))
+        monkeypatch.setattr(python_parser, "_last_prune", None)
+        
+        source = tmp_path / "module.py"
+        source.write_text("def greet(name):\n    return name\n")
+        PythonParser().parse_file(source, "test-repo")
+        
+        assert not stale.exists()
+        assert len(list((settings.cache_path / "entities").rglob("*.pkl"))) == 1
+    
+    def test_parse_file_returns_copies(self, tmp_path):
+        """Test that mutating a returned entity doesn't change the cached one."""
+        source = tmp_path / "module.py"
+        source.write_text("def greet(name):\n    return name\n")
+        
+        first = self.parser.parse_file(source, "test-repo")[0]
+        first.name = "changed"
+        first.parameters.append("extra")
+        first.source_code = ""
+        
+        second = self.parser.parse_file(source, "test-repo")[0]
+        assert second.name == "greet"
+        assert second.parameters == ["name"]
+        assert second.source_code.startswith("def greet")
+    
+    def test_pickle_keeps_source_lazy(self):
+        """Test that pickled entities keep one shared source span, not decoded text."""
+        code = "class Greeter:\n    def greet(self, name):\n        return name\n"
+        entities = self.parser.parse_content(code, "test.py", "test-repo")
+        
+        restored = pickle.loads(pickle.dumps(entities))
+        
+        assert restored[0]._source_bytes is not None
+        assert len({id(entity._source_bytes) for entity in restored}) == 1
+        assert [e.source_code for e in restored] == [e.source_code for e in entities]
+    
+    def test_source_code_required(self):
+        """Test that an entity built without source_code fails validation."""
+        fields = dict(
+            name="greet",
+            entity_type=CodeEntityType.FUNCTION,
+            language=Language.PYTHON,
+            file_path="test.py",
+            repo_name="test-repo",
+            start_line=1,
+            end_line=2,
+        )
+        
+        with pytest.raises(ValidationError):
+            CodeEntity(**fields)
+        assert CodeEntity.without_source(**fields).source_code == ""
+    
     def test_parse_decorated_function(self):
         """Test parsing a decorated function."""
         code = '''
@@ -239,4 +387,83 @@ impl HttpClient {
         # Methods should have HttpClient as parent
         for method in methods:
             assert method.parent_class == "HttpClient"
+    
+    def test_skip_items_in_function_body(self):
+        """Test that items nested in a function body are not extracted."""
+        code = '''
+fn outer() -> u32 {
+    struct Local { x: u32 }
+    fn helper() -> u32 { 1 }
+    helper()
+}
+'''
+        entities = self.parser.parse_content(code, "test.rs", "test-repo")
+        
+        assert [e.name for e in entities] == ["outer"]
+    
+    def test_entity_cache_is_keyed_by_repo(self, tmp_path):
+        """Test that one file cached under two repo names keeps both entries."""
+        source = tmp_path / "lib.rs"
+        source.write_text("pub fn run() {}\n")
+        parser = RustParser()
+        
+        for _ in range(2):
+            for repo_name in ["repo-a", "repo-b"]:
+                entities = parser.parse_file(source, repo_name)
+                assert [(e.name, e.repo_name) for e in entities] == [("run", repo_name)]
+        
+        rows = parser._cache._connect().execute("SELECT repo FROM entities ORDER BY repo").fetchall()
+        assert rows == [("repo-a",), ("repo-b",)]
 
+
+
+class TestParseIfChanged:
+    """Tests for hash-gated file parsing."""
+    
+    def test_skips_unchanged_file(self, tmp_path):
+        """Test that a matching hash short-circuits parsing."""
+        source = tmp_path / "module.js"
+        source.write_text("function greet(name) { return name; }\n")
+        parser = JavaScriptParser()
+        
+        digest, entities = parser.parse_file_if_changed(source, "test-repo")
+        assert entities is not None
+        assert entities[0].name == "greet"
+        
+        same_digest, entities = parser.parse_file_if_changed(source, "test-repo", digest)
+        assert same_digest == digest
+        assert entities is None
+        
+        source.write_text("function farewell(name) { return name; }\n")
+        new_digest, entities = parser.parse_file_if_changed(source, "test-repo", digest)
+        assert new_digest != digest
+        assert entities[0].name == "farewell"
+
+
+class TestIterParseFiles:
+    """Tests for process-pool parsing."""
+    
+    def create_files(self, tmp_path):
+        """Helper to write a few modules, one of them named bad.py."""
+        paths = []
+        for name in ["a", "b", "bad", "c", "d"]:
+            path = tmp_path / f"{name}.py"
+            path.write_text(f"def {name}_func():\n    pass\n")
+            paths.append(path)
+        return paths
+    
+    def test_skips_failing_file(self, tmp_path):
+        """Test that a file whose parse raises is skipped, not fatal."""
+        paths = self.create_files(tmp_path)
+        
+        results = list(iter_parse_files(parse_or_fail, paths, "test-repo", workers=2, chunksize=2))
+        
+        assert [len(entities) for entities in results] == [1, 1, 0, 1, 1]
+    
+    def test_recovers_from_crashed_worker(self, tmp_path):
+        """Test that files from a crashed worker are parsed in process."""
+        paths = self.create_files(tmp_path)
+        
+        results = list(iter_parse_files(parse_or_crash_worker, paths, "test-repo", workers=2, chunksize=2))
+        
+        assert [entities[0].name for entities in results] == ["a_func", "b_func", "bad_func", "c_func", "d_func"]
@@ -0,0 +1,208 @@
+"""
+Tests for the job queue module.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, call, patch
+
+import pika
+import pytest
+from pika.exceptions import NackError
+from codesearch.models import IndexingJob
+from codesearch.queue import JobPublisher, AsyncJobPublisher
+from codesearch.queue import worker as worker_module
+from codesearch.queue.worker import IndexingWorker
+
+
+def create_job(repo_name: str = "repo", branch: str = "main") -> IndexingJob:
+    """Helper to create test jobs."""
+    return IndexingJob(
+        repo_url=f"https://github.com/example/{repo_name}",
+        repo_name=repo_name,
+        branch=branch
+    )
+
+
+def create_message(delivery_tag: int, repo_name: str = "repo"):
+    """Helper to create a delivered (method, properties, body) triple."""
+    return (
+        Mock(delivery_tag=delivery_tag),
+        Mock(message_id=f"job-{delivery_tag}"),
+        create_job(repo_name).model_dump_json().encode()
+    )
+
+
+class TestJobPublisher:
+    """Tests for the blocking job publisher."""
+    
+    def create_publisher(self, **kwargs) -> JobPublisher:
+        """Helper to create a publisher on a mocked channel."""
+        publisher = JobPublisher(**kwargs)
+        publisher._channel = Mock()
+        return publisher
+    
+    def test_dedup_off_by_default(self):
+        """Test that repeated jobs for a repo/branch are all published by default."""
+        publisher = self.create_publisher()
+        
+        assert publisher.publish_jobs([create_job(), create_job()]) == 2
+        assert publisher._channel.basic_publish.call_count == 2
+    
+    def test_dedup_skips_duplicate(self):
+        """Test that a deduplicating publisher skips, and reports, a repeated job."""
+        publisher = self.create_publisher(dedup=True)
+        
+        assert publisher.publish_repo("https://github.com/example/repo") is not None
+        assert publisher.publish_repo("https://github.com/example/repo") is None
+        assert publisher.publish_repo("https://github.com/example/repo", branch="dev") is not None
+        assert publisher._channel.basic_publish.call_count == 2
+    
+    def test_dedup_records_only_confirmed_jobs(self):
+        """Test that a job the broker nacked can be published again."""
+        publisher = self.create_publisher(dedup=True)
+        publisher._channel.basic_publish.side_effect = [NackError([]), None]
+        
+        assert publisher.publish_job(create_job()) is False
+        assert publisher.publish_job(create_job()) is True
+
+
+class TestAsyncJobPublisher:
+    """Tests for the asyncio job publisher."""
+    
+    def create_publisher(self, **kwargs) -> AsyncJobPublisher:
+        """Helper to create a publisher on a mocked channel."""
+        publisher = AsyncJobPublisher(**kwargs)
+        publisher._channel = Mock()
+        publisher._channel.default_exchange.publish = AsyncMock()
+        return publisher
+    
+    def test_dedup_skips_concurrent_duplicate(self):
+        """Test that duplicates in one concurrent batch are published once."""
+        publisher = self.create_publisher(dedup=True)
+        
+        published = asyncio.run(publisher.publish_jobs([create_job(), create_job(), create_job("other")]))
+        
+        assert published == 2
+        assert publisher._channel.default_exchange.publish.await_count == 2
+    
+    def test_dedup_records_only_confirmed_jobs(self):
+        """Test that a job whose publish failed can be published again."""
+        publisher = self.create_publisher(dedup=True)
+        publisher._channel.default_exchange.publish.side_effect = [RuntimeError("nack"), None]
+        
+        assert asyncio.run(publisher.publish_repo("https://github.com/example/repo")) is None
+        assert asyncio.run(publisher.publish_repo("https://github.com/example/repo")) is not None
+
+
+class TestIndexingWorker:
+    """Tests for the indexing worker, on a mocked channel."""
+    
+    @pytest.fixture(autouse=True)
+    def no_signal_handlers(self):
+        """Keep the worker from replacing pytest's signal handlers."""
+        with patch.object(worker_module.signal, "signal"):
+            yield
+    
+    def create_worker(self, **kwargs) -> IndexingWorker:
+        """Helper to create a worker whose jobs fail for repo 'bad'."""
+        worker = IndexingWorker(**kwargs)
+        worker._connection = Mock()
+        worker._channel = Mock()
+        worker.set_handler(lambda job: job.repo_name != "bad")
+        return worker
+    
+    def test_acks_in_batches(self):
+        """Test that successes are acked with one multi-ack per batch."""
+        worker = self.create_worker(ack_batch_size=3)
+        channel = worker._channel
+        
+        for tag in range(1, 8):
+            worker._process_message(channel, *create_message(tag))
+        
+        assert channel.basic_ack.call_args_list == [
+            call(delivery_tag=3, multiple=True),
+            call(delivery_tag=6, multiple=True),
+        ]
+        worker._flush_acks()
+        assert channel.basic_ack.call_args == call(delivery_tag=7, multiple=True)
+    
+    def test_timer_flushes_partial_batch(self):
+        """Test that a partial batch is acked once the flush timer fires."""
+        worker = self.create_worker(ack_batch_size=10)
+        worker._connection = Mock(spec=pika.SelectConnection)
+        worker._connection.ioloop = Mock()
+        channel = worker._channel
+        
+        worker._process_message(channel, *create_message(1))
+        worker._process_message(channel, *create_message(2))
+        
+        # One timer for the whole pending batch
+        worker._connection.ioloop.call_later.assert_called_once()
+        delay, callback = worker._connection.ioloop.call_later.call_args.args
+        assert delay == worker_module.ACK_FLUSH_INTERVAL
+        channel.basic_ack.assert_not_called()
+        
+        callback()
+        channel.basic_ack.assert_called_once_with(delivery_tag=2, multiple=True)
+    
+    def test_flushes_acks_before_reject(self):
+        """Test that pending acks are sent before a failed job is rejected."""
+        worker = self.create_worker(ack_batch_size=10)
+        channel = worker._channel
+        
+        worker._process_message(channel, *create_message(1))
+        worker._process_message(channel, *create_message(2))
+        worker._process_message(channel, *create_message(3, "bad"))
+        
+        assert channel.mock_calls == [
+            call.basic_ack(delivery_tag=2, multiple=True),
+            call.basic_reject(delivery_tag=3, requeue=False),
+        ]
+    
+    def test_closed_channel_drops_pending_acks(self):
+        """Test that acks pending on a closed channel are dropped, not sent."""
+        worker = self.create_worker(ack_batch_size=10)
+        channel = worker._channel
+        worker._process_message(channel, *create_message(1))
+        
+        channel.is_open = False
+        worker._flush_acks()
+        
+        channel.basic_ack.assert_not_called()
+        assert worker._pending_ack_tag is None
+        assert worker._pending_ack_count == 0
+    
+    def test_run_batch_acks_before_cancel(self):
+        """Test that run_batch stops at max_jobs and acks before cancelling."""
+        worker = self.create_worker(ack_batch_size=10)
+        channel = worker._channel
+        channel.consume.return_value = iter([create_message(tag) for tag in range(1, 6)])
+        
+        assert worker.run_batch(max_jobs=3) == 3
+        
+        calls = [c for c in channel.mock_calls if c[0] in ("basic_ack", "cancel")]
+        assert calls == [call.basic_ack(delivery_tag=3, multiple=True), call.cancel()]
+    
+    def test_reconnect_backoff(self):
+        """Test that reconnect delays double up to the cap, and reset after consuming."""
+        worker = IndexingWorker()
+        attempts = []
+        
+        def start_ioloop():
+            attempts.append(len(attempts))
+            # The fourth connection gets as far as consuming
+            worker._consuming = len(attempts) == 4
+        
+        delays = []
+        
+        def wait(delay):
+            delays.append(delay)
+            return len(delays) >= 9
+        
+        with patch.object(worker_module.pika, "SelectConnection") as connection_class:
+            connection_class.return_value.ioloop.start.side_effect = start_ioloop
+            with patch.object(worker._stop_event, "wait", side_effect=wait):
+                worker.start()
+        
+        assert delays == [1.0, 2.0, 4.0, 1.0, 2.0, 4.0, 8.0, 16.0, 30.0]
+        assert len(attempts) == 9
@@ -2,10 +2,16 @@
 Tests for the search engine.
 """
 
+import pickle
+import random
+
+import numpy as np
 import pytest
 from codesearch.models import CodeEntity, CodeEntityType, Language
+from codesearch.storage import bm25_index
 from codesearch.storage.bm25_index import BM25Index
-from codesearch.search.engine import LocalSearchEngine
+from codesearch.storage.vector_store import InMemoryVectorStore
+from codesearch.search.engine import HybridSearchEngine, LocalSearchEngine
 
 
 class TestBM25Index:
@@ -80,6 +86,123 @@ class TestBM25Index:
         assert removed == 2
         assert self.index.count() == 1
     
+    def test_cached_search_sees_changes(self):
+        """Test that cached results are dropped once the index changes."""
+        self.index.add_entities([self.create_entity("parse_json", repo_name="repo-a")])
+        assert len(self.index.search("parse json")) == 1
+        
+        self.index.add_entities([self.create_entity("parse_json_file", repo_name="repo-b")])
+        assert len(self.index.search("parse json")) == 2
+        
+        self.index.remove_by_repo("repo-a")
+        names = [r[0].name for r in self.index.search("parse json")]
+        assert names == ["parse_json_file"]
+    
+    def test_save_and_load(self, tmp_path):
+        """Test that a loaded index, memory-mapped from disk, searches the same."""
+        index = BM25Index(tmp_path)
+        index.add_entities([
+            self.create_entity("parse_json", "Parse a JSON string"),
+            self.create_entity("read_file", "Read a file from disk"),
+        ])
+        expected = [(e.id, score) for e, score in index.search("parse json file")]
+        index.save()
+        
+        loaded = BM25Index(tmp_path)
+        assert loaded.load()
+        assert [(e.id, score) for e, score in loaded.search("parse json file")] == expected
+        
+        # Saving over the files the loaded index still maps must not corrupt it
+        loaded.save()
+        assert [(e.id, score) for e, score in loaded.search("parse json file")] == expected
+    
+    def test_pruned_search_matches_exhaustive(self, monkeypatch):
+        """Test that MaxScore pruning returns the exhaustive top-k, scores included."""
+        rng = random.Random(0)
+        filler = [f"filler{i}" for i in range(50)]
+        entities = []
+        for i in range(400):
+            words = rng.choices(filler, k=8)
+            if i % 20 == 0:
+                words += ["alpha"] * (1 + i % 3) + ["beta"] * (i % 2)
+            if i % 13 == 0:
+                words.append("beta")
+            if i % 4:
+                words.append("common")
+            entities.append(self.create_entity(f"func{i}", " ".join(words)))
+        self.index.add_entities(entities)
+        query = "alpha beta common"
+        
+        monkeypatch.setattr(bm25_index, "PRUNE_MIN_POSTINGS", 0)
+        pruned = [(e.id, score) for e, score in self.index._search(query, 5, None)]
+        term_ids = [self.index._vocab[token] for token in query.split()]
+        bm25 = self.index._bm25
+        # Pruning kicked in: some documents were left with partial scores
+        assert (bm25.get_top_scores(term_ids, 5) != bm25.get_scores(term_ids)).any()
+        
+        monkeypatch.setattr(bm25_index, "PRUNE_MIN_POSTINGS", 1 << 62)
+        exhaustive = [(e.id, score) for e, score in self.index._search(query, 5, None)]
+        assert pruned == exhaustive
+    
+    def test_numba_accumulator_matches_numpy(self):
+        """Test that the numba kernel scores exactly like the numpy scatter-add."""
+        pytest.importorskip("numba")
+        from codesearch.storage._bm25_numba import accumulate_scores
+        
+        rng = np.random.default_rng(0)
+        n_docs, n_terms = 200, 30
+        counts = rng.integers(0, 40, n_terms)
+        indptr = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        indices = np.concatenate([
+            np.sort(rng.choice(n_docs, count, replace=False)) for count in counts
+        ]).astype(np.int32)
+        data = rng.random(len(indices))
+        term_ids = np.array([3, 7, 3, 12, 29], dtype=np.int64)
+        
+        expected = np.zeros(n_docs)
+        for t in term_ids:
+            expected[indices[indptr[t]:indptr[t + 1]]] += data[indptr[t]:indptr[t + 1]]
+        scores = np.zeros(n_docs)
+        accumulate_scores(term_ids, data, indices, indptr, scores)
+        
+        assert np.array_equal(scores, expected)
+    
+    def test_save_swaps_generations(self, tmp_path):
+        """Test that each save publishes a new generation and prunes older ones."""
+        index = BM25Index(tmp_path)
+        index.add_entities([self.create_entity("parse_json", "Parse a JSON string")])
+        index.save()
+        reader = BM25Index(tmp_path)
+        assert reader.load()
+        
+        index.add_entities([self.create_entity("read_file", "Read a file from disk")])
+        index.save()
+        index.save()
+        
+        # The current generation, plus the one it replaced
+        assert len([p for p in tmp_path.glob("bm25-*") if p.is_dir()]) == 2
+        assert reader.count() == 1
+        loaded = BM25Index(tmp_path)
+        assert loaded.load()
+        assert loaded.count() == 2
+    
+    def test_load_baseline_pickle(self, tmp_path):
+        """Test that an index saved in the original pickle format still loads."""
+        entities = [
+            self.create_entity("parse_json", "Parse a JSON string"),
+            self.create_entity("read_file", "Read a file from disk"),
+        ]
+        with open(tmp_path / "bm25_index.pkl", 'wb') as f:
+            pickle.dump({
+                "entities": [e.model_dump() for e in entities],
+                "corpus": [self.index._tokenize(self.index._entity_to_document(e)) for e in entities],
+                "entity_ids": {e.id: i for i, e in enumerate(entities)},
+            }, f)
+        
+        loaded = BM25Index(tmp_path)
+        assert loaded.load()
+        assert loaded.search("parse json")[0][0].name == "parse_json"
+    
     def test_tokenization(self):
         """Test code-specific tokenization."""
         # Test camelCase splitting
@@ -95,6 +218,108 @@ class TestBM25Index:
         assert "data" in tokens
 
 
+class TestInMemoryVectorStore:
+    """Tests for the in-memory vector store."""
+    
+    def create_entity(self, name: str, repo_name: str) -> CodeEntity:
+        """Helper to create test entities."""
+        return CodeEntity(
+            name=name,
+            entity_type=CodeEntityType.FUNCTION,
+            language=Language.PYTHON,
+            file_path="test.py",
+            repo_name=repo_name,
+            start_line=1,
+            end_line=10,
+            source_code=f"def {name}(): pass",
+        )
+    
+    def test_search_filter_and_delete(self):
+        """Test cosine ranking, filtering and removing a repository."""
+        store = InMemoryVectorStore(dimension=2)
+        store.insert(
+            [self.create_entity("a", "repo-a"), self.create_entity("b", "repo-a"), self.create_entity("c", "repo-b")],
+            [[1.0, 0.0], [3.0, 3.0], [0.0, 2.0]]
+        )
+        
+        results = store.search([1.0, 0.1])
+        assert [e.name for e, _ in results] == ["a", "b", "c"]
+        assert results[0][1] == pytest.approx(0.995, abs=1e-3)
+        
+        results = store.search([1.0, 0.1], filters={"repo_name": "repo-b"})
+        assert [e.name for e, _ in results] == ["c"]
+        
+        assert store.delete_by_repo("repo-a") == 2
+        assert store.count() == 1
+        assert [e.name for e, _ in store.search([1.0, 0.1])] == ["c"]
+
+
+class TestHybridSearchEngine:
+    """Tests for hybrid search engine."""
+    
+    def create_entity(self, name: str) -> CodeEntity:
+        """Helper to create test entities."""
+        return CodeEntity(
+            name=name,
+            entity_type=CodeEntityType.FUNCTION,
+            language=Language.PYTHON,
+            file_path="test.py",
+            repo_name="test-repo",
+            start_line=1,
+            end_line=10,
+            source_code=f"def {name}(): pass",
+        )
+    
+    def test_bm25_only_skips_embedder(self, tmp_path):
+        """Test that a semantic weight of 0 never loads the embedder."""
+        index = BM25Index(tmp_path)
+        index.add_entities([self.create_entity("parse_json")])
+        engine = HybridSearchEngine(vector_store=InMemoryVectorStore(dimension=2), bm25_index=index)
+        
+        results = engine.search("parse json", semantic_weight=0)
+        
+        assert [r.entity.name for r in results] == ["parse_json"]
+        assert engine.embedder is None
+    
+    def test_close_stops_bm25_worker(self, tmp_path):
+        """Test that closing the engine shuts down its BM25 executor."""
+        with HybridSearchEngine(vector_store=InMemoryVectorStore(dimension=2), bm25_index=BM25Index(tmp_path)) as engine:
+            pass
+        
+        with pytest.raises(RuntimeError):
+            engine._bm25_executor.submit(print)
+    
+    def test_combsum_fusion(self, tmp_path):
+        """Test that score-based fusion favors a clear winner over a rank tie."""
+        a, b, c = (self.create_entity(name) for name in "abc")
+        engine = HybridSearchEngine(
+            vector_store=InMemoryVectorStore(dimension=2),
+            bm25_index=BM25Index(tmp_path),
+            fusion="combsum"
+        )
+        
+        fused = engine._reciprocal_rank_fusion(
+            [(a, 0.90), (b, 0.89), (c, 0.10)],
+            [(b, 10.0), (a, 1.0)],
+            semantic_weight=0.5,
+            fusion=engine.fusion
+        )
+        
+        assert [entity.name for entity, *_ in fused] == ["b", "a", "c"]
+        with pytest.raises(ValueError):
+            HybridSearchEngine(vector_store=InMemoryVectorStore(dimension=2), fusion="nope")
+    
+    def test_http_boost_matches_name_substrings(self, tmp_path):
+        """Test that api.py names containing an HTTP verb anywhere are boosted."""
+        plain, verb = self.create_entity("calc"), self.create_entity("budget")
+        plain.file_path = verb.file_path = "requests/api.py"
+        engine = HybridSearchEngine(vector_store=InMemoryVectorStore(dimension=2), bm25_index=BM25Index(tmp_path))
+        
+        fused = engine._reciprocal_rank_fusion([], [(plain, 2.0), (verb, 1.0)], query="api call")
+        
+        assert [entity.name for entity, *_ in fused] == ["budget", "calc"]
+
+
 class TestLocalSearchEngine:
     """Tests for local search engine."""
     